@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_has_loan_user_loan_amount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='realized_pnl',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:46
+
+import django.db.models.deletion
+import market.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_realized_pnl'),
+        ('market', '0024_markets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='market',
+            field=models.ForeignKey(default=market.models.default_market, on_delete=django.db.models.deletion.PROTECT, related_name='traders', to='market.market'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:16
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_net_worth(apps, schema_editor):
+    # What the admin list showed before: the last analytics run, else the balance.
+    User = apps.get_model('accounts', 'User')
+    PortfolioAnalytics = apps.get_model('market', 'PortfolioAnalytics')
+    analysed = PortfolioAnalytics.objects.filter(user=OuterRef('pk')).values('net_worth')[:1]
+    User.objects.update(analytics_net_worth=Coalesce(Subquery(analysed), F('balance')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_market'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('market', '0026_stock_volume'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='analytics_net_worth',
+            field=models.FloatField(default=100.0),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['analytics_net_worth', 'id'], name='accounts_user_net_worth_idx'),
+        ),
+        migrations.RunPython(fill_net_worth, migrations.RunPython.noop),
+    ]
@@ -9,6 +9,8 @@ Description: Custom user model for the application.
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from market.models import default_market
+
 class UserManager(BaseUserManager):
     """Custom user manager where email is the unique identifier."""
     use_in_migrations = True
@@ -40,14 +42,26 @@ class User(AbstractUser):
     """Custom user model with email as the unique identifier."""
     username = None  
     email = models.EmailField(unique=True)
+    # The market this user trades in; balance and holdings belong to it.
+    market = models.ForeignKey('market.Market', on_delete=models.PROTECT, default=default_market, related_name='traders')
     balance = models.FloatField(default=100.0)
     has_loan = models.BooleanField(default=False)
     loan_amount = models.FloatField(default=0.0)
+    realized_pnl = models.FloatField(default=0.0)
+    # Net worth from the last portfolio analytics run, kept on the user so
+    # the admin list can sort by it on an index. New users start at the
+    # default balance until they are analysed.
+    analytics_net_worth = models.FloatField(default=100.0)
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['analytics_net_worth', 'id'], name='accounts_user_net_worth_idx'),
+        ]
+
     def __str__(self):
         return (self.first_name + " " + self.last_name).strip()
 
@@ -57,6 +57,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'market.replicas.PinPrimaryAfterWriteMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "django_browser_reload.middleware.BrowserReloadMiddleware",
@@ -94,10 +95,11 @@ DATABASES = {
 }
 
 from urllib.parse import urlparse
-DATABASE_URL = os.environ.get('DATABASE_URL')
-if DATABASE_URL:
-    result = urlparse(DATABASE_URL)
-    DATABASES['default'] = {
+
+
+def _database_from_url(url):
+    result = urlparse(url)
+    return {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': result.path.lstrip('/'),
         'USER': result.username,
@@ -106,11 +108,93 @@ if DATABASE_URL:
         'PORT': result.port,
     }
 
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+if DATABASE_URL:
+    DATABASES['default'] = _database_from_url(DATABASE_URL)
+
+# Read replicas of the default database, as comma-separated postgres:// URLs.
+# The read-only market endpoints (ticker, stocks, history, leaderboard,
+# sparklines) read from them; everything else stays on default.
+DATABASE_REPLICAS = []
+for index, url in enumerate(u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = {**_database_from_url(url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['market.replicas.ReplicaRouter']
+# After a write, a client keeps reading from default this long so it sees
+# its own changes despite replication lag.
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get("DATABASE_REPLICA_STICKY_SECONDS", "10"))
+
 CRONJOBS = [
     ('* * * * *', 'django.core.management.call_command', ['update_stocks'], {}, '>> /tmp/cron_update_stocks.log 2>&1'),
     ('*/5 * * * *', 'django.core.management.call_command', ['random_market_event'], {}, '>> /tmp/cron_market_event.log 2>&1'),
+    ('30 2 * * *', 'django.core.management.call_command', ['compute_portfolio_analytics'], {}, '>> /tmp/cron_portfolio_analytics.log 2>&1'),
+    ('0 * * * *', 'django.core.management.call_command', ['snapshot_leaderboard'], {}, '>> /tmp/cron_leaderboard.log 2>&1'),
+    ('15 * * * *', 'django.core.management.call_command', ['cleanup_stock_history'], {'keep': 5000}, '>> /tmp/cron_history_cleanup.log 2>&1'),
 ]
 
+# Scheduled jobs (tick, market events) take a lease row so only one runner
+# executes each at a time; a crashed runner's lease lapses after this long.
+MARKET_JOB_LEASE_SECONDS = int(os.environ.get("MARKET_JOB_LEASE_SECONDS", "300"))
+# Length of one tick period; runs within the same period are deduplicated.
+MARKET_TICK_SECONDS = int(os.environ.get("MARKET_TICK_SECONDS", "60"))
+# After downtime the next tick first replays the periods it missed, up to
+# this many (the most recent ones); 0 disables the catch-up.
+MARKET_CATCH_UP_MAX_TICKS = int(os.environ.get("MARKET_CATCH_UP_MAX_TICKS", "1440"))
+# Split the stock universe across several cron machines by symbol hash: set
+# MARKET_TICK_SHARDS on all of them and a distinct MARKET_TICK_SHARD on each.
+MARKET_TICK_SHARDS = int(os.environ.get("MARKET_TICK_SHARDS", "1"))
+MARKET_TICK_SHARD = int(os.environ.get("MARKET_TICK_SHARD", "0"))
+
+# Recent market versions whose changed symbols are kept for delta ticker
+# polls (/api/ticker/?since=...); clients further behind get a full snapshot.
+MARKET_TICKER_HISTORY = int(os.environ.get("MARKET_TICKER_HISTORY", "120"))
+
+# Price model used by the tick: "uniform" (independent moves within each
+# stock's volatility range), "factor" (correlated sector factors) or a dotted
+# path to a market.pricing.PriceModel subclass.
+PRICE_MODEL = os.environ.get("PRICE_MODEL", "uniform")
+# Share of each stock's variance driven by its sector factor (factor model).
+PRICE_FACTOR_WEIGHT = float(os.environ.get("PRICE_FACTOR_WEIGHT", "0.6"))
+# Correlation between different sector factors unless a full matrix is given
+# as JSON: {"sectors": ["food", ...], "matrix": [[...], ...]}.
+PRICE_SECTOR_CORRELATION = float(os.environ.get("PRICE_SECTOR_CORRELATION", "0.3"))
+PRICE_SECTOR_COVARIANCE = os.environ.get("PRICE_SECTOR_COVARIANCE", "")
+
+# Relative likelihood of each market event impact level, as "level:weight,...".
+MARKET_EVENT_LEVEL_WEIGHTS = {
+    level.strip(): float(weight)
+    for level, weight in (
+        item.split(':', 1)
+        for item in os.environ.get("MARKET_EVENT_LEVEL_WEIGHTS", "severe:10,major:15,moderate:30,minor:45").split(',')
+        if item.strip()
+    )
+}
+
+# Number of counter rows each stock's trade activity is spread over per time
+# bucket; more slots mean less lock contention between concurrent trades.
+STOCK_ACTIVITY_SLOTS = int(os.environ.get("STOCK_ACTIVITY_SLOTS", "8"))
+
+PORTFOLIO_ANALYTICS_LOOKBACK_DAYS = int(os.environ.get("PORTFOLIO_ANALYTICS_LOOKBACK_DAYS", "7"))
+PORTFOLIO_ANALYTICS_SAMPLE_MINUTES = int(os.environ.get("PORTFOLIO_ANALYTICS_SAMPLE_MINUTES", "60"))
+
+# Price history storage backend: "rows" (one StockPriceHistory row per tick) or
+# "chunks" (one compressed StockPriceChunk row per stock per window).
+STOCK_HISTORY_BACKEND = os.environ.get("STOCK_HISTORY_BACKEND", "rows")
+STOCK_HISTORY_CHUNK_SECONDS = int(os.environ.get("STOCK_HISTORY_CHUNK_SECONDS", "3600"))
+
+# Opt-in time-range partitioning of StockPriceHistory ("daily" or "weekly", PostgreSQL only).
+# Retention then drops whole partitions instead of deleting rows one by one.
+STOCK_HISTORY_PARTITIONING = os.environ.get("STOCK_HISTORY_PARTITIONING", "")
+STOCK_HISTORY_RETENTION_DAYS = int(os.environ.get("STOCK_HISTORY_RETENTION_DAYS", "14"))
+STOCK_HISTORY_PARTITIONS_AHEAD = int(os.environ.get("STOCK_HISTORY_PARTITIONS_AHEAD", "7"))
+
+if STOCK_HISTORY_PARTITIONING:
+    CRONJOBS.append(
+        ('15 0 * * *', 'django.core.management.call_command', ['partition_stock_history'], {}, '>> /tmp/cron_partition_history.log 2>&1'),
+    )
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
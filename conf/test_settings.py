@@ -0,0 +1,21 @@
+"""
+File: test_settings.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Django settings for the test suite: python manage.py test --settings=conf.test_settings
+"""
+
+
+from conf.settings import *  # noqa: F401,F403
+
+
+# A replica alias that mirrors the test database, so the replica tests
+# exercise routing and pinning without a second server. Nothing reads from
+# it unless a test lists it in DATABASE_REPLICAS.
+DATABASES = {**DATABASES, 'replica': {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}}
+
+# The test client speaks plain HTTP; don't redirect it to HTTPS when DEBUG is off.
+SECURE_SSL_REDIRECT = False
+
+# Users are created in most tests; skip the deliberately slow production hasher.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -15,20 +15,34 @@ from market import views as market_views
 urlpatterns = [
     path('', include('accounts.urls')),
     path('api/ticker/', market_views.ticker_data, name='ticker-data'),
+    path('api/sparklines/', market_views.sparklines, name='sparklines'),
     path('api/stocks/', market_views.stocks_list, name='stocks-list'),
     path('api/stocks/<str:symbol>/', market_views.stock_detail, name='stock-detail'),
     path('api/stocks/<str:symbol>/history/', market_views.stock_history, name='stock-history'),
+    path('api/stocks/<str:symbol>/indicators/', market_views.stock_indicators, name='stock-indicators'),
     path('api/latest-event/', market_views.latest_event, name='latest-event'),
     path('api/buy/', market_views.buy_stock, name='buy-stock'),
     path('api/sell/', market_views.sell_stock, name='sell-stock'),
     path('api/loan/take/', market_views.take_loan, name='take-loan'),
-    path('api/loan/status/', market_views.check_loan_status, name='loan-status'),
+    path('api/account/summary/', market_views.account_summary, name='account-summary'),
+    path('api/alerts/', market_views.list_alerts, name='list-alerts'),
+    path('api/alerts/create/', market_views.create_alert, name='create-alert'),
+    path('api/alerts/delete/', market_views.delete_alert, name='delete-alert'),
+    path('api/notifications/', market_views.notifications, name='notifications'),
+    path('api/leaderboard/', market_views.leaderboard_standings, name='leaderboard-standings'),
+    path('api/leaderboard/history/', market_views.leaderboard_history, name='leaderboard-history'),
+    path('api/orders/', market_views.list_orders, name='list-orders'),
+    path('api/orders/place/', market_views.place_order, name='place-order'),
+    path('api/orders/cancel/', market_views.cancel_order, name='cancel-order'),
     path('api/admin/force-event/', market_views.admin_force_event, name='admin-force-event'),
     path('api/admin/add-money/', market_views.admin_add_money, name='admin-add-money'),
     path('api/admin/users/', market_views.admin_list_users, name='admin-list-users'),
+    path('api/admin/history/export/', market_views.admin_export_history, name='admin-export-history'),
     path('api/admin/set-price/', market_views.admin_set_stock_price, name='admin-set-price'),
     path('api/admin/market-event/', market_views.admin_market_event, name='admin-market-event'),
     path('api/admin/monkey-business/', market_views.admin_monkey_business, name='admin-monkey-business'),
+    path('api/admin/bulk/add-money/', market_views.admin_bulk_add_money, name='admin-bulk-add-money'),
+    path('api/admin/bulk/monkey-business/', market_views.admin_bulk_monkey_business, name='admin-bulk-monkey-business'),
     path('', include('market.urls')),
     path('__reload__/', include('django_browser_reload.urls')),
     path('admin/', admin.site.urls),
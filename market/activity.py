@@ -0,0 +1,139 @@
+"""
+File: activity.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Sharded per-stock trade counters and their rolling 1h/24h rollup.
+"""
+
+
+from collections import defaultdict
+from datetime import timedelta
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from market.models import Stock, StockActivity, StockActivityCounter, Trade
+
+
+BUCKET_SECONDS = 300
+
+# StockActivity fields served to clients by stats_by_stock().
+STATS_FIELDS = ('trades_1h', 'volume_1h', 'trades_24h', 'volume_24h', 'open_24h', 'high_24h', 'low_24h')
+
+WINDOWS = {
+    '1h': timedelta(hours=1),
+    '24h': timedelta(hours=24),
+}
+
+
+def slots():
+    return max(1, int(getattr(settings, 'STOCK_ACTIVITY_SLOTS', 8)))
+
+
+def bucket_start(moment):
+    """Return the start of the BUCKET_SECONDS bucket containing `moment`."""
+    epoch = int(moment.timestamp())
+    return moment - timedelta(seconds=epoch % BUCKET_SECONDS, microseconds=moment.microsecond)
+
+
+def record(trades, now=None):
+    """Count the buys and sells in `trades` into each stock's sharded counters.
+
+    Each stock increments one randomly chosen slot of the current bucket
+    with an UPDATE ... SET x = x + n, so concurrent trades on the same
+    stock spread over `STOCK_ACTIVITY_SLOTS` rows instead of queueing on
+    the Stock row the tick is updating.
+    """
+    totals = defaultdict(lambda: [0, 0, 0.0])
+    for trade in trades:
+        if trade.kind not in (Trade.BUY, Trade.SELL) or trade.stock_id is None:
+            continue
+        entry = totals[trade.stock_id]
+        entry[0] += 1
+        entry[1] += abs(trade.shares)
+        entry[2] += abs(trade.cash)
+    if not totals:
+        return
+
+    bucket = bucket_start(now or timezone.now())
+    for stock_id, (count, shares, notional) in totals.items():
+        _increment(stock_id, bucket, random.randrange(slots()), count, shares, notional)
+
+
+def _increment(stock_id, bucket, slot, count, shares, notional):
+    counter = StockActivityCounter.objects.filter(stock_id=stock_id, bucket_start=bucket, slot=slot)
+    increments = {
+        'trades': F('trades') + count,
+        'shares': F('shares') + shares,
+        'notional': F('notional') + notional,
+    }
+    if counter.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            StockActivityCounter.objects.create(
+                stock_id=stock_id, bucket_start=bucket, slot=slot,
+                trades=count, shares=shares, notional=notional,
+            )
+    except IntegrityError:
+        # Another trade created this slot first.
+        counter.update(**increments)
+
+
+def rollup(now=None):
+    """Recompute every stock's rolling 1h and 24h activity and drop expired counters.
+
+    One aggregate query over the last 24h of counters, one upsert of all
+    StockActivity rows, one bulk update of the stocks whose 24h volume
+    changed and one DELETE. Returns the number of stocks updated.
+    """
+    now = now or timezone.now()
+    since_1h = now - WINDOWS['1h']
+    since_24h = now - WINDOWS['24h']
+    recent = Q(activity_counters__bucket_start__gte=since_1h)
+    current = Q(activity_counters__bucket_start__gte=since_24h)
+
+    rows = Stock.objects.annotate(
+        trades_1h=Coalesce(Sum('activity_counters__trades', filter=recent), 0),
+        volume_1h=Coalesce(Sum('activity_counters__shares', filter=recent), 0),
+        notional_1h=Coalesce(Sum('activity_counters__notional', filter=recent), 0.0),
+        trades_24h=Coalesce(Sum('activity_counters__trades', filter=current), 0),
+        volume_24h=Coalesce(Sum('activity_counters__shares', filter=current), 0),
+        notional_24h=Coalesce(Sum('activity_counters__notional', filter=current), 0.0),
+    ).values_list(
+        'id', 'trades_1h', 'volume_1h', 'notional_1h', 'trades_24h', 'volume_24h', 'notional_24h', 'volume',
+    )
+
+    records = []
+    moved = []
+    for stock_id, trades_1h, volume_1h, notional_1h, trades_24h, volume_24h, notional_24h, volume in rows:
+        records.append(StockActivity(
+            stock_id=stock_id,
+            trades_1h=trades_1h, volume_1h=volume_1h, notional_1h=round(notional_1h, 2),
+            trades_24h=trades_24h, volume_24h=volume_24h, notional_24h=round(notional_24h, 2),
+            updated_at=now,
+        ))
+        if volume != volume_24h:
+            moved.append(Stock(id=stock_id, volume=volume_24h))
+    StockActivity.objects.bulk_create(
+        records,
+        update_conflicts=True,
+        unique_fields=['stock'],
+        update_fields=['trades_1h', 'volume_1h', 'notional_1h', 'trades_24h', 'volume_24h', 'notional_24h', 'updated_at'],
+    )
+    # Only the stocks whose volume moved, so quiet ticks leave the stock rows alone.
+    Stock.objects.bulk_update(moved, ['volume'], batch_size=500)
+    StockActivityCounter.objects.filter(bucket_start__lt=bucket_start(since_24h)).delete()
+    return len(records)
+
+
+def stats_by_stock(stock_ids=None):
+    """Return {stock_id: {...}} of the last rolled-up activity and 24h range for every stock, or just `stock_ids`."""
+    qs = StockActivity.objects.all()
+    if stock_ids is not None:
+        qs = qs.filter(stock_id__in=list(stock_ids))
+    return {row['stock_id']: row for row in qs.values('stock_id', *STATS_FIELDS)}
@@ -7,9 +7,35 @@ Description: Admin interface for market-related models.
 
 
 from django.contrib import admin
-from .models import Stock, Holding, MarketEvent, StockPriceHistory
+from . import prices
+from .models import Market, Stock, Holding, MarketEvent, StockPriceHistory, PriceAlert, Order, Trade
 
-admin.site.register(Stock)
+
+class MarketAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'tick_every')
+    prepopulated_fields = {'slug': ('name',)}
+
+
+class StockAdmin(admin.ModelAdmin):
+    list_display = ('symbol', 'name', 'market', 'price')
+    list_filter = ('market',)
+
+    def save_model(self, request, obj, form, change):
+        """Route price edits of existing stocks through the price pipeline so they are recorded."""
+        if change and 'price' in form.changed_data:
+            new_price = obj.price
+            obj.price = form.initial['price']
+            super().save_model(request, obj, form, change)
+            prices.set_price(obj, new_price, source='admin')
+        else:
+            super().save_model(request, obj, form, change)
+
+
+admin.site.register(Market, MarketAdmin)
+admin.site.register(Stock, StockAdmin)
 admin.site.register(Holding)
 admin.site.register(MarketEvent)
 admin.site.register(StockPriceHistory)
+admin.site.register(PriceAlert)
+admin.site.register(Order)
+admin.site.register(Trade)
@@ -0,0 +1,88 @@
+"""
+File: alerts.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Price alert evaluation as range queries over pending alert thresholds.
+"""
+
+
+from django.db.models import Case, FloatField, Q, Value, When
+from django.utils import timezone
+
+from market.models import PriceAlert
+
+
+MAX_PENDING_PER_USER = 50
+
+
+def crossing_filter(stock_id, old_price, new_price):
+    """Return a Q matching the pending alerts of one stock fired by a price move.
+
+    A rise fires "above" alerts with old < threshold <= new, a fall fires
+    "below" alerts with new <= threshold < old. Both are a single range scan
+    on the (stock, direction, threshold) index. Returns None for no move.
+    """
+    if new_price > old_price:
+        return Q(stock_id=stock_id, direction=PriceAlert.ABOVE,
+                 threshold__gt=old_price, threshold__lte=new_price)
+    if new_price < old_price:
+        return Q(stock_id=stock_id, direction=PriceAlert.BELOW,
+                 threshold__lt=old_price, threshold__gte=new_price)
+    return None
+
+
+def evaluate(changes, now=None):
+    """Fire the pending alerts crossed by `changes` and return how many fired.
+
+    `changes` is an iterable of (stock_id, old_price, new_price). All stocks
+    are handled by one UPDATE that only touches the alerts whose threshold
+    lies between the old and new price, so the cost of a tick does not grow
+    with the number of alerts that stay pending.
+    """
+    condition = None
+    fired_prices = []
+    for stock_id, old_price, new_price in changes:
+        crossing = crossing_filter(stock_id, old_price, new_price)
+        if crossing is None:
+            continue
+        condition = crossing if condition is None else condition | crossing
+        fired_prices.append(When(stock_id=stock_id, then=Value(float(new_price))))
+
+    if condition is None:
+        return 0
+
+    return PriceAlert.objects.filter(condition, triggered_at__isnull=True).update(
+        triggered_at=now or timezone.now(),
+        triggered_price=Case(*fired_prices, output_field=FloatField()),
+    )
+
+
+def evaluate_path(stock_ids, start_prices, path, times):
+    """Fire the pending alerts crossed anywhere along a replayed price path and return how many fired.
+
+    `path` is a (steps, stocks) array of the prices of `stock_ids` at
+    `times`, moving on from `start_prices`. One query finds the alerts
+    between each stock's starting price and its highest or lowest price on
+    the path; each fires at the first step that crosses its threshold, with
+    that step's time and price.
+    """
+    column = {stock_id: i for i, stock_id in enumerate(stock_ids)}
+    condition = None
+    for stock_id, start, high, low in zip(stock_ids, start_prices, path.max(axis=0), path.min(axis=0)):
+        for extreme in (high, low):
+            crossing = crossing_filter(stock_id, float(start), float(extreme))
+            if crossing is not None:
+                condition = crossing if condition is None else condition | crossing
+    if condition is None:
+        return 0
+
+    fired = []
+    pending = PriceAlert.objects.filter(condition, triggered_at__isnull=True).only('stock_id', 'direction', 'threshold')
+    for alert in pending:
+        prices = path[:, column[alert.stock_id]]
+        crossed = prices >= alert.threshold if alert.direction == PriceAlert.ABOVE else prices <= alert.threshold
+        step = int(crossed.argmax())
+        alert.triggered_at, alert.triggered_price = times[step], float(prices[step])
+        fired.append(alert)
+    PriceAlert.objects.bulk_update(fired, ['triggered_at', 'triggered_price'], batch_size=500)
+    return len(fired)
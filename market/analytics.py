@@ -0,0 +1,278 @@
+"""
+File: analytics.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Bulk, vectorized portfolio risk/return analytics for every user at once.
+"""
+
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+import warnings
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from accounts.models import User
+from market import history
+from market.models import Holding, PortfolioAnalytics, Stock, Trade
+
+
+def lookback_days():
+    return int(getattr(settings, 'PORTFOLIO_ANALYTICS_LOOKBACK_DAYS', 7))
+
+
+def sample_minutes():
+    return int(getattr(settings, 'PORTFOLIO_ANALYTICS_SAMPLE_MINUTES', 60))
+
+
+def price_matrix(stock_ids, grid, buffer_size=65536):
+    """Return a (len(stock_ids), len(grid)) array of prices sampled on `grid`.
+
+    `grid` is an ascending array of epoch seconds. Each cell holds the last
+    recorded price at or before that time; cells before a stock's first
+    recorded price are back-filled with its first price. Stocks with no
+    history in range are left as NaN rows.
+
+    Points are streamed once, ordered by stock then time, into a fixed
+    buffer; each full buffer (or finished stock) is sampled onto its row
+    with one searchsorted, so memory stays constant however much history
+    there is.
+    """
+    index = {stock_id: i for i, stock_id in enumerate(stock_ids)}
+    n_stocks, n_times = len(stock_ids), len(grid)
+    result = np.full((n_stocks, n_times), np.nan)
+    if not n_stocks or not n_times:
+        return result
+
+    times = np.empty(buffer_size)
+    prices = np.empty(buffer_size)
+    first_price = np.full(n_stocks, np.nan)
+    row, filled = None, 0
+
+    def sample():
+        # Later points overwrite the cells they reach, so buffers must
+        # arrive in time order within a stock.
+        pos = np.searchsorted(times[:filled], grid, side='right') - 1
+        reached = pos >= 0
+        result[row, reached] = prices[pos[reached]]
+
+    # Include one earlier window so the first grid cell has a prior price.
+    since = datetime.fromtimestamp(grid[0], tz=dt_timezone.utc) - timedelta(days=1)
+    for stock_id, ts, price in history.iter_points(stock_ids, since=since):
+        point_row = index[stock_id]
+        if point_row != row or filled == buffer_size:
+            if filled:
+                sample()
+            if point_row != row:
+                first_price[point_row] = price
+            row, filled = point_row, 0
+        times[filled] = ts.timestamp()
+        prices[filled] = price
+        filled += 1
+    if filled:
+        sample()
+
+    return np.where(np.isnan(result), first_price[:, None], result)
+
+
+def replay_trades(user_index, stock_index, times, prices, chunk_size=5000):
+    """Return (cash_after, stocks_after, flows), each (users, len(times)), rebuilt from the trade ledger.
+
+    `times` are ascending epoch seconds and `prices` the (stocks, times)
+    matrix sampled on them. `cash_after` and `stocks_after` are the cash
+    and shares (valued at each time's prices) that trades made after each
+    time added, so a user's holdings at time j are their current ones minus
+    column j. `flows` is the money that entered each portfolio from outside
+    trading (opening balance, loans and repayments, grants) in the period
+    ending at each time, granted shares valued at that time's price.
+
+    Only trades after the first time are read, streamed in chunks of
+    `chunk_size` and folded in with a few array operations each, so memory
+    does not grow with the ledger.
+    """
+    n_users, n_times = len(user_index), len(times)
+    cash_buckets = np.zeros((n_users, n_times + 1))
+    stocks_after = np.zeros((n_users, n_times))
+    flows = np.zeros((n_users, n_times + 1))
+    columns = np.arange(n_times)
+
+    def fold(chunk):
+        users = np.array([u for u, _, _, _, _, _ in chunk], dtype=np.int64)
+        stocks = np.array([s for _, s, _, _, _, _ in chunk], dtype=np.int64)
+        # A trade moves every sample taken before it: sample j < bucket.
+        buckets = np.searchsorted(times, [t for _, _, t, _, _, _ in chunk], side='left')
+        cash = np.array([c for _, _, _, c, _, _ in chunk], dtype=float)
+        shares = np.array([n for _, _, _, _, n, _ in chunk], dtype=float)
+        external = np.array([e for _, _, _, _, _, e in chunk], dtype=bool)
+
+        np.add.at(cash_buckets, (users, buckets), cash)
+        valued = shares[:, None] * prices[stocks, :]
+        np.add.at(stocks_after, users, np.where(columns[None, :] < buckets[:, None], valued, 0.0))
+        inside = external & (buckets < n_times)
+        at = np.minimum(buckets, n_times - 1)
+        np.add.at(flows, (users[inside], buckets[inside]), cash[inside] + valued[inside, at[inside]])
+
+    internal = (Trade.BUY, Trade.SELL)
+    rows = (
+        Trade.objects.filter(created_at__gt=datetime.fromtimestamp(times[0], tz=dt_timezone.utc))
+        .values_list('user_id', 'stock_id', 'kind', 'created_at', 'cash', 'shares')
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for user_id, stock_id, kind, created_at, cash, shares in rows:
+        if user_id not in user_index:
+            continue
+        stock = stock_index.get(stock_id)
+        chunk.append((
+            user_index[user_id],
+            0 if stock is None else stock,
+            created_at.timestamp(),
+            cash or 0.0,
+            0 if stock is None else shares,
+            kind not in internal,
+        ))
+        if len(chunk) == chunk_size:
+            fold(chunk)
+            chunk = []
+    if chunk:
+        fold(chunk)
+
+    cash_after = cash_buckets.sum(axis=1)[:, None] - np.cumsum(cash_buckets, axis=1)[:, :n_times]
+    return cash_after, stocks_after, flows[:, :n_times]
+
+
+def series_stats(values, periods_per_day, flows=None):
+    """Return (twr, volatility, max_drawdown, sharpe) arrays for each row of `values`.
+
+    `values` is (users, times) portfolio value and `flows` (same shape,
+    optional) the outside money that arrived in the period ending at each
+    time. Each period's return excludes its flows, so the compounded
+    time-weighted return and the drawdown of its growth index measure
+    trading alone. Returns are per sample; volatility and the Sharpe-style
+    ratio (risk-free rate of zero) are scaled to one day. Rows without
+    enough non-zero history yield NaN.
+    """
+    if flows is None:
+        flows = np.zeros_like(values)
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        # All-NaN rows (no usable history) are expected and handled below.
+        warnings.simplefilter('ignore', RuntimeWarning)
+        prev, curr = values[:, :-1], values[:, 1:]
+        returns = np.where(prev > 0, (curr - flows[:, 1:]) / prev - 1.0, np.nan)
+
+        twr = np.nanprod(1.0 + returns, axis=1) - 1.0
+        count = np.sum(~np.isnan(returns), axis=1)
+        mean = np.nanmean(returns, axis=1) if returns.size else np.full(len(values), np.nan)
+        std = np.nanstd(returns, axis=1, ddof=1) if returns.shape[1] > 1 else np.full(len(values), np.nan)
+
+        scale = np.sqrt(periods_per_day)
+        volatility = std * scale
+        sharpe = np.where(std > 0, mean / std * scale, np.nan)
+
+        growth = np.cumprod(1.0 + np.nan_to_num(returns), axis=1)
+        peaks = np.maximum.accumulate(np.maximum(growth, 1.0), axis=1)
+        max_drawdown = np.minimum((growth / peaks - 1.0).min(axis=1, initial=0.0), 0.0)
+
+    insufficient = count < 2
+    twr = np.where(count < 1, np.nan, twr)
+    volatility = np.where(insufficient, np.nan, volatility)
+    sharpe = np.where(insufficient, np.nan, sharpe)
+    return twr, volatility, max_drawdown, sharpe
+
+
+def compute_all(now=None):
+    """Compute and store PortfolioAnalytics for every user in one pass.
+
+    Holdings are loaded as a (users x stocks) share matrix and prices as a
+    (stocks x time) matrix, so every user's value series is one matrix
+    product. Trades inside the lookback window are replayed backwards from
+    the current holdings, so each sample values what the user held then and
+    outside money is kept out of the returns. Returns the number of users
+    processed.
+    """
+    now = now or timezone.now()
+    days = lookback_days()
+    step = sample_minutes() * 60
+
+    users = list(User.objects.order_by('id').values_list('id', 'balance', 'realized_pnl', 'analytics_net_worth'))
+    if not users:
+        return 0
+    stocks = list(Stock.objects.order_by('id').values_list('id', 'price'))
+
+    user_index = {user_id: i for i, (user_id, *_) in enumerate(users)}
+    stock_index = {stock_id: i for i, (stock_id, _) in enumerate(stocks)}
+    stock_ids = [stock_id for stock_id, _ in stocks]
+    current_prices = np.array([price for _, price in stocks], dtype=float)
+    balances = np.array([balance or 0.0 for _, balance, _, _ in users], dtype=float)
+    realized = np.array([pnl or 0.0 for _, _, pnl, _ in users], dtype=float)
+
+    shares = np.zeros((len(users), len(stocks)))
+    costs = np.zeros(len(users))
+    holding_rows = list(Holding.objects.filter(shares__gt=0).values_list('user_id', 'stock_id', 'shares', 'cost_basis'))
+    if holding_rows:
+        h = np.array([(user_index[u], stock_index[s], n, c) for u, s, n, c in holding_rows], dtype=float)
+        u_idx, s_idx = h[:, 0].astype(np.int64), h[:, 1].astype(np.int64)
+        np.add.at(shares, (u_idx, s_idx), h[:, 2])
+        costs = np.bincount(u_idx, weights=h[:, 3], minlength=len(users))
+
+    end = now.timestamp()
+    grid = np.arange(end - days * 86400, end, step, dtype=float)
+    times = np.append(grid, end)
+    prices = price_matrix(stock_ids, grid)
+    # Stocks without history are valued at their current price throughout,
+    # and the live price is appended as the final sample.
+    prices = np.where(np.isnan(prices), current_prices[:, None], prices)
+    prices = np.hstack([prices, current_prices[:, None]])
+    cash_after, stocks_after, flows = replay_trades(user_index, stock_index, times, prices)
+
+    position_values = shares * current_prices[None, :]
+    stocks_value = position_values.sum(axis=1)
+    net_worth = balances + stocks_value
+    positions = np.count_nonzero(shares, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        largest_weight = np.where(stocks_value > 0, position_values.max(axis=1, initial=0.0) / stocks_value, 0.0)
+
+    values = (balances[:, None] - cash_after) + (shares @ prices - stocks_after)
+    twr, volatility, max_drawdown, sharpe = series_stats(values, 86400 / step, flows)
+
+    def _opt(x):
+        return None if np.isnan(x) else round(float(x), 6)
+
+    records = [
+        PortfolioAnalytics(
+            user_id=user_id,
+            computed_at=now,
+            lookback_days=days,
+            balance=round(float(balances[i]), 2),
+            stocks_value=round(float(stocks_value[i]), 2),
+            net_worth=round(float(net_worth[i]), 2),
+            cost_basis=round(float(costs[i]), 2),
+            realized_pnl=round(float(realized[i]), 2),
+            unrealized_pnl=round(float(stocks_value[i] - costs[i]), 2),
+            positions=int(positions[i]),
+            largest_position_weight=round(float(largest_weight[i]), 4),
+            time_weighted_return=_opt(twr[i]),
+            volatility=_opt(volatility[i]),
+            max_drawdown=_opt(max_drawdown[i]),
+            sharpe_ratio=_opt(sharpe[i]),
+        )
+        for i, (user_id, *_) in enumerate(users)
+    ]
+
+    update_fields = [f.name for f in PortfolioAnalytics._meta.concrete_fields if f.name not in ('id', 'user')]
+    PortfolioAnalytics.objects.bulk_create(
+        records,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=update_fields,
+    )
+    # The admin user list sorts on the copy kept on the user row.
+    moved = [
+        User(id=user_id, analytics_net_worth=record.net_worth)
+        for (user_id, _, _, stored), record in zip(users, records)
+        if stored != record.net_worth
+    ]
+    User.objects.bulk_update(moved, ['analytics_net_worth'], batch_size=1000)
+    return len(records)
@@ -0,0 +1,124 @@
+"""
+File: engine.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: The market tick: move every stock and process what the price moves trigger.
+"""
+
+
+import numpy as np
+from django.db import transaction
+
+from market import activity, alerts, history, loans, markets, ohlc, orders, prices, pricing, scheduling
+from market.models import Stock
+
+
+# Price points per history write while replaying missed ticks.
+CATCH_UP_WRITE_SIZE = 50000
+
+
+def _shard_stocks(shard, shards, market_ids=None):
+    """Return (stocks of `shard` in `market_ids` (every market when None), every sector in use)."""
+    stocks = list(Stock.objects.all())
+    all_sectors = {stock.sector for stock in stocks}
+    if market_ids is not None:
+        wanted = set(market_ids)
+        stocks = [stock for stock in stocks if stock.market_id in wanted]
+    if shards > 1:
+        stocks = [stock for stock in stocks if scheduling.shard_of(stock.symbol, shards) == shard]
+    return stocks, all_sectors
+
+
+def tick(shard=0, shards=1, sequence=None, now=None):
+    """Run one market tick and return (stocks updated, alerts fired, orders filled, orders rejected).
+
+    New prices come from one draw of the configured price model and are
+    written through a single price batch. Every market due at `sequence`
+    moves in the same pass. With `shards` > 1 only the stocks of `shard` (by
+    symbol hash) are moved; every shard of the same tick `sequence` shares
+    its market-wide randomness, and only shard 0 runs the market-wide
+    activity and 24h price range rollups and loan settlement.
+    """
+    stocks, all_sectors = _shard_stocks(shard, shards, markets.due(sequence))
+
+    fixed = pricing.ensure_symmetric_volatility(stocks)
+    if fixed:
+        Stock.objects.bulk_update(fixed, ['volatility_min', 'volatility_max'])
+
+    common_rng = np.random.default_rng(sequence) if sequence is not None else None
+    universe = pricing.Universe.from_stocks(stocks, all_sectors)
+    new_prices = pricing.get_model().next_prices(universe, common_rng=common_rng)
+    with prices.batch('tick', now=now) as changes:
+        for stock, price in zip(stocks, new_prices.tolist()):
+            prices.set_price(stock, price)
+
+    if shard == 0:
+        activity.rollup()
+        ohlc.rollup()
+        loans.settle()
+    return len(stocks), changes.alerts_fired, changes.orders_filled, changes.orders_rejected
+
+
+def catch_up(last_sequence, sequence, shard=0, shards=1, limit=None):
+    """Replay the ticks missed between `last_sequence` and `sequence` and return how many.
+
+    The missed periods (at most `limit`, the most recent ones) are simulated
+    as one (ticks x stocks) price path from a single draw of the price
+    model, stamped with each period's start time. Every point but the last
+    is written straight to history in bulk. Alerts and orders are checked
+    against each stock's highest and lowest price on the path, so a trigger
+    crossed mid-replay fires at the step that crossed it even if the price
+    moved back since. The last point then goes through the price pipeline,
+    so stocks and the market version move once, to where the market would
+    be now. A market that only ticks every n base ticks moves on its due
+    periods alone.
+    """
+    limit = scheduling.catch_up_limit() if limit is None else limit
+    if not last_sequence or limit <= 0:
+        return 0
+    first = max(last_sequence + 1, sequence - limit)
+    steps = sequence - first
+    if steps <= 0:
+        return 0
+
+    stocks, all_sectors = _shard_stocks(shard, shards)
+    if not stocks:
+        return 0
+    fixed = pricing.ensure_symmetric_volatility(stocks)
+    if fixed:
+        Stock.objects.bulk_update(fixed, ['volatility_min', 'volatility_max'])
+
+    # Seeded from the first replayed period so shards replaying the same
+    # range agree on the market-wide moves.
+    universe = pricing.Universe.from_stocks(stocks, all_sectors)
+    tick_every = markets.tick_every()
+    every = np.array([tick_every.get(stock.market_id, 1) for stock in stocks])
+    active = np.arange(first, sequence)[:, None] % every == 0
+    path = pricing.get_model().simulate(
+        universe, steps, common_rng=np.random.default_rng(first), active=active,
+    )
+    times = [scheduling.sequence_time(seq) for seq in range(first, sequence)]
+
+    ids = universe.ids.tolist()
+    rows_per_write = max(1, CATCH_UP_WRITE_SIZE // len(ids))
+    with transaction.atomic():
+        for start in range(0, steps - 1, rows_per_write):
+            end = min(start + rows_per_write, steps - 1)
+            points = [
+                (stock_id, times[step], price)
+                for step in range(start, end)
+                for stock_id, price, moved in zip(ids, path[step].tolist(), active[step].tolist())
+                if moved
+            ]
+            history.record_many(points)
+            ohlc.record(points)
+        # Checked from the pre-replay prices, before the last point moves the
+        # stocks; it was on the path, so the pipeline finds nothing left to fire.
+        alerts.evaluate_path(ids, universe.prices, path, times)
+        orders.match_path(ids, path, times)
+        moved = active.any(axis=0).tolist()
+        with prices.batch('catch-up', now=times[-1]):
+            for stock, price, stock_moved in zip(stocks, path[-1].tolist(), moved):
+                if stock_moved:
+                    prices.set_price(stock, price)
+    return steps
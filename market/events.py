@@ -0,0 +1,159 @@
+"""
+File: events.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Market event engine: cached event catalog, weighted sampling and bulk application.
+"""
+
+
+import random
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from market import prices
+from market.models import DEFAULT_MARKET_ID, MarketEvent, MarketEventApplication, Stock
+
+
+LEVELS = ('minor', 'moderate', 'major', 'severe')
+
+DEFAULT_LEVEL_WEIGHTS = {
+    'severe': 10,
+    'major': 15,
+    'moderate': 30,
+    'minor': 45,
+}
+
+
+class AliasSampler:
+    """Sample an index with probability proportional to its weight in O(1).
+
+    Vose's alias method: after an O(n) setup, each draw is one uniform
+    column pick plus one biased coin flip.
+    """
+
+    def __init__(self, weights):
+        total = float(sum(weights))
+        if not weights or total <= 0:
+            raise ValueError("Alias sampler needs at least one positive weight")
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng=random):
+        column = rng.randrange(len(self.prob))
+        return column if rng.random() < self.prob[column] else self.alias[column]
+
+
+def level_weights():
+    """Return {level: weight} from MARKET_EVENT_LEVEL_WEIGHTS, falling back to the defaults."""
+    configured = getattr(settings, 'MARKET_EVENT_LEVEL_WEIGHTS', None) or DEFAULT_LEVEL_WEIGHTS
+    unknown = set(configured) - set(LEVELS)
+    if unknown:
+        raise ValueError(f"Unknown impact levels in MARKET_EVENT_LEVEL_WEIGHTS: {', '.join(sorted(unknown))}")
+    return {level: float(weight) for level, weight in configured.items() if float(weight) > 0}
+
+
+class EventCatalog:
+    """Every MarketEvent grouped by impact level, with a sampler over levels.
+
+    Levels without any events are left out of the sampler, so their weight
+    is spread over the remaining levels.
+    """
+
+    def __init__(self, events, weights):
+        self.by_level = {}
+        for event in events:
+            self.by_level.setdefault(event.impact_level, []).append(event)
+        self.levels = [level for level in weights if self.by_level.get(level)]
+        self.sampler = AliasSampler([weights[level] for level in self.levels]) if self.levels else None
+
+    def sample_level(self, rng=random):
+        if self.sampler is None:
+            return None
+        return self.levels[self.sampler.sample(rng)]
+
+    def sample_event(self, level=None, rng=random):
+        """Return a random event of `level` (sampled by weight when None), or None."""
+        level = level or self.sample_level(rng)
+        events = self.by_level.get(level)
+        if not events:
+            return None
+        return events[rng.randrange(len(events))]
+
+
+_catalog = None
+
+
+def catalog():
+    """Return the process-wide event catalog, loading it on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = EventCatalog(list(MarketEvent.objects.all()), level_weights())
+    return _catalog
+
+
+def reset_catalog():
+    global _catalog
+    _catalog = None
+
+
+@receiver(post_save, sender=MarketEvent)
+@receiver(post_delete, sender=MarketEvent)
+def _invalidate_catalog(sender, **kwargs):
+    reset_catalog()
+
+
+def random_stocks(count, rng=random, market_id=DEFAULT_MARKET_ID):
+    """Return up to `count` distinct random stocks of a market, each fetched by an indexed random offset."""
+    listed = Stock.objects.filter(market_id=market_id)
+    total = listed.count()
+    offsets = rng.sample(range(total), min(count, total))
+    stocks = []
+    for offset in offsets:
+        stock = listed.order_by('id')[offset:offset + 1].first()
+        if stock is not None:
+            stocks.append(stock)
+    return stocks
+
+
+def apply_events(count=1, level=None, stocks=None, now=None, rng=random, market_id=DEFAULT_MARKET_ID):
+    """Apply `count` random events to random stocks of market `market_id` in one bulk write.
+
+    `level` forces the impact level instead of sampling it by weight, and
+    `stocks` forces the targets (one event per stock, in any market). Price changes go
+    through one price batch and event applications are written with a
+    single bulk insert. Returns a list of (event, stock, old_price); empty
+    if there are no events or stocks.
+    """
+    events = catalog()
+    targets = list(stocks) if stocks is not None else random_stocks(count, rng, market_id)
+
+    applied = []
+    with prices.batch('event', now=now):
+        for stock in targets:
+            event = events.sample_event(level, rng)
+            if event is None:
+                break
+            old_price = stock.price
+            impact = rng.uniform(event.impact_low, event.impact_high)
+            prices.set_price(stock, max(0.1, stock.price * (1 + impact)))
+            applied.append((event, stock, old_price))
+
+        MarketEventApplication.objects.bulk_create(
+            MarketEventApplication(event=event, stock=stock) for event, stock, _ in applied
+        )
+    return applied
@@ -0,0 +1,154 @@
+"""
+File: exports.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Streaming export of stock price history as CSV or a compact columnar binary format.
+
+Both formats are produced by generators over history.iter_points, which reads
+through a server-side cursor, so an export of any size runs in constant
+memory and can be handed straight to a StreamingHttpResponse or a file.
+
+The columnar format is:
+
+- the magic bytes and a format version byte;
+- a length-prefixed JSON header: {"symbols": {stock_id: symbol}, "since", "until"};
+- blocks of up to BLOCK_SIZE points, each a count followed by three
+  length-prefixed, zlib-compressed little-endian columns: stock ids (int32),
+  timestamps in epoch milliseconds (int64) and prices (float64);
+- a zero count marking the end.
+
+Each column decodes with a single numpy.frombuffer call.
+"""
+
+
+import csv
+import io
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from market import history
+from market.models import DEFAULT_MARKET_ID, Stock
+
+
+FORMATS = ('csv', 'columnar')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'columnar': 'application/octet-stream',
+}
+
+EXTENSIONS = {
+    'csv': 'csv',
+    'columnar': 'peelcol',
+}
+
+MAGIC = b'PEELCOL'
+FORMAT_VERSION = 1
+
+BLOCK_SIZE = 65536
+
+# Rows written per yielded CSV chunk.
+CSV_ROWS_PER_CHUNK = 1000
+
+_LENGTH = struct.Struct('<I')
+
+_COLUMNS = (('stock_id', '<i4'), ('timestamp', '<i8'), ('price', '<f8'))
+
+
+def resolve_symbols(symbols=None, market_id=DEFAULT_MARKET_ID):
+    """Return ({stock_id: symbol}, [unknown symbols]) for `symbols` in a market, or its every stock when empty."""
+    qs = Stock.objects.filter(market_id=market_id).order_by('symbol')
+    wanted = [symbol.strip().upper() for symbol in symbols or () if symbol.strip()]
+    if wanted:
+        qs = qs.filter(symbol__in=wanted)
+    found = dict(qs.values_list('id', 'symbol'))
+    missing = sorted(set(wanted) - set(found.values()))
+    return found, missing
+
+
+def iter_csv(symbols, since=None, until=None):
+    """Yield CSV text chunks of symbol,timestamp,price for the stocks in `symbols`.
+
+    `symbols` maps stock id to symbol.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['symbol', 'timestamp', 'price'])
+    rows = 0
+    for stock_id, ts, price in history.iter_points(list(symbols), since=since, until=until):
+        writer.writerow([symbols[stock_id], ts.isoformat(), price])
+        rows += 1
+        if rows % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _block(stock_ids, millis, prices):
+    out = bytearray(_LENGTH.pack(len(stock_ids)))
+    for values, (_, dtype) in zip((stock_ids, millis, prices), _COLUMNS):
+        data = zlib.compress(np.asarray(values, dtype=dtype).tobytes())
+        out += _LENGTH.pack(len(data)) + data
+    return bytes(out)
+
+
+def iter_columnar(symbols, since=None, until=None):
+    """Yield the columnar binary export of the stocks in `symbols` as bytes chunks."""
+    header = json.dumps({
+        'symbols': {str(stock_id): symbol for stock_id, symbol in symbols.items()},
+        'since': since.isoformat() if since else None,
+        'until': until.isoformat() if until else None,
+    }).encode('utf-8')
+    yield MAGIC + bytes([FORMAT_VERSION]) + _LENGTH.pack(len(header)) + header
+
+    stock_ids, millis, prices = [], [], []
+    for stock_id, ts, price in history.iter_points(list(symbols), since=since, until=until):
+        stock_ids.append(stock_id)
+        millis.append(round(ts.timestamp() * 1000))
+        prices.append(price)
+        if len(stock_ids) >= BLOCK_SIZE:
+            yield _block(stock_ids, millis, prices)
+            stock_ids, millis, prices = [], [], []
+    if stock_ids:
+        yield _block(stock_ids, millis, prices)
+    yield _LENGTH.pack(0)
+
+
+def read_columnar(source):
+    """Read a columnar export from the binary file `source`.
+
+    Returns (header, blocks), where blocks yields one
+    {'stock_id', 'timestamp', 'price'} dict of NumPy arrays per block.
+    """
+    prefix = source.read(len(MAGIC) + 1)
+    if prefix[:len(MAGIC)] != MAGIC or prefix[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError("Not a columnar history export")
+    (size,) = _LENGTH.unpack(source.read(_LENGTH.size))
+    header = json.loads(source.read(size))
+
+    def blocks():
+        while True:
+            (count,) = _LENGTH.unpack(source.read(_LENGTH.size))
+            if not count:
+                return
+            block = {}
+            for name, dtype in _COLUMNS:
+                (size,) = _LENGTH.unpack(source.read(_LENGTH.size))
+                block[name] = np.frombuffer(zlib.decompress(source.read(size)), dtype=dtype)
+            yield block
+
+    return header, blocks()
+
+
+def stream(fmt, symbols, since=None, until=None):
+    """Return the chunk generator for export format `fmt`."""
+    if fmt == 'csv':
+        return iter_csv(symbols, since, until)
+    if fmt == 'columnar':
+        return iter_columnar(symbols, since, until)
+    raise ValueError(f"Unknown export format: {fmt}")
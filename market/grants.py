@@ -0,0 +1,107 @@
+"""
+File: grants.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Bulk admin grants of money and shares to many users at once.
+"""
+
+
+import random
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Sum
+
+from accounts.models import User
+from market import ledger
+from market.models import Holding, Stock, Trade
+
+
+# Filters accepted in a bulk request's "filter" object, mapped to ORM lookups.
+USER_FILTERS = {
+    'balance_lt': 'balance__lt',
+    'balance_gte': 'balance__gte',
+    'email_endswith': 'email__iendswith',
+    'has_loan': 'has_loan',
+    'is_staff': 'is_staff',
+    'joined_after': 'date_joined__gte',
+    'market': 'market__slug',
+}
+
+
+def select_users(payload):
+    """Return the ids of the users a bulk request targets.
+
+    The request names them either with "user_ids" (a list) or with
+    "filter" (an object of USER_FILTERS; {} means every user). Raises
+    ValueError for anything else, including filter values of the wrong type.
+    """
+    if 'user_ids' in payload:
+        user_ids = payload['user_ids']
+        if not isinstance(user_ids, list) or not user_ids:
+            raise ValueError("user_ids must be a non-empty list")
+        return list(User.objects.filter(id__in=[int(i) for i in user_ids]).order_by('id').values_list('id', flat=True))
+
+    filters = payload.get('filter')
+    if not isinstance(filters, dict):
+        raise ValueError("Provide user_ids or a filter object")
+    unknown = set(filters) - set(USER_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+    lookups = {USER_FILTERS[name]: value for name, value in filters.items()}
+    try:
+        return list(User.objects.filter(**lookups).order_by('id').values_list('id', flat=True))
+    except ValidationError as e:
+        # Dates and booleans are checked by their fields when the query is built.
+        raise ValueError(f"Invalid filter value: {' '.join(e.messages)}") from e
+
+
+def grant_money(user_ids, amount, note=''):
+    """Credit `amount` to every user in `user_ids`; returns the number of users credited.
+
+    One ledger insert and one UPDATE ... SET balance = balance + amount.
+    """
+    ledger.post([ledger.cash(user_id, Trade.GRANT, amount, note=note) for user_id in user_ids])
+    return len(user_ids)
+
+
+def grant_random_shares(user_ids, num_stocks, shares_min, shares_max, note='', rng=None):
+    """Give each user `num_stocks` random stocks of their market with shares_min..shares_max shares each.
+
+    All grants go through one ledger post, so holdings are written with a
+    single bulk upsert. Returns {'users', 'holdings', 'shares', 'value'},
+    value being the grants at current prices.
+    """
+    rng = rng or random.Random()
+    markets = dict(User.objects.filter(id__in=user_ids).values_list('id', 'market_id'))
+    listed = Stock.objects.filter(market_id__in=set(markets.values())).order_by('id')
+    stocks = {}
+    for stock_id, market_id, price in listed.values_list('id', 'market_id', 'price'):
+        stocks.setdefault(market_id, []).append((stock_id, price))
+    if not stocks:
+        raise ValueError("No stocks available")
+
+    grants = []
+    value = 0.0
+    for user_id in user_ids:
+        market_stocks = stocks.get(markets.get(user_id), [])
+        for stock_id, price in rng.sample(market_stocks, min(num_stocks, len(market_stocks))):
+            shares = rng.randint(shares_min, shares_max)
+            grants.append(ledger.grant_shares(user_id, stock_id, shares, note=note))
+            value += shares * price
+
+    ledger.post(grants)
+    return {
+        'users': len(user_ids),
+        'holdings': len(grants),
+        'shares': sum(grant.shares for grant in grants),
+        'value': value,
+    }
+
+
+def totals(user_ids):
+    """Return (total cash, total stock value at current prices) of `user_ids`."""
+    cash = User.objects.filter(id__in=user_ids).aggregate(total=Sum('balance'))['total'] or 0.0
+    stocks = Holding.objects.filter(user_id__in=user_ids).aggregate(
+        total=Sum(F('shares') * F('stock__price'))
+    )['total'] or 0.0
+    return cash, stocks
@@ -0,0 +1,500 @@
+"""
+File: history.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Read/write API for stock price history over the row and chunk storage backends.
+
+Two backends are supported, selected with STOCK_HISTORY_BACKEND:
+
+- "rows" (default): one StockPriceHistory row per tick.
+- "chunks": one StockPriceChunk row per stock per time window, holding the
+  window's ticks as a delta-encoded, zlib-compressed array.
+
+Everything that reads or writes price history (the tick engine, views,
+management commands, analytics) goes through this module so it does not
+need to care which backend is active.
+"""
+
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+import uuid
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Q, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from market.models import Stock, StockPriceChunk, StockPriceHistory
+
+
+FORMAT_VERSION = 1
+
+# Prices are stored as integers of 1e-6 peels, timestamps as milliseconds.
+PRICE_SCALE = 1_000_000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def backend():
+    """Return the active history backend name ('rows' or 'chunks')."""
+    name = (getattr(settings, 'STOCK_HISTORY_BACKEND', 'rows') or 'rows').strip().lower()
+    if name not in ('rows', 'chunks'):
+        raise ValueError(f"Unknown STOCK_HISTORY_BACKEND: {name}")
+    return name
+
+
+def chunk_seconds():
+    """Return the length of a chunk window in seconds."""
+    return int(getattr(settings, 'STOCK_HISTORY_CHUNK_SECONDS', 3600))
+
+
+# ---------------------------------------------------------------------------
+# Chunk encoding
+# ---------------------------------------------------------------------------
+
+def _to_millis(moment):
+    return int((moment - _EPOCH) // timedelta(milliseconds=1))
+
+
+def _from_millis(millis):
+    return _EPOCH + timedelta(milliseconds=millis)
+
+
+def _write_varint(out, value):
+    """Append `value` to `out` as a zigzag LEB128 varint."""
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(buf):
+    """Yield the zigzag LEB128 varints packed in `buf`."""
+    value = shift = 0
+    for byte in buf:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        yield (value >> 1) ^ -(value & 1)
+        value = shift = 0
+
+
+def encode_points(points):
+    """Pack [(timestamp, price)] (oldest first) into a compressed blob.
+
+    Both columns are delta-encoded against the previous point and written as
+    varints, so a steady one-tick-per-minute series costs a few bytes per point
+    before compression.
+    """
+    out = bytearray()
+    _write_varint(out, len(points))
+    prev_ts = prev_price = 0
+    for ts, price in points:
+        millis = _to_millis(ts)
+        scaled = round(price * PRICE_SCALE)
+        _write_varint(out, millis - prev_ts)
+        _write_varint(out, scaled - prev_price)
+        prev_ts, prev_price = millis, scaled
+    return bytes([FORMAT_VERSION]) + zlib.compress(bytes(out))
+
+
+def decode_points(blob):
+    """Unpack a blob produced by encode_points into [(timestamp, price)]."""
+    blob = bytes(blob)
+    if not blob:
+        return []
+    if blob[0] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported history chunk format: {blob[0]}")
+
+    values = _read_varints(zlib.decompress(blob[1:]))
+    count = next(values, 0)
+    points = []
+    ts = price = 0
+    for _ in range(count):
+        ts += next(values)
+        price += next(values)
+        points.append((_from_millis(ts), price / PRICE_SCALE))
+    return points
+
+
+def window_start(moment):
+    """Return the start of the chunk window containing `moment`."""
+    size = chunk_seconds() * 1000
+    millis = _to_millis(moment)
+    return _from_millis(millis - millis % size)
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def record(stock, price, timestamp=None):
+    """Record a single price point for `stock`."""
+    record_many([(stock.id, timestamp or timezone.now(), price)])
+
+
+def record_many(points):
+    """Record many price points at once.
+
+    `points` is an iterable of (stock_id, timestamp, price). The rows backend
+    writes them with one bulk insert; the chunk backend appends them to the
+    matching window chunks with one read and one bulk write. This only
+    stores points; price changes go through market.prices, which also bumps
+    the market version. Points written at or before a stock's latest point
+    leave a backfill mark once committed (see backfill_mark).
+    """
+    points = list(points)
+    if not points:
+        return
+
+    spans = {}
+    for stock_id, ts, _ in points:
+        first, last = spans.get(stock_id, (ts, ts))
+        spans[stock_id] = (min(first, ts), max(last, ts))
+    # Marked once the points are visible, so a reader that sees the mark
+    # also sees the points.
+    transaction.on_commit(lambda: _mark_written(spans))
+
+    if backend() == 'rows':
+        StockPriceHistory.objects.bulk_create([
+            StockPriceHistory(stock_id=stock_id, timestamp=ts, price=price)
+            for stock_id, ts, price in points
+        ])
+    else:
+        for attempt in range(3):
+            try:
+                _append_to_chunks(points)
+                break
+            except IntegrityError:
+                # Another writer created one of our window chunks concurrently;
+                # re-read and append to it instead.
+                if attempt == 2:
+                    raise
+
+
+def _append_to_chunks(points):
+    grouped = {}
+    for stock_id, ts, price in points:
+        grouped.setdefault((stock_id, window_start(ts)), []).append((ts, price))
+
+    stock_ids = {key[0] for key in grouped}
+    windows = {key[1] for key in grouped}
+
+    with transaction.atomic():
+        existing = {
+            (chunk.stock_id, chunk.window_start): chunk
+            for chunk in StockPriceChunk.objects.select_for_update().filter(
+                stock_id__in=stock_ids, window_start__in=windows,
+            )
+        }
+
+        to_update, to_create = [], []
+        for (stock_id, start), new_points in grouped.items():
+            chunk = existing.get((stock_id, start))
+            if chunk is None:
+                chunk = StockPriceChunk(stock_id=stock_id, window_start=start)
+                merged = sorted(new_points, key=lambda p: p[0])
+                to_create.append(chunk)
+            else:
+                new_points.sort(key=lambda p: p[0])
+                merged = decode_points(chunk.data)
+                in_order = merged and new_points[0][0] >= merged[-1][0]
+                merged.extend(new_points)
+                if not in_order:
+                    merged.sort(key=lambda p: p[0])
+                to_update.append(chunk)
+            _fill_chunk(chunk, merged)
+
+        if to_update:
+            StockPriceChunk.objects.bulk_update(
+                to_update, ['data', 'count', 'first_timestamp', 'last_timestamp', 'last_price'],
+            )
+        if to_create:
+            StockPriceChunk.objects.bulk_create(to_create)
+
+
+def _fill_chunk(chunk, points):
+    chunk.data = encode_points(points)
+    chunk.count = len(points)
+    chunk.first_timestamp = points[0][0]
+    chunk.last_timestamp = points[-1][0]
+    chunk.last_price = points[-1][1]
+
+
+def count(stock):
+    """Return the number of stored points for `stock`."""
+    if backend() == 'rows':
+        return stock.history.count()
+    return StockPriceChunk.objects.filter(stock=stock).aggregate(total=Sum('count'))['total'] or 0
+
+
+def trim(stock, keep):
+    """Delete all but the `keep` most recent points of `stock`. Returns the number deleted."""
+    if backend() == 'rows':
+        keep_ids = list(stock.history.order_by('-timestamp').values_list('id', flat=True)[:keep])
+        return stock.history.exclude(id__in=keep_ids).delete()[0]
+
+    deleted = 0
+    kept = 0
+    with transaction.atomic():
+        chunks = StockPriceChunk.objects.select_for_update().filter(stock=stock).order_by('-window_start')
+        stale_ids = []
+        for chunk in chunks:
+            if kept >= keep:
+                stale_ids.append(chunk.id)
+                deleted += chunk.count
+                continue
+            if kept + chunk.count > keep:
+                points = decode_points(chunk.data)
+                remaining = keep - kept
+                deleted += len(points) - remaining
+                _fill_chunk(chunk, points[-remaining:])
+                chunk.save()
+            kept += chunk.count
+        if stale_ids:
+            StockPriceChunk.objects.filter(id__in=stale_ids).delete()
+    return deleted
+
+
+def trim_many(keep, stock_ids=None):
+    """Delete all but the `keep` most recent points of every stock, or of `stock_ids`. Returns the number deleted.
+
+    The rows backend ranks points per stock with ROW_NUMBER() and deletes
+    in one statement; the chunk backend trims stock by stock.
+    """
+    if backend() == 'rows':
+        qs = StockPriceHistory.objects.all()
+        if stock_ids is not None:
+            qs = qs.filter(stock_id__in=list(stock_ids))
+        stale = qs.annotate(
+            newer=Window(RowNumber(), partition_by=[F('stock_id')], order_by=F('timestamp').desc()),
+        ).filter(newer__gt=keep).values('id')
+        return StockPriceHistory.objects.filter(id__in=stale).delete()[0]
+
+    stocks = StockPriceChunk.objects.all()
+    if stock_ids is not None:
+        stocks = stocks.filter(stock_id__in=list(stock_ids))
+    return sum(
+        trim(Stock(id=stock_id), keep)
+        for stock_id in stocks.order_by('stock_id').values_list('stock_id', flat=True).distinct()
+    )
+
+
+# ---------------------------------------------------------------------------
+# Backfill marks. Per stock, the cache keeps the latest timestamp written and,
+# whenever a write lands at or before it (or it is unknown), the earliest such
+# timestamp under a new token. Caches of derived series (market.indicators) compare the mark with
+# the one they were built under to find history they already covered.
+# ---------------------------------------------------------------------------
+
+def _latest_key(stock_id):
+    return f"history:latest:{stock_id}"
+
+
+def _backfill_key(stock_id):
+    return f"history:backfill:{stock_id}"
+
+
+def _mark_written(spans):
+    """Advance the latest-written marks for {stock_id: (first, last)} and mark backfills."""
+    latest = cache.get_many([_latest_key(stock_id) for stock_id in spans])
+    marks = {}
+    backfilled = {}
+    for stock_id, (first, last) in spans.items():
+        previous = latest.get(_latest_key(stock_id))
+        # Without a latest mark (never written, or evicted) any cached
+        # series could predate this write, so it counts as a backfill.
+        if previous is None or first <= previous:
+            backfilled[stock_id] = first
+        marks[_latest_key(stock_id)] = last if previous is None else max(last, previous)
+
+    if backfilled:
+        earlier = cache.get_many([_backfill_key(stock_id) for stock_id in backfilled])
+        token = uuid.uuid4().hex
+        for stock_id, first in backfilled.items():
+            mark = earlier.get(_backfill_key(stock_id))
+            # Keep the earliest point ever backfilled: a cache built under an
+            # older token may not have seen that write either.
+            earliest = min(first, mark['earliest']) if mark else first
+            marks[_backfill_key(stock_id)] = {'token': token, 'earliest': earliest}
+    cache.set_many(marks, timeout=None)
+
+
+def backfill_mark(stock):
+    """Return {'token', 'earliest'} for the latest backfill into `stock`'s history, or None."""
+    return cache.get(_backfill_key(stock.id))
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def read(stock, limit=None, since=None, until=None):
+    """Return [(timestamp, price)] for `stock`, oldest first.
+
+    With `limit`, only the most recent `limit` points (within the optional
+    since/until range) are returned.
+    """
+    if backend() == 'rows':
+        qs = stock.history.all()
+        if since is not None:
+            qs = qs.filter(timestamp__gte=since)
+        if until is not None:
+            qs = qs.filter(timestamp__lte=until)
+        rows = qs.order_by('-timestamp').values_list('timestamp', 'price')
+        if limit is not None:
+            rows = rows[:limit]
+        points = list(rows)
+        points.reverse()
+        return points
+
+    qs = StockPriceChunk.objects.filter(stock=stock)
+    if since is not None:
+        qs = qs.filter(last_timestamp__gte=since)
+    if until is not None:
+        qs = qs.filter(first_timestamp__lte=until)
+
+    collected = []
+    total = 0
+    for blob in qs.order_by('-window_start').values_list('data', flat=True).iterator(chunk_size=50):
+        points = [
+            p for p in decode_points(blob)
+            if (since is None or p[0] >= since) and (until is None or p[0] <= until)
+        ]
+        collected.append(points)
+        total += len(points)
+        if limit is not None and total >= limit:
+            break
+
+    points = [p for chunk in reversed(collected) for p in chunk]
+    if limit is not None:
+        points = points[-limit:] if limit else []
+    return points
+
+
+def recent_prices(stock_ids, n=2):
+    """Return {stock_id: [price, ...]} with the last `n` prices per stock, oldest first.
+
+    Uses one windowed query for all stocks instead of one query per stock.
+    """
+    stock_ids = list(stock_ids)
+    result = {stock_id: [] for stock_id in stock_ids}
+    if not stock_ids:
+        return result
+
+    if backend() == 'rows':
+        rows = (
+            StockPriceHistory.objects.filter(stock_id__in=stock_ids)
+            .annotate(rn=Window(RowNumber(), partition_by=[F('stock_id')], order_by=F('timestamp').desc()))
+            .filter(rn__lte=n)
+            .order_by('stock_id', 'timestamp')
+            .values_list('stock_id', 'price')
+        )
+        for stock_id, price in rows:
+            result[stock_id].append(price)
+        return result
+
+    # `newer` counts the points in a chunk and every later chunk of its
+    # stock; the chunks holding the last n prices are those where the later
+    # chunks alone hold fewer than n.
+    rows = (
+        StockPriceChunk.objects.filter(stock_id__in=stock_ids)
+        .annotate(newer=Window(Sum('count'), partition_by=[F('stock_id')], order_by=F('window_start').desc()))
+        .filter(newer__lt=n + F('count'))
+        .order_by('stock_id', 'window_start')
+        .values_list('stock_id', 'data')
+    )
+    for stock_id, blob in rows:
+        result[stock_id].extend(price for _, price in decode_points(blob))
+    for stock_id, prices in result.items():
+        result[stock_id] = prices[-n:]
+    return result
+
+
+def latest_timestamp(stock):
+    """Return the timestamp of the most recent point of `stock`, or None."""
+    if backend() == 'rows':
+        return stock.history.order_by('-timestamp').values_list('timestamp', flat=True).first()
+    return (
+        StockPriceChunk.objects.filter(stock=stock)
+        .order_by('-window_start')
+        .values_list('last_timestamp', flat=True)
+        .first()
+    )
+
+
+def iter_points(stock_ids=None, since=None, until=None, chunk_size=2000):
+    """Stream (stock_id, timestamp, price) ordered by stock then time.
+
+    Rows are pulled through a server-side cursor, so memory stays constant
+    regardless of how much history matches.
+    """
+    if backend() == 'rows':
+        qs = StockPriceHistory.objects.all()
+        if stock_ids is not None:
+            qs = qs.filter(stock_id__in=list(stock_ids))
+        if since is not None:
+            qs = qs.filter(timestamp__gte=since)
+        if until is not None:
+            qs = qs.filter(timestamp__lte=until)
+        yield from qs.order_by('stock_id', 'timestamp').values_list(
+            'stock_id', 'timestamp', 'price'
+        ).iterator(chunk_size=chunk_size)
+        return
+
+    qs = StockPriceChunk.objects.all()
+    if stock_ids is not None:
+        qs = qs.filter(stock_id__in=list(stock_ids))
+    if since is not None:
+        qs = qs.filter(last_timestamp__gte=since)
+    if until is not None:
+        qs = qs.filter(first_timestamp__lte=until)
+    rows = qs.order_by('stock_id', 'window_start').values_list('stock_id', 'data')
+    for stock_id, blob in rows.iterator(chunk_size=max(1, chunk_size // 60)):
+        for ts, price in decode_points(blob):
+            if (since is None or ts >= since) and (until is None or ts <= until):
+                yield stock_id, ts, price
+
+
+def compact_rows(stock_ids=None, batch_size=5000):
+    """Copy StockPriceHistory rows into window chunks. Returns the number of points copied.
+
+    Rows at or before a stock's latest chunked point are skipped, so running
+    it again only packs the rows added since.
+    """
+    filters = Q()
+    if stock_ids is not None:
+        filters &= Q(stock_id__in=list(stock_ids))
+    packed = dict(
+        StockPriceChunk.objects.filter(filters)
+        .values('stock_id')
+        .annotate(last=Max('last_timestamp'))
+        .values_list('stock_id', 'last')
+    )
+    pending = ~Q(stock_id__in=list(packed))
+    for stock_id, last in packed.items():
+        pending |= Q(stock_id=stock_id, timestamp__gt=last)
+    rows = (
+        StockPriceHistory.objects.filter(filters & pending)
+        .order_by('stock_id', 'timestamp')
+        .values_list('stock_id', 'timestamp', 'price')
+        .iterator(chunk_size=batch_size)
+    )
+
+    copied = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _append_to_chunks(batch)
+            copied += len(batch)
+            batch = []
+    if batch:
+        _append_to_chunks(batch)
+        copied += len(batch)
+    return copied
@@ -0,0 +1,269 @@
+"""
+File: indicators.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Vectorized technical indicators over stock price history, with incremental caching.
+"""
+
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from django.core.cache import cache
+
+from market import history
+from market.models import MarketState
+
+
+KINDS = ('sma', 'ema', 'rsi', 'bollinger')
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+BOLLINGER_K = 2.0
+
+# Extra windows of history read on a cold cache so the recursive indicators
+# (EMA, RSI) have converged by the first returned point.
+WARMUP_WINDOWS = 10
+
+
+# ---------------------------------------------------------------------------
+# Indicator math. Every function takes a float64 array of prices (oldest
+# first) and returns arrays of the same length, NaN where not yet defined.
+# ---------------------------------------------------------------------------
+
+def sma(prices, window):
+    """Simple moving average."""
+    out = np.full(len(prices), np.nan)
+    if len(prices) >= window:
+        out[window - 1:] = sliding_window_view(prices, window).mean(axis=1)
+    return out
+
+
+def bollinger(prices, window, k=BOLLINGER_K):
+    """Bollinger bands: (middle, upper, lower) around the SMA at k standard deviations."""
+    middle = np.full(len(prices), np.nan)
+    spread = np.full(len(prices), np.nan)
+    if len(prices) >= window:
+        windows = sliding_window_view(prices, window)
+        middle[window - 1:] = windows.mean(axis=1)
+        spread[window - 1:] = k * windows.std(axis=1)
+    return middle, middle + spread, middle - spread
+
+
+def _smooth(values, alpha, seed):
+    """Exponential smoothing y[i] = (1 - alpha) * y[i-1] + alpha * values[i], starting from `seed`.
+
+    The recursion is unrolled in closed form over blocks short enough that
+    (1 - alpha) ** -block stays well inside float range, so each block is a
+    handful of array operations instead of a Python loop per element.
+    """
+    out = np.empty(len(values))
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+
+    block = max(1, int(30.0 / -np.log(decay)))
+    prev = seed
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        steps = np.arange(len(chunk))
+        weights = decay ** steps
+        acc = np.cumsum(chunk / weights)
+        smoothed = decay * weights * prev + alpha * weights * acc
+        out[start:start + len(chunk)] = smoothed
+        prev = smoothed[-1]
+    return out
+
+
+def ema(prices, window):
+    """Exponential moving average seeded with the SMA of the first window."""
+    out = np.full(len(prices), np.nan)
+    if len(prices) >= window:
+        seed = prices[:window].mean()
+        out[window - 1] = seed
+        out[window:] = _smooth(prices[window:], 2.0 / (window + 1), seed)
+    return out
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        out = 100.0 - 100.0 / (1.0 + rs)
+    return np.where(avg_loss == 0, 100.0, out)
+
+
+def rsi(prices, window):
+    """Relative strength index with Wilder smoothing.
+
+    Returns (rsi, avg_gain, avg_loss); the averages are needed to extend the
+    series incrementally.
+    """
+    n = len(prices)
+    out = np.full(n, np.nan)
+    avg_gain = np.full(n, np.nan)
+    avg_loss = np.full(n, np.nan)
+    if n > window:
+        deltas = np.diff(prices)
+        gains = np.clip(deltas, 0, None)
+        losses = np.clip(-deltas, 0, None)
+        alpha = 1.0 / window
+        seed_gain, seed_loss = gains[:window].mean(), losses[:window].mean()
+        avg_gain[window] = seed_gain
+        avg_loss[window] = seed_loss
+        avg_gain[window + 1:] = _smooth(gains[window:], alpha, seed_gain)
+        avg_loss[window + 1:] = _smooth(losses[window:], alpha, seed_loss)
+        out[window:] = _rsi_from_averages(avg_gain[window:], avg_loss[window:])
+    return out, avg_gain, avg_loss
+
+
+# ---------------------------------------------------------------------------
+# Full computation and incremental extension
+# ---------------------------------------------------------------------------
+
+def _compute(kind, prices, window):
+    """Return (series, state) for `kind` over the full price array."""
+    tail = prices[-(window + 1):].tolist()
+    state = {'tail': tail, 'seen': len(prices)}
+
+    if kind == 'sma':
+        return {'sma': sma(prices, window)}, state
+    if kind == 'bollinger':
+        middle, upper, lower = bollinger(prices, window)
+        return {'middle': middle, 'upper': upper, 'lower': lower}, state
+    if kind == 'ema':
+        values = ema(prices, window)
+        if len(prices) >= window:
+            state['ema'] = float(values[-1])
+        return {'ema': values}, state
+    if kind == 'rsi':
+        values, avg_gain, avg_loss = rsi(prices, window)
+        if len(prices) > window:
+            state['avg_gain'] = float(avg_gain[-1])
+            state['avg_loss'] = float(avg_loss[-1])
+        return {'rsi': values}, state
+    raise ValueError(f"Unknown indicator: {kind}")
+
+
+def _extend(kind, state, new_prices, window):
+    """Return (new_series, state) for `new_prices` appended after `state`.
+
+    Window-based indicators only need the last `window` prices kept in the
+    state; the recursive ones (EMA, RSI) continue from their last smoothed
+    values. While an indicator is still warming up it is simply recomputed
+    over the short tail.
+    """
+    tail = np.asarray(state['tail'], dtype=float)
+    combined = np.concatenate([tail, new_prices])
+    warm = ('ema' in state) if kind == 'ema' else ('avg_gain' in state) if kind == 'rsi' else True
+
+    if not warm or kind in ('sma', 'bollinger'):
+        series, new_state = _compute(kind, combined, window)
+        new_state['seen'] = state['seen'] + len(new_prices)
+        return {name: values[-len(new_prices):] for name, values in series.items()}, new_state
+
+    new_state = {'tail': combined[-(window + 1):].tolist(), 'seen': state['seen'] + len(new_prices)}
+    if kind == 'ema':
+        values = _smooth(new_prices, 2.0 / (window + 1), state['ema'])
+        new_state['ema'] = float(values[-1])
+        return {'ema': values}, new_state
+
+    deltas = np.diff(combined[len(tail) - 1:])
+    alpha = 1.0 / window
+    avg_gain = _smooth(np.clip(deltas, 0, None), alpha, state['avg_gain'])
+    avg_loss = _smooth(np.clip(-deltas, 0, None), alpha, state['avg_loss'])
+    new_state['avg_gain'] = float(avg_gain[-1])
+    new_state['avg_loss'] = float(avg_loss[-1])
+    return {'rsi': _rsi_from_averages(avg_gain, avg_loss)}, new_state
+
+
+# ---------------------------------------------------------------------------
+# Cached series
+# ---------------------------------------------------------------------------
+
+def _cache_key(stock, kind, window, points):
+    return f"indicators:{stock.id}:{kind}:{window}:{points}"
+
+
+def _to_json(values):
+    return [None if np.isnan(v) else round(float(v), 4) for v in values]
+
+
+def indicator_series(stock, kinds, window, points=500):
+    """Return {'timestamps': [...], 'version': int, kind: {name: [...]}} for `stock`.
+
+    Each (symbol, kind, window) series is cached together with the market
+    version it was computed at. When the version moves on, only the ticks
+    recorded since the cached series are read and appended; a full
+    recomputation only happens on a cold cache, a large gap, or when
+    history backfilled since (such as a catch-up replay) reaches back into
+    the cached window.
+    """
+    version = MarketState.current_version()
+    # Read before history, so a series is never tagged with a backfill it missed.
+    mark = history.backfill_mark(stock)
+    token = mark['token'] if mark else None
+    entries = {kind: cache.get(_cache_key(stock, kind, window, points)) for kind in kinds}
+    for kind, entry in entries.items():
+        if entry is None or mark is None or entry.get('backfill') == token:
+            continue
+        if mark['earliest'] <= entry['last_ts']:
+            entries[kind] = None
+        else:
+            # The backfill is all newer than the series; extending reads it.
+            entry['backfill'] = token
+            entry['version'] = None
+    stale = [kind for kind, entry in entries.items() if entry is None or entry['version'] != version]
+
+    cold = [kind for kind in stale if entries[kind] is None]
+    warm = [kind for kind in stale if entries[kind] is not None]
+
+    if warm:
+        since = min(entries[kind]['last_ts'] for kind in warm)
+        # Bounded like the cold read: a gap this long is recomputed anyway,
+        # since it leaves at least `points` fresh points.
+        new_points = history.read(stock, since=since, limit=points + WARMUP_WINDOWS * window)
+        for kind in warm:
+            entry = entries[kind]
+            fresh = [(ts, price) for ts, price in new_points if ts > entry['last_ts']]
+            if len(fresh) >= points:
+                cold.append(kind)
+                continue
+            if fresh:
+                prices = np.fromiter((price for _, price in fresh), dtype=float, count=len(fresh))
+                series, entry['state'] = _extend(kind, entry['state'], prices, window)
+                entry['timestamps'] = (entry['timestamps'] + [ts.isoformat() for ts, _ in fresh])[-points:]
+                for name, values in series.items():
+                    entry['series'][name] = (entry['series'][name] + _to_json(values))[-points:]
+                entry['last_ts'] = fresh[-1][0]
+            entry['version'] = version
+
+    if cold:
+        raw = history.read(stock, limit=points + WARMUP_WINDOWS * window)
+        prices = np.fromiter((price for _, price in raw), dtype=float, count=len(raw))
+        timestamps = [ts.isoformat() for ts, _ in raw][-points:]
+        for kind in cold:
+            series, state = _compute(kind, prices, window)
+            entries[kind] = {
+                'version': version,
+                'backfill': token,
+                'last_ts': raw[-1][0] if raw else None,
+                'timestamps': timestamps,
+                'state': state,
+                'series': {name: _to_json(values[-points:]) for name, values in series.items()},
+            }
+
+    for kind in stale:
+        entry = entries[kind]
+        if entry['last_ts'] is None:
+            # Nothing to extend from; recompute next time history exists.
+            continue
+        cache.set(_cache_key(stock, kind, window, points), entry, CACHE_TIMEOUT)
+
+    timestamps = max((entries[kind]['timestamps'] for kind in kinds), key=len, default=[])
+    result = {'version': version, 'timestamps': timestamps}
+    for kind in kinds:
+        series = entries[kind]['series']
+        # Align shorter (just-extended) series with the shared timestamp axis.
+        pad = len(timestamps) - len(entries[kind]['timestamps'])
+        result[kind] = {name: [None] * pad + values for name, values in series.items()}
+    return result
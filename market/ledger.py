@@ -0,0 +1,266 @@
+"""
+File: ledger.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Append-only trade ledger and its projections into balances and holdings.
+"""
+
+
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Case, F, FloatField, Value, When
+
+from accounts.models import User
+from market import activity
+from market.models import Holding, Trade
+
+
+# Tolerance for float rounding when checking that a debit did not overdraw.
+EPSILON = 1e-9
+
+
+class LedgerError(Exception):
+    """A posted trade would leave a projection in an invalid state."""
+
+
+class InsufficientFunds(LedgerError):
+    pass
+
+
+class InsufficientShares(LedgerError):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Entry builders. None of these touch the database; pass the results to post().
+# ---------------------------------------------------------------------------
+
+def buy(user_id, stock_id, amount, price, note=''):
+    cost = amount * price
+    return Trade(user_id=user_id, stock_id=stock_id, kind=Trade.BUY, shares=amount, price=price,
+                 cash=-cost, cost_basis=cost, note=note)
+
+
+def sell(holding, amount, price, note=''):
+    """Entry for selling `amount` shares out of `holding` at average cost."""
+    released = holding.released_cost(amount)
+    proceeds = amount * price
+    return Trade(user_id=holding.user_id, stock_id=holding.stock_id, kind=Trade.SELL, shares=-amount,
+                 price=price, cash=proceeds, cost_basis=-released, realized_pnl=proceeds - released, note=note)
+
+
+def cash(user_id, kind, amount, note=''):
+    """Entry moving `amount` of cash in (positive) or out (negative) of a user's balance."""
+    return Trade(user_id=user_id, kind=kind, cash=amount, note=note)
+
+
+def grant_shares(user_id, stock_id, amount, note=''):
+    """Entry giving a user free shares, with no cost basis."""
+    return Trade(user_id=user_id, stock_id=stock_id, kind=Trade.MONKEY_BUSINESS, shares=amount, note=note)
+
+
+def opening(user_id, balance=0.0, realized_pnl=0.0, stock_id=None, shares=0, cost_basis=0.0):
+    """Entry carrying state that existed before the ledger into it."""
+    return Trade(user_id=user_id, stock_id=stock_id, kind=Trade.OPENING, cash=balance,
+                 realized_pnl=realized_pnl, shares=shares, cost_basis=cost_basis)
+
+
+# ---------------------------------------------------------------------------
+# Posting
+# ---------------------------------------------------------------------------
+
+def post(trades, require_funds=False, user_fields=None):
+    """Append `trades` to the ledger and apply them to balances and holdings.
+
+    Everything happens in one transaction with a fixed number of queries:
+    the ledger insert, one UPDATE of all affected users, a handful of
+    statements for all affected holdings and one counter increment per
+    traded stock. Balances are moved with F()
+    expressions, so callers never need to read-modify-write the user row.
+
+    `user_fields` ({field: value}) is set on every affected user in the
+    same UPDATE as the balances.
+
+    Raises InsufficientShares if a holding would go negative and, with
+    `require_funds`, InsufficientFunds if a debited balance would; the
+    whole post is rolled back in either case.
+    """
+    trades = list(trades)
+    if not trades:
+        return trades
+    with transaction.atomic():
+        Trade.objects.bulk_create(trades)
+        _project_users(trades, require_funds, user_fields or {})
+        _project_holdings(trades)
+        activity.record(trades)
+    return trades
+
+
+def _project_users(trades, require_funds, user_fields):
+    cash_delta = defaultdict(float)
+    pnl_delta = defaultdict(float)
+    for trade in trades:
+        cash_delta[trade.user_id] += trade.cash
+        pnl_delta[trade.user_id] += trade.realized_pnl
+
+    User.objects.filter(id__in=cash_delta).update(
+        balance=F('balance') + _case('id', cash_delta, FloatField()),
+        realized_pnl=F('realized_pnl') + _case('id', pnl_delta, FloatField()),
+        **user_fields,
+    )
+
+    debited = [user_id for user_id, delta in cash_delta.items() if delta < 0]
+    if require_funds and debited and User.objects.filter(id__in=debited, balance__lt=-EPSILON).exists():
+        raise InsufficientFunds("Insufficient funds")
+
+
+def _project_holdings(trades):
+    share_delta = defaultdict(int)
+    cost_delta = defaultdict(float)
+    for trade in trades:
+        if trade.stock_id is None or not (trade.shares or trade.cost_basis):
+            continue
+        key = (trade.user_id, trade.stock_id)
+        share_delta[key] += trade.shares
+        cost_delta[key] += trade.cost_basis
+    if not share_delta:
+        return
+
+    upsert_holdings([(u, s, share_delta[u, s], cost_delta[u, s]) for u, s in share_delta])
+
+    # Holdings never rest at zero or below, so checking the whole
+    # users x stocks rectangle only ever finds rows this post touched.
+    touched = Holding.objects.filter(
+        user_id__in={u for u, _ in share_delta}, stock_id__in={s for _, s in share_delta},
+    )
+    if touched.filter(shares__lt=0).exists():
+        raise InsufficientShares("Not enough shares")
+    touched.filter(shares=0).delete()
+
+
+def upsert_holdings(rows, batch_size=500):
+    """Add (user_id, stock_id, shares, cost_basis) deltas to holdings, creating missing ones.
+
+    One INSERT ... ON CONFLICT DO UPDATE per batch adds to existing rows in
+    place, so concurrent posts to the same holding cannot lose an update.
+    Works on PostgreSQL and SQLite.
+    """
+    qn = connection.ops.quote_name
+    table = qn(Holding._meta.db_table)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            values = ', '.join(['(%s, %s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {table} (user_id, stock_id, shares, cost_basis) VALUES {values} "
+                f"ON CONFLICT (user_id, stock_id) DO UPDATE SET "
+                f"shares = {table}.shares + excluded.shares, "
+                f"cost_basis = {table}.cost_basis + excluded.cost_basis",
+                [value for row in batch for value in row],
+            )
+
+
+def _case(field, deltas, output_field):
+    """Per-row delta expression; a plain value when every row gets the same delta."""
+    distinct = set(deltas.values())
+    if len(distinct) == 1:
+        return Value(distinct.pop(), output_field=output_field)
+    whens = [When(**{field: key}, then=Value(delta)) for key, delta in deltas.items()]
+    return Case(*whens, default=Value(0.0), output_field=output_field)
+
+
+# ---------------------------------------------------------------------------
+# Rebuilding projections
+# ---------------------------------------------------------------------------
+
+def iter_user_totals(chunk_size=5000):
+    """Stream (user_id, balance, realized_pnl, {stock_id: (shares, cost_basis)}) from the ledger.
+
+    One pass over the ledger ordered by user; only one user's totals are
+    held in memory at a time.
+    """
+    rows = (
+        Trade.objects.order_by('user_id')
+        .values_list('user_id', 'stock_id', 'cash', 'shares', 'cost_basis', 'realized_pnl')
+        .iterator(chunk_size=chunk_size)
+    )
+    current = None
+    balance = pnl = 0.0
+    holdings = {}
+    for user_id, stock_id, cash_delta, shares, cost_basis, realized in rows:
+        if user_id != current:
+            if current is not None:
+                yield current, balance, pnl, holdings
+            current, balance, pnl, holdings = user_id, 0.0, 0.0, {}
+        balance += cash_delta
+        pnl += realized
+        if stock_id is not None and (shares or cost_basis):
+            held, cost = holdings.get(stock_id, (0, 0.0))
+            holdings[stock_id] = (held + shares, cost + cost_basis)
+    if current is not None:
+        yield current, balance, pnl, holdings
+
+
+def _rebuild_batch(batch, dry_run):
+    """Compare one batch of iter_user_totals() rows with the projections and, unless `dry_run`, rewrite them.
+
+    Returns (users, holdings, mismatched users) of the batch.
+    """
+    user_ids = [row[0] for row in batch]
+    current = {
+        user_id: (balance, realized_pnl)
+        for user_id, balance, realized_pnl in User.objects.filter(id__in=user_ids).values_list('id', 'balance', 'realized_pnl')
+    }
+    current_holdings = defaultdict(dict)
+    for user_id, stock_id, shares in Holding.objects.filter(user_id__in=user_ids).values_list('user_id', 'stock_id', 'shares'):
+        current_holdings[user_id][stock_id] = current_holdings[user_id].get(stock_id, 0) + shares
+
+    users = holdings = mismatched = 0
+    user_rows, holding_rows = [], []
+    for user_id, balance, pnl, positions in batch:
+        if user_id not in current:
+            continue
+        positions = {stock_id: p for stock_id, p in positions.items() if p[0] > 0}
+        users += 1
+        holdings += len(positions)
+
+        old_balance, old_pnl = current[user_id]
+        if (abs((old_balance or 0.0) - balance) > 0.005 or abs((old_pnl or 0.0) - pnl) > 0.005
+                or current_holdings.get(user_id, {}) != {s: p[0] for s, p in positions.items()}):
+            mismatched += 1
+
+        user_rows.append(User(id=user_id, balance=balance, realized_pnl=pnl))
+        holding_rows.extend(
+            Holding(user_id=user_id, stock_id=stock_id, shares=shares, cost_basis=cost_basis)
+            for stock_id, (shares, cost_basis) in positions.items()
+        )
+
+    if not dry_run and user_rows:
+        User.objects.bulk_update(user_rows, ['balance', 'realized_pnl'])
+        Holding.objects.filter(user_id__in=[user.id for user in user_rows]).delete()
+        Holding.objects.bulk_create(holding_rows, batch_size=1000)
+    return users, holdings, mismatched
+
+
+def rebuild_projections(dry_run=False, batch_size=1000):
+    """Recompute every balance and holding from the ledger.
+
+    Returns (users, holdings, mismatched users). With `dry_run` nothing is
+    written and only the mismatches are counted. Users without any ledger
+    entries are left untouched. The ledger is streamed and users are
+    compared and written `batch_size` at a time, so memory does not grow
+    with the number of users or holdings.
+    """
+    totals = [0, 0, 0]
+    batch = []
+    with transaction.atomic():
+        for row in iter_user_totals():
+            batch.append(row)
+            if len(batch) >= batch_size:
+                totals = [a + b for a, b in zip(totals, _rebuild_batch(batch, dry_run))]
+                batch = []
+        if batch:
+            totals = [a + b for a, b in zip(totals, _rebuild_batch(batch, dry_run))]
+    users, holdings, mismatched = totals
+    return users, holdings, mismatched
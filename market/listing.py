@@ -0,0 +1,162 @@
+"""
+File: listing.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Keyset-paginated, sortable and searchable listings of the stock universe and of users.
+"""
+
+
+import base64
+import json
+
+from django.db.models import F, Q
+
+from accounts.models import User
+from market.models import Stock
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Sort name -> (Stock field, descending). Every sort is keyed on a Stock
+# column covered by a (market, column, id) index, with the id as
+# tie-breaker, so a page is one index range scan however deep the cursor is.
+SORTS = {
+    'symbol': ('symbol', False),
+    '-symbol': ('symbol', True),
+    'price': ('price', False),
+    '-price': ('price', True),
+    'change': ('change', False),
+    '-change': ('change', True),
+    'volume': ('volume', False),
+    '-volume': ('volume', True),
+}
+
+
+USER_DEFAULT_LIMIT = 100
+USER_MAX_LIMIT = 500
+
+# Sort name -> (sort alias, descending) for the admin user list.
+USER_SORTS = {
+    'email': ('email', False),
+    '-email': ('email', True),
+    'net_worth': ('net_worth', False),
+    '-net_worth': ('net_worth', True),
+}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or belongs to another sort."""
+
+
+def encode_cursor(sort, value, pk):
+    raw = json.dumps([sort, value, pk], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Return the (value, id) position encoded in `cursor` for `sort`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, value, pk = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if cursor_sort != sort:
+        raise InvalidCursor("Cursor belongs to a different sort")
+    return value, pk
+
+
+def search_filter(query):
+    """Prefix match on symbol or name.
+
+    Symbols are stored upper-case, so the symbol half is a case-sensitive
+    prefix match that PostgreSQL serves from the symbol's pattern-ops index;
+    the name half uses the UPPER(name) pattern-ops index added for it.
+    Other databases fall back to a scan of the (small) name column.
+    """
+    query = query.strip()
+    return Q(symbol__startswith=query.upper()) | Q(name__istartswith=query)
+
+
+def page(query='', sort='symbol', cursor=None, limit=DEFAULT_LIMIT, market_id=None):
+    """Return (stocks, next cursor or None) for one page of the stock list.
+
+    `market_id` limits the list to one market; symbols are only unique
+    within a market, so the symbol sort should always be given one.
+    """
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    field, descending = SORTS[sort]
+    limit = max(1, min(int(limit), MAX_LIMIT))
+
+    qs = Stock.objects.all()
+    if market_id is not None:
+        qs = qs.filter(market_id=market_id)
+    if query.strip():
+        qs = qs.filter(search_filter(query))
+
+    if cursor:
+        value, pk = decode_cursor(cursor, sort)
+        op = 'lt' if descending else 'gt'
+        if field == 'symbol':
+            qs = qs.filter(**{f'symbol__{op}': value})
+        else:
+            qs = qs.filter(Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk}))
+
+    ordering = [f'-{field}' if descending else field]
+    if field != 'symbol':
+        ordering.append('-id' if descending else 'id')
+
+    stocks = list(qs.order_by(*ordering)[:limit + 1])
+    next_cursor = None
+    if len(stocks) > limit:
+        stocks = stocks[:limit]
+        last = stocks[-1]
+        next_cursor = encode_cursor(sort, getattr(last, field), last.id)
+    return stocks, next_cursor
+
+
+def user_page(query='', sort='email', cursor=None, limit=USER_DEFAULT_LIMIT, net_worth=False):
+    """Return (rows, next cursor or None) for one page of the admin user list.
+
+    Rows are plain dicts from values(), so no User instances are built.
+    `query` is a case-insensitive prefix of the email, first or last name.
+    With `net_worth` (always when sorting by it) each row carries the net
+    worth of the last analytics run, stored on the user; its sort is an
+    index range scan like the email sort.
+    """
+    if sort not in USER_SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    field, descending = USER_SORTS[sort]
+    limit = max(1, min(int(limit), USER_MAX_LIMIT))
+
+    columns = ['id', 'email', 'first_name', 'last_name', 'balance']
+    qs = User.objects.all()
+    if net_worth or field == 'net_worth':
+        qs = qs.annotate(net_worth=F('analytics_net_worth'))
+        columns.append('net_worth')
+
+    query = query.strip()
+    if query:
+        qs = qs.filter(
+            Q(email__istartswith=query) | Q(first_name__istartswith=query) | Q(last_name__istartswith=query)
+        )
+
+    if cursor:
+        value, pk = decode_cursor(cursor, sort)
+        op = 'lt' if descending else 'gt'
+        if field == 'email':
+            qs = qs.filter(**{f'email__{op}': value})
+        else:
+            qs = qs.filter(Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk}))
+
+    ordering = [f'-{field}' if descending else field]
+    if field != 'email':
+        ordering.append('-id' if descending else 'id')
+
+    rows = list(qs.order_by(*ordering).values(*columns)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1][field], rows[-1]['id'])
+    return rows, next_cursor
@@ -0,0 +1,47 @@
+"""
+File: loans.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Emergency loans: eligibility, and bulk automatic repayment run by the tick.
+"""
+
+
+from django.db import transaction
+
+from accounts.models import User
+from market import ledger
+from market.models import Trade
+
+
+LOAN_AMOUNT = 20.0
+# Amount owed per peel borrowed.
+REPAY_FACTOR = 1.25
+# A loan is offered when net worth falls below this...
+ELIGIBLE_BELOW = 3.0
+# ...and repaid automatically once the cash balance reaches this.
+REPAY_AT = 50.0
+
+
+def is_eligible(user, net_worth):
+    return not user.has_loan and net_worth < ELIGIBLE_BELOW
+
+
+def settle():
+    """Repay the loan of every user whose balance has reached REPAY_AT; returns how many.
+
+    All repayments are posted to the ledger together, and the balance
+    debit and the cleared loan flags go out as one UPDATE of the users.
+    """
+    with transaction.atomic():
+        due = list(
+            User.objects.select_for_update()
+            .filter(has_loan=True, balance__gte=REPAY_AT)
+            .values_list('id', 'loan_amount')
+        )
+        if not due:
+            return 0
+        ledger.post(
+            [ledger.cash(user_id, Trade.LOAN_REPAYMENT, -amount) for user_id, amount in due],
+            user_fields={'has_loan': False, 'loan_amount': 0.0},
+        )
+    return len(due)
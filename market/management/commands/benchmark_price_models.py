@@ -0,0 +1,99 @@
+"""
+File: benchmark_price_models.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to benchmark the price models on a synthetic market, and optionally the full tick.
+"""
+
+
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from market import engine, pricing
+
+
+class Command(BaseCommand):
+    help = (
+        "Time one tick of each price model over a large synthetic universe (no database access), "
+        "and with --full-tick whole engine ticks against the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stocks', type=int, default=5000, help="Number of synthetic stocks (default: 5000)")
+        parser.add_argument('--sectors', type=int, default=12, help="Number of sectors (default: 12)")
+        parser.add_argument('--ticks', type=int, default=200, help="Ticks to average over (default: 200)")
+        parser.add_argument(
+            '--full-tick',
+            type=int,
+            default=0,
+            metavar='N',
+            help="Also run N whole engine ticks on the real market, rolled back afterwards (default: 0)",
+        )
+
+    def handle(self, *args, **options):
+        n, ticks = options['stocks'], options['ticks']
+        rng = np.random.default_rng(0)
+        volatility = rng.uniform(0.05, 0.15, n)
+        universe = pricing.Universe(
+            ids=np.arange(n),
+            prices=rng.uniform(2.0, 55.0, n),
+            volatility_min=-volatility,
+            volatility_max=volatility,
+            sectors=[f"sector-{i % options['sectors']}" for i in range(n)],
+        )
+        self.stdout.write(f"{n} stocks, {options['sectors']} sectors, {ticks} ticks\n")
+
+        def per_stock_loop():
+            # The original tick: one uniform draw per stock in a Python loop.
+            out = []
+            for price, low, high in zip(universe.prices, universe.volatility_min, universe.volatility_max):
+                out.append(max(0.1, price * (1 + random.uniform(low, high))))
+            return out
+
+        self._report("per-stock Python loop", per_stock_loop, ticks)
+        for name in ('uniform', 'factor'):
+            model = pricing.build_model(name)
+            self._report(f"{name} model", lambda: model.next_prices(universe, rng), ticks)
+
+        sectors = options['sectors']
+        if 1 < sectors < n:
+            # Stocks 0 and `sectors` share a sector, stocks 0 and 1 do not.
+            model = pricing.build_model('factor')
+            draws = np.array([model.returns(universe, rng)[[0, 1, sectors]] for _ in range(2000)])
+            corr = np.corrcoef(draws.T)
+            self.stdout.write(
+                f"\n  factor model sample correlation: same sector {corr[0, 2]:.2f}, different sector {corr[0, 1]:.2f}"
+            )
+
+        if options['full_tick'] > 0:
+            self._full_tick(options['full_tick'])
+
+        self.stdout.write(self.style.SUCCESS("\n✓ Benchmark complete"))
+
+    def _full_tick(self, ticks):
+        """Time engine.tick() end to end (prices, history, alerts, orders, rollups) and count its queries."""
+        timings, queries = [], []
+        with transaction.atomic():
+            for _ in range(ticks):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    stocks = engine.tick()[0]
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries.append(len(captured))
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f"\n  full tick over {stocks} stocks  {np.median(timings):8.3f} ms/tick (median), "
+            f"{min(queries)}-{max(queries)} queries/tick"
+        )
+
+    def _report(self, label, fn, ticks):
+        fn()
+        started = time.perf_counter()
+        for _ in range(ticks):
+            fn()
+        elapsed = (time.perf_counter() - started) / ticks * 1000
+        self.stdout.write(f"  {label:<24} {elapsed:8.3f} ms/tick")
@@ -0,0 +1,91 @@
+"""
+File: benchmark_snapshot.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to time a snapshot and restore round trip over synthetic price history.
+"""
+
+
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from market import history, snapshots
+from market.models import Stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Add synthetic price history, time snapshot_market --history and restore_market on it, "
+        "then restore the database as it was (use a scratch database)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--history-points',
+            type=int,
+            default=2_000_000,
+            help="Synthetic history points to add across all stocks (default: 2000000)",
+        )
+        parser.add_argument(
+            '--noinput',
+            action='store_true',
+            help="Do not ask for confirmation",
+        )
+
+    def handle(self, *args, **options):
+        points = options['history_points']
+        stock_ids = list(Stock.objects.order_by('id').values_list('id', flat=True))
+        if not stock_ids:
+            raise CommandError("No stocks found")
+        if not options['noinput']:
+            answer = input("This restores the whole database twice. Type 'yes' to continue: ")
+            if answer.strip().lower() != 'yes':
+                raise CommandError("Benchmark cancelled")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            original = os.path.join(tmp, 'original.snap')
+            archive = os.path.join(tmp, 'benchmark.snap')
+            with open(original, 'wb') as out:
+                snapshots.dump(out, include_history=True)
+
+            try:
+                self._add_history(stock_ids, points)
+
+                started = time.monotonic()
+                with open(archive, 'wb') as out:
+                    counts = snapshots.dump(out, include_history=True)
+                dumped = time.monotonic() - started
+
+                started = time.monotonic()
+                with open(archive, 'rb') as source:
+                    snapshots.restore(source)
+                restored = time.monotonic() - started
+                size = os.path.getsize(archive) / (1024 * 1024)
+            finally:
+                with open(original, 'rb') as source:
+                    snapshots.restore(source)
+
+        self.stdout.write(f"  rows             {sum(counts.values()):>10}")
+        self.stdout.write(f"  archive          {size:>10.1f} MB")
+        self.stdout.write(f"  snapshot         {dumped:>10.2f} s")
+        self.stdout.write(f"  restore          {restored:>10.2f} s")
+        self.stdout.write(self.style.SUCCESS("\n✓ Benchmark complete; the original database was restored"))
+
+    def _add_history(self, stock_ids, points, batch_size=50000):
+        """Record `points` random-walk prices spread over `stock_ids`, one minute apart per stock."""
+        rng = np.random.default_rng(0)
+        per_stock = max(1, points // len(stock_ids))
+        start = timezone.now() - timedelta(minutes=per_stock)
+        for stock_id in stock_ids:
+            prices = 10.0 * np.cumprod(1 + rng.uniform(-0.01, 0.01, per_stock))
+            batch = [
+                (stock_id, start + timedelta(minutes=step), price)
+                for step, price in enumerate(prices.tolist())
+            ]
+            for offset in range(0, len(batch), batch_size):
+                history.record_many(batch[offset:offset + batch_size])
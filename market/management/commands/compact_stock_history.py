@@ -0,0 +1,52 @@
+"""
+File: compact_stock_history.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to pack row-per-tick stock price history into compressed window chunks.
+"""
+
+
+from django.core.management.base import BaseCommand
+from market.models import Stock, StockPriceChunk, StockPriceHistory
+from market import history
+
+
+class Command(BaseCommand):
+    help = "Copy StockPriceHistory rows into compressed StockPriceChunk windows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='*', help="Only compact these stock symbols")
+        parser.add_argument(
+            '--delete-rows',
+            action='store_true',
+            help="Delete the compacted StockPriceHistory rows afterwards",
+        )
+
+    def handle(self, *args, **options):
+        stocks = Stock.objects.all()
+        if options['symbols']:
+            stocks = stocks.filter(symbol__in=options['symbols'])
+        stock_ids = list(stocks.values_list('id', flat=True))
+
+        if not stock_ids:
+            self.stdout.write(self.style.WARNING("No stocks found"))
+            return
+
+        if StockPriceChunk.objects.filter(stock_id__in=stock_ids).exists():
+            self.stdout.write(
+                "  Some stocks already have chunked history; only rows after their latest chunked point are packed"
+            )
+
+        copied = history.compact_rows(stock_ids)
+        self.stdout.write(f"  Packed {copied} history entries for {len(stock_ids)} stocks")
+
+        if options['delete_rows']:
+            deleted = StockPriceHistory.objects.filter(stock_id__in=stock_ids).delete()[0]
+            self.stdout.write(f"  Deleted {deleted} history rows")
+
+        if history.backend() != 'chunks':
+            self.stdout.write(self.style.WARNING(
+                "Set STOCK_HISTORY_BACKEND=chunks to read and write the compacted history"
+            ))
+
+        self.stdout.write(self.style.SUCCESS("\n✓ Successfully compacted stock price history"))
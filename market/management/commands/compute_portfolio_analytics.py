@@ -0,0 +1,21 @@
+"""
+File: compute_portfolio_analytics.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to recompute portfolio risk/return analytics for every user.
+"""
+
+
+from django.core.management.base import BaseCommand
+from market import analytics
+import time
+
+
+class Command(BaseCommand):
+    help = "Compute P&L, return, volatility, drawdown and Sharpe ratio for all portfolios"
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        count = analytics.compute_all()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Computed analytics for {count} users in {elapsed:.2f}s"))
@@ -0,0 +1,48 @@
+"""
+File: create_market.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to create a new isolated market, optionally listing another market's stocks.
+"""
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+from market import markets
+from market.models import Market
+
+
+class Command(BaseCommand):
+    help = "Create a market with its own stocks, traders, events and leaderboard"
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', help="Short unique name used in URLs (?market=<slug>)")
+        parser.add_argument('name', help="Display name")
+        parser.add_argument(
+            '--tick-every',
+            type=int,
+            default=1,
+            help="Move prices every N market ticks (default: 1, every tick)",
+        )
+        parser.add_argument(
+            '--copy-stocks-from',
+            default=None,
+            help="Slug of a market whose stocks to list in the new one at their current prices",
+        )
+
+    def handle(self, *args, **options):
+        if options['tick_every'] < 1:
+            raise CommandError("--tick-every must be at least 1")
+        if Market.objects.filter(slug=options['slug']).exists():
+            raise CommandError(f"Market {options['slug']} already exists")
+
+        source = None
+        if options['copy_stocks_from']:
+            source = Market.objects.filter(slug=options['copy_stocks_from']).first()
+            if source is None:
+                raise CommandError(f"Unknown market: {options['copy_stocks_from']}")
+
+        market = markets.create(options['slug'], options['name'], options['tick_every'], copy_from=source)
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ Created market {market.slug} (id {market.id}) with {market.stocks.count()} stocks"
+        ))
@@ -0,0 +1,71 @@
+"""
+File: export_history.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to export stock price history as CSV or columnar binary.
+"""
+
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from market import exports
+from market.models import Market
+
+
+class Command(BaseCommand):
+    help = "Stream stock price history for some or all symbols to a file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="File to write, or - for standard output")
+        parser.add_argument('--market', default='main', help="Slug of the market to export (default: main)")
+        parser.add_argument('--symbols', default='', help="Comma-separated symbols (default: every stock)")
+        parser.add_argument('--since', default=None, help="Only points at or after this ISO 8601 timestamp")
+        parser.add_argument('--until', default=None, help="Only points at or before this ISO 8601 timestamp")
+        parser.add_argument(
+            '--format',
+            choices=exports.FORMATS,
+            default='csv',
+            help="Output format (default: csv)",
+        )
+
+    def _parse(self, name, raw):
+        if not raw:
+            return None
+        value = parse_datetime(raw)
+        if value is None:
+            raise CommandError(f"Invalid --{name} timestamp: {raw}")
+        return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+    def handle(self, *args, **options):
+        since = self._parse('since', options['since'])
+        until = self._parse('until', options['until'])
+        market = Market.objects.filter(slug=options['market']).first()
+        if market is None:
+            raise CommandError(f"Unknown market: {options['market']}")
+        symbols, missing = exports.resolve_symbols(options['symbols'].split(','), market.id)
+        if missing:
+            raise CommandError(f"Unknown symbols: {', '.join(missing)}")
+
+        fmt = options['format']
+        to_stdout = options['output'] == '-'
+        if to_stdout:
+            out = sys.stdout if fmt == 'csv' else sys.stdout.buffer
+        else:
+            out = open(options['output'], 'w' if fmt == 'csv' else 'wb', newline='' if fmt == 'csv' else None)
+
+        written = 0
+        try:
+            for chunk in exports.stream(fmt, symbols, since, until):
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if not to_stdout:
+                out.close()
+
+        if not to_stdout:
+            self.stdout.write(self.style.SUCCESS(
+                f"\n✓ Exported {len(symbols)} stock(s) to {options['output']} ({written / 1024:.1f} KB)"
+            ))
@@ -0,0 +1,68 @@
+"""
+File: partition_stock_history.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to maintain time-range partitions of the stock price history table.
+"""
+
+
+from django.core.management.base import BaseCommand, CommandError
+from market import partitions
+
+
+class Command(BaseCommand):
+    help = "Pre-create future StockPriceHistory partitions and drop expired ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--setup',
+            action='store_true',
+            help="Convert the existing history table into a partitioned table first (PostgreSQL only)",
+        )
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=None,
+            help="Number of future windows to pre-create (default: STOCK_HISTORY_PARTITIONS_AHEAD)",
+        )
+        parser.add_argument(
+            '--no-retention',
+            action='store_true',
+            help="Only create partitions, do not drop expired history",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mode = partitions.partitioning_mode()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if mode is None:
+            self.stdout.write(self.style.WARNING("STOCK_HISTORY_PARTITIONING is not set; nothing to do"))
+            return
+
+        if not partitions.supports_partitioning():
+            self.stdout.write(self.style.WARNING(
+                "Database does not support native partitioning; falling back to range deletes"
+            ))
+        elif options['setup']:
+            if partitions.convert_to_partitioned():
+                self.stdout.write(self.style.SUCCESS("Converted stock price history to a partitioned table"))
+            else:
+                self.stdout.write("Stock price history is already partitioned")
+        elif not partitions.is_partitioned():
+            raise CommandError("History table is not partitioned yet; run with --setup first")
+
+        created = partitions.ensure_partitions(ahead=options['ahead'])
+        for name in created:
+            self.stdout.write(f"  Created partition {name}")
+
+        if not options['no_retention']:
+            cutoff = partitions.retention_cutoff()
+            windows, rows = partitions.drop_partitions_before(cutoff)
+            if rows is None:
+                self.stdout.write(f"  Dropped {windows} expired {mode} partition(s) older than {cutoff:%Y-%m-%d}")
+            else:
+                self.stdout.write(f"  Deleted {rows} history entries older than {cutoff:%Y-%m-%d}")
+
+        self.stdout.write(self.style.SUCCESS(f"\n✓ History partitions are up to date ({mode})"))
@@ -6,33 +6,48 @@ Description: Command to randomly apply a market event to a stock.
 """
 
 
-from django.core.management.base import BaseCommand
-from market.models import Stock, MarketEvent, MarketEventApplication
-from django.utils import timezone
-import random
+from django.core.management.base import BaseCommand, CommandError
+from market import events, scheduling
+from market.models import Market
+
 
 class Command(BaseCommand):
-    help = "Randomly select and apply a market event"
-
-    def handle(self, *args, **kwargs):
-        events = MarketEvent.objects.all()
-        
-        event_type = random.randint(1, 100)
-        if event_type <= 10:
-            event = random.choice(events.filter(impact_level='severe'))
-        elif event_type <= 25:
-            event = random.choice(events.filter(impact_level='major'))
-        elif event_type <= 55:
-            event = random.choice(events.filter(impact_level='moderate'))
-        else:
-            event = random.choice(events.filter(impact_level='minor'))
-
-        stock_to_affect = random.choice(Stock.objects.all())
-        event.apply_event(stock=stock_to_affect)
-
-        try:
-            MarketEventApplication.objects.create(event=event, stock=stock_to_affect)
-        except Exception:
-            pass
-
-        self.stdout.write(self.style.SUCCESS(f"Applied market event: {event}"))
\ No newline at end of file
+    help = "Randomly select and apply market events"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1,
+            help="Number of events to apply in each market, each to a different random stock (default: 1)",
+        )
+
+    def handle(self, *args, **options):
+        if options['count'] < 1:
+            raise CommandError("--count must be at least 1")
+
+        sequence = scheduling.tick_sequence()
+        with scheduling.lease('market-event') as held:
+            if not held:
+                self.stdout.write(self.style.WARNING("Another runner holds the market-event lease; skipping"))
+                return
+            if scheduling.last_sequence('market-event') >= sequence:
+                self.stdout.write(self.style.WARNING(f"Market events already ran for tick {sequence}; skipping"))
+                return
+
+            applied = []
+            try:
+                for market_id in Market.objects.order_by('id').values_list('id', flat=True):
+                    applied += events.apply_events(count=options['count'], market_id=market_id)
+            except ValueError as e:
+                raise CommandError(str(e))
+            scheduling.complete('market-event', sequence)
+
+        if not applied:
+            self.stdout.write(self.style.WARNING("No market events or stocks available"))
+            return
+
+        for event, stock, old_price in applied:
+            self.stdout.write(self.style.SUCCESS(
+                f"Applied market event: {event} to {stock.symbol} (${old_price:.2f} → ${stock.price:.2f})"
+            ))
@@ -7,7 +7,8 @@ Description: Command to reset all stock prices to a reasonable range ($2-55)
 
 
 from django.core.management.base import BaseCommand
-from market.models import Stock, StockPriceHistory
+from market.models import Stock
+from market import prices
 import random
 
 
@@ -23,18 +24,16 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS(f"Rebasing {stocks.count()} stocks..."))
         
-        for stock in stocks:
-            old_price = stock.price
-            new_price = round(random.uniform(2.0, 55.0), 2)
-            
-            # Update directly without triggering save() logic
-            Stock.objects.filter(id=stock.id).update(price=new_price)
-            
-            # Add to price history
-            StockPriceHistory.objects.create(stock=stock, price=new_price)
-            
-            self.stdout.write(
-                f"  {stock.symbol}: ${old_price:.2f} → ${new_price:.2f}"
-            )
+        # All new prices and their history points are written in one batch
+        with prices.batch('rebase'):
+            for stock in stocks:
+                old_price = stock.price
+                new_price = round(random.uniform(2.0, 55.0), 2)
+                
+                prices.set_price(stock, new_price)
+                
+                self.stdout.write(
+                    f"  {stock.symbol}: ${old_price:.2f} → ${new_price:.2f}"
+                )
         
         self.stdout.write(self.style.SUCCESS(f"\n✓ Successfully rebased all stock prices to $2-$55 range"))
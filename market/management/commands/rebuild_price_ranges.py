@@ -0,0 +1,26 @@
+"""
+File: rebuild_price_ranges.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to refill the 24h price buckets from history and roll up each stock's 24h range.
+"""
+
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from market import ohlc
+
+
+class Command(BaseCommand):
+    help = "Rebuild the last 24h of price buckets from history and recompute every stock's 24h open, high and low"
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        with transaction.atomic():
+            points = ohlc.rebuild()
+            stocks = ohlc.rollup()
+        self.stdout.write(f"  Read {points} history points for {stocks} stocks")
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Rebuilt 24h price ranges in {time.monotonic() - start:.2f}s"))
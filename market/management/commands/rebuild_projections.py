@@ -0,0 +1,39 @@
+"""
+File: rebuild_projections.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to recompute balances and holdings from the trade ledger.
+"""
+
+
+import time
+
+from django.core.management.base import BaseCommand
+from market import ledger
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's balance, realized P&L and holdings from the trade ledger"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report how many users differ from the ledger, do not write",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        users, holdings, mismatched = ledger.rebuild_projections(dry_run=options['dry_run'])
+        elapsed = time.monotonic() - started
+
+        if options['dry_run']:
+            style = self.style.WARNING if mismatched else self.style.SUCCESS
+            self.stdout.write(style(f"{mismatched} of {users} users differ from the ledger"))
+            return
+
+        if mismatched:
+            self.stdout.write(self.style.WARNING(f"  Corrected {mismatched} users that had drifted from the ledger"))
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ Rebuilt {users} balances and {holdings} holdings from the ledger in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,45 @@
+"""
+File: restore_market.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to replace the market state with a snapshot archive.
+"""
+
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from market import snapshots
+
+
+class Command(BaseCommand):
+    help = "Replace the market (users, stocks, holdings, ledger, ...) with a snapshot written by snapshot_market"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archive file to restore")
+        parser.add_argument(
+            '--noinput',
+            action='store_true',
+            help="Do not ask for confirmation",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not options['noinput']:
+            answer = input("This deletes every user, stock and trade in the database. Type 'yes' to continue: ")
+            if answer.strip().lower() != 'yes':
+                raise CommandError("Restore cancelled")
+
+        started = time.monotonic()
+        try:
+            with open(path, 'rb') as source:
+                header, counts = snapshots.restore(source)
+        except (OSError, snapshots.SnapshotError) as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - started
+
+        for label, rows in counts.items():
+            self.stdout.write(f"  {label:<16} {rows:>10} rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ Restored {sum(counts.values())} rows from the {header['created_at']} snapshot in {elapsed:.2f}s"
+        ))
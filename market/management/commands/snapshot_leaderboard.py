@@ -0,0 +1,23 @@
+"""
+File: snapshot_leaderboard.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to store every user's current leaderboard rank for rank history.
+"""
+
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from market import rankings
+
+
+class Command(BaseCommand):
+    help = "Rank every user by net worth and store the ranks for the current period"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rankings.snapshot()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Stored leaderboard ranks of {count} users in {elapsed:.2f}s"))
@@ -0,0 +1,39 @@
+"""
+File: snapshot_market.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Command to write a binary snapshot of the market state.
+"""
+
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from market import snapshots
+
+
+class Command(BaseCommand):
+    help = "Dump stocks, events, users and balances, holdings, ledger, orders and alerts to a snapshot archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archive file to write (contains password hashes; keep it private)")
+        parser.add_argument(
+            '--history',
+            action='store_true',
+            help="Include the stock price history",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.monotonic()
+        with open(path, 'wb') as out:
+            counts = snapshots.dump(out, include_history=options['history'])
+        elapsed = time.monotonic() - started
+
+        for label, rows in counts.items():
+            self.stdout.write(f"  {label:<16} {rows:>10} rows")
+        size = os.path.getsize(path) / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ Wrote {sum(counts.values())} rows ({size:.1f} MB) to {path} in {elapsed:.2f}s"
+        ))
@@ -6,14 +6,58 @@ Description: Command to update stock prices.
 """
 
 
-from django.core.management.base import BaseCommand
-from market.models import Stock
-from django.utils import timezone
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from market import engine, scheduling
 
 class Command(BaseCommand):
     help = "Randomly fluctuate stock prices"
 
-    def handle(self, *args, **kwargs):
-        for stock in Stock.objects.all():
-            stock.random_fluctuate()
-        self.stdout.write(self.style.SUCCESS("Stock prices updated!"))
\ No newline at end of file
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shard',
+            type=int,
+            default=None,
+            help="Shard of the stock universe this runner ticks (default: MARKET_TICK_SHARD)",
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=None,
+            help="Total number of shards (default: MARKET_TICK_SHARDS)",
+        )
+        parser.add_argument(
+            '--no-catch-up',
+            action='store_true',
+            help="Do not replay ticks missed since the last run",
+        )
+
+    def handle(self, *args, **options):
+        shards = options['shards'] or getattr(settings, 'MARKET_TICK_SHARDS', 1)
+        shard = options['shard'] if options['shard'] is not None else getattr(settings, 'MARKET_TICK_SHARD', 0)
+        if shards < 1 or not 0 <= shard < shards:
+            raise CommandError(f"Invalid shard {shard} of {shards}")
+
+        name = scheduling.tick_lease_name(shard, shards)
+        sequence = scheduling.tick_sequence()
+        with scheduling.lease(name) as held:
+            if not held:
+                self.stdout.write(self.style.WARNING(f"Another runner holds the {name} lease; skipping"))
+                return
+            last = scheduling.last_sequence(name)
+            if last >= sequence:
+                self.stdout.write(self.style.WARNING(f"Tick {sequence} already ran for {name}; skipping"))
+                return
+
+            if not options['no_catch_up']:
+                replayed = engine.catch_up(last, sequence, shard=shard, shards=shards)
+                if replayed:
+                    self.stdout.write(f"  Replayed {replayed} missed tick(s) since tick {last}")
+
+            updated, fired, filled, rejected = engine.tick(shard=shard, shards=shards, sequence=sequence)
+            scheduling.complete(name, sequence)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stock prices updated! ({updated} stocks, {fired} alerts fired, "
+            f"{filled} orders filled, {rejected} rejected)"
+        ))
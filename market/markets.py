@@ -0,0 +1,59 @@
+"""
+File: markets.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Resolving the market a request acts in, market tick schedules and creating markets.
+"""
+
+
+from django.db import transaction
+from django.http import Http404
+
+from market.models import DEFAULT_MARKET_ID, Market, Stock
+
+
+def for_request(request, slug=None):
+    """Return the id of the market `request` acts in.
+
+    Traders always act in their own market. Staff may name another one by
+    slug (`slug`, else the `market` query param), and so may anonymous
+    visitors, who otherwise see the default market. Raises Http404 for an
+    unknown slug.
+    """
+    user = request.user
+    slug = slug or request.GET.get('market')
+    if user.is_authenticated and (not slug or not user.is_staff):
+        return user.market_id
+    if not slug:
+        return DEFAULT_MARKET_ID
+    market_id = Market.objects.filter(slug=slug).values_list('id', flat=True).first()
+    if market_id is None:
+        raise Http404("Market not found")
+    return market_id
+
+
+def due(sequence=None):
+    """Return the ids of the markets that move on tick `sequence` (every market when None)."""
+    return [market.id for market in Market.objects.all() if sequence is None or market.is_due(sequence)]
+
+
+def tick_every():
+    """Return {market_id: tick_every} of every market."""
+    return {market_id: max(1, every) for market_id, every in Market.objects.values_list('id', 'tick_every')}
+
+
+def create(slug, name, tick_every=1, copy_from=None):
+    """Create a market; with `copy_from` (a Market) it lists the same stocks at their current prices.
+
+    Copied stocks start with a fresh history and volatility range.
+    """
+    with transaction.atomic():
+        market = Market.objects.create(slug=slug, name=name, tick_every=tick_every)
+        if copy_from is not None:
+            for source in Stock.objects.filter(market=copy_from).order_by('id'):
+                # save() per stock so each gets its own volatility range.
+                Stock.objects.create(
+                    market=market, name=source.name, symbol=source.symbol,
+                    sector=source.sector, price=source.price,
+                )
+    return market
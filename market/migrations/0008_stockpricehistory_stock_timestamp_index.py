@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0007_stock_volatility_max_stock_volatility_min'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockpricehistory',
+            index=models.Index(fields=['stock', 'timestamp'], name='market_hist_stock_ts_idx'),
+        ),
+    ]
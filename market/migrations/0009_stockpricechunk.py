@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0008_stockpricehistory_stock_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockPriceChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_start', models.DateTimeField()),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('last_price', models.FloatField()),
+                ('count', models.IntegerField(default=0)),
+                ('data', models.BinaryField()),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history_chunks', to='market.stock')),
+            ],
+            options={
+                'ordering': ['window_start'],
+                'constraints': [models.UniqueConstraint(fields=('stock', 'window_start'), name='market_chunk_stock_window_uniq')],
+            },
+        ),
+    ]
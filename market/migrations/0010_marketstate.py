@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+def create_market_state(apps, schema_editor):
+    MarketState = apps.get_model('market', 'MarketState')
+    MarketState.objects.get_or_create(id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0009_stockpricechunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_market_state, migrations.RunPython.noop),
+    ]
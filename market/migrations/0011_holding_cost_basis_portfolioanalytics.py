@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_cost_basis(apps, schema_editor):
+    # Purchase prices were never recorded, so existing positions start at
+    # their current market value (zero unrealized P&L).
+    Holding = apps.get_model('market', 'Holding')
+    holdings = list(Holding.objects.select_related('stock'))
+    for holding in holdings:
+        holding.cost_basis = holding.shares * holding.stock.price
+    Holding.objects.bulk_update(holdings, ['cost_basis'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0010_marketstate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='holding',
+            name='cost_basis',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.CreateModel(
+            name='PortfolioAnalytics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('lookback_days', models.IntegerField(default=7)),
+                ('balance', models.FloatField(default=0.0)),
+                ('stocks_value', models.FloatField(default=0.0)),
+                ('net_worth', models.FloatField(default=0.0)),
+                ('cost_basis', models.FloatField(default=0.0)),
+                ('realized_pnl', models.FloatField(default=0.0)),
+                ('unrealized_pnl', models.FloatField(default=0.0)),
+                ('positions', models.IntegerField(default=0)),
+                ('largest_position_weight', models.FloatField(default=0.0)),
+                ('time_weighted_return', models.FloatField(blank=True, null=True)),
+                ('volatility', models.FloatField(blank=True, null=True)),
+                ('max_drawdown', models.FloatField(blank=True, null=True)),
+                ('sharpe_ratio', models.FloatField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(seed_cost_basis, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0012_pricealert'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('side', models.CharField(choices=[('buy', 'Buy'), ('sell', 'Sell')], max_length=4)),
+                ('kind', models.CharField(choices=[('limit', 'Limit'), ('stop_loss', 'Stop-loss'), ('take_profit', 'Take-profit')], max_length=11)),
+                ('trigger_price', models.FloatField()),
+                ('amount', models.IntegerField()),
+                ('status', models.CharField(choices=[('open', 'Open'), ('filled', 'Filled'), ('cancelled', 'Cancelled'), ('rejected', 'Rejected')], default='open', max_length=9)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('fill_price', models.FloatField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, default='', max_length=100)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='orders', to='market.stock')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'open')), fields=['id'], name='market_order_open_idx'), models.Index(fields=['user', 'status'], name='market_order_user_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    # Carry every existing balance and holding into the ledger as opening
+    # entries so that rebuilding projections reproduces the current state.
+    User = apps.get_model('accounts', 'User')
+    Holding = apps.get_model('market', 'Holding')
+    Trade = apps.get_model('market', 'Trade')
+    entries = [
+        Trade(user_id=user_id, kind='opening', cash=balance or 0.0, realized_pnl=realized_pnl or 0.0)
+        for user_id, balance, realized_pnl in User.objects.values_list('id', 'balance', 'realized_pnl')
+    ]
+    entries.extend(
+        Trade(user_id=user_id, stock_id=stock_id, kind='opening', shares=shares, cost_basis=cost_basis)
+        for user_id, stock_id, shares, cost_basis in Holding.objects.values_list('user_id', 'stock_id', 'shares', 'cost_basis')
+    )
+    Trade.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0013_order'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # open_ledger reads User.balance and User.realized_pnl.
+        ('accounts', '0006_user_realized_pnl'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('opening', 'Opening balance'), ('buy', 'Buy'), ('sell', 'Sell'), ('loan', 'Loan'), ('loan_repayment', 'Loan repayment'), ('grant', 'Admin grant'), ('monkey_business', 'Monkey business')], max_length=15)),
+                ('shares', models.IntegerField(default=0)),
+                ('price', models.FloatField(blank=True, null=True)),
+                ('cash', models.FloatField(default=0.0)),
+                ('cost_basis', models.FloatField(default=0.0)),
+                ('realized_pnl', models.FloatField(default=0.0)),
+                ('note', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('stock', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trades', to='market.stock')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trades', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='market_trade_user_ts_idx'), models.Index(fields=['stock', 'created_at'], name='market_trade_stock_ts_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
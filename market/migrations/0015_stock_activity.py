@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0014_trade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockActivity',
+            fields=[
+                ('stock', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to='market.stock')),
+                ('trades_1h', models.IntegerField(default=0)),
+                ('volume_1h', models.BigIntegerField(default=0)),
+                ('notional_1h', models.FloatField(default=0.0)),
+                ('trades_24h', models.IntegerField(default=0)),
+                ('volume_24h', models.BigIntegerField(default=0)),
+                ('notional_24h', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockActivityCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('slot', models.SmallIntegerField()),
+                ('trades', models.IntegerField(default=0)),
+                ('shares', models.BigIntegerField(default=0)),
+                ('notional', models.FloatField(default=0.0)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_counters', to='market.stock')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket_start'], name='market_activity_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('stock', 'bucket_start', 'slot'), name='market_activity_counter_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0015_stock_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='previous_price',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+SECTORS = {
+    'technology': ['CHIQ', 'BAI', 'PTECH', 'BBYT', 'APET', 'BINV', 'BDYN', 'BLAB'],
+    'finance': ['SPLT', 'YFUT', 'CAVD', 'APFN', 'PVEN', 'BBANK', 'GPT', 'SPLI', 'PLNTF', 'MKCP',
+                'BHLD', 'BVEN', 'CHQV', 'PPRT', 'YGOL', 'GOLD', 'CHGL', 'GBA'],
+    'food': ['BANA', 'PLNT', 'BRDC', 'TROP', 'CAVF', 'TPEE', 'CHIF', 'TBFD', 'TPEE2', 'BBRO'],
+    'energy': ['MNKY', 'PWRL'],
+    'transport': ['BJET', 'MMTR', 'BEXP', 'SLIP', 'SLST'],
+    'consumer': ['PEEL', 'SPLC', 'BNPL', 'BRAM', 'PMAS', 'MKNG', 'BREP', 'PCLC'],
+}
+
+
+def assign_sectors(apps, schema_editor):
+    # Same assignment as fixtures/stocks.json for stocks loaded before sectors existed.
+    Stock = apps.get_model('market', 'Stock')
+    for sector, symbols in SECTORS.items():
+        Stock.objects.filter(symbol__in=symbols).update(sector=sector)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0016_stock_previous_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='sector',
+            field=models.CharField(db_index=True, default='general', max_length=50),
+        ),
+        migrations.RunPython(assign_sectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:32
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+# Case-insensitive name prefix search (name__istartswith) compiles to
+# UPPER(name::text) LIKE 'X%' on PostgreSQL, which needs a pattern-ops
+# expression index. Other databases keep the plain scan.
+NAME_PREFIX_INDEX = 'market_stock_name_upper_like'
+
+
+def fill_change(apps, schema_editor):
+    Stock = apps.get_model('market', 'Stock')
+    Stock.objects.filter(previous_price__gt=0).update(
+        change=(F('price') - F('previous_price')) * 100.0 / F('previous_price'),
+    )
+
+
+def create_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {NAME_PREFIX_INDEX} ON market_stock (UPPER(name::text) text_pattern_ops)'
+        )
+
+
+def drop_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {NAME_PREFIX_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0018_joblease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='change',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['price', 'id'], name='market_stock_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['change', 'id'], name='market_stock_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockactivity',
+            index=models.Index(fields=['volume_24h', 'stock'], name='market_activity_volume_idx'),
+        ),
+        migrations.RunPython(fill_change, migrations.RunPython.noop),
+        migrations.RunPython(create_name_index, drop_name_index),
+    ]
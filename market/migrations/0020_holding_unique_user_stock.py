@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    # Older code could create two rows for one user and stock; fold them
+    # into the oldest row before the constraint goes on.
+    Holding = apps.get_model('market', 'Holding')
+    duplicates = (
+        Holding.objects.values('user_id', 'stock_id')
+        .annotate(rows=Count('id'), keep=Min('id'), shares_total=Sum('shares'), cost_total=Sum('cost_basis'))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        Holding.objects.filter(id=group['keep']).update(shares=group['shares_total'], cost_basis=group['cost_total'])
+        Holding.objects.filter(user_id=group['user_id'], stock_id=group['stock_id']).exclude(id=group['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0019_stock_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='holding',
+            constraint=models.UniqueConstraint(fields=('user', 'stock'), name='market_holding_user_stock_uniq'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0020_holding_unique_user_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TickerChangeSet',
+            fields=[
+                ('slot', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField()),
+                ('symbols', models.JSONField(default=list)),
+                ('removed', models.JSONField(default=list)),
+            ],
+        ),
+    ]
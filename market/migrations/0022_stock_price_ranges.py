@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0021_ticker_change_set'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockactivity',
+            name='high_24h',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stockactivity',
+            name='low_24h',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stockactivity',
+            name='open_24h',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='StockPriceBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('open', models.FloatField()),
+                ('high', models.FloatField()),
+                ('low', models.FloatField()),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_buckets', to='market.stock')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket_start'], name='market_price_bucket_start_idx')],
+                'constraints': [models.UniqueConstraint(fields=('stock', 'bucket_start'), name='market_price_bucket_uniq')],
+            },
+        ),
+    ]
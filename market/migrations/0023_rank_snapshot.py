@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0022_stock_price_ranges'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField()),
+                ('rank', models.IntegerField()),
+                ('net_worth', models.FloatField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rank_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period_start', 'rank'], name='market_rank_period_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'period_start'), name='market_rank_user_period_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:46
+
+import django.db.models.deletion
+import django.utils.timezone
+import market.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_default_market(apps, schema_editor):
+    # Existing stocks, users and rank snapshots all join this market, which
+    # gets id 1 (market.models.DEFAULT_MARKET_ID) in the new table.
+    Market = apps.get_model('market', 'Market')
+    Market.objects.get_or_create(slug='main', defaults={'name': 'Main market'})
+
+
+def clear_ticker_change_sets(apps, schema_editor):
+    # Change sets now hold [market id, symbol] pairs; clients behind the
+    # cleared ring get a full snapshot.
+    apps.get_model('market', 'TickerChangeSet').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0023_rank_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Market',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(unique=True)),
+                ('tick_every', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(create_default_market, migrations.RunPython.noop),
+        migrations.RunPython(clear_ticker_change_sets, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='ranksnapshot',
+            name='market_rank_period_rank_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='stock',
+            name='market_stock_price_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='stock',
+            name='market_stock_change_idx',
+        ),
+        migrations.AlterField(
+            model_name='stock',
+            name='symbol',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AddField(
+            model_name='ranksnapshot',
+            name='market',
+            field=models.ForeignKey(default=market.models.default_market, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rank_snapshots', to='market.market'),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='market',
+            field=models.ForeignKey(default=market.models.default_market, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='stocks', to='market.market'),
+        ),
+        migrations.AddIndex(
+            model_name='ranksnapshot',
+            index=models.Index(fields=['market', 'period_start', 'rank'], name='market_rank_period_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['market', 'price', 'id'], name='market_stock_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['market', 'change', 'id'], name='market_stock_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['market', 'symbol'], name='market_stock_symbol_like_idx', opclasses=['int8_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddConstraint(
+            model_name='stock',
+            constraint=models.UniqueConstraint(fields=('market', 'symbol'), name='market_stock_market_symbol_uniq'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0024_markets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='market_order_open_idx',
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'open'), models.Q(models.Q(('kind', 'limit'), ('side', 'sell')), models.Q(('kind', 'stop_loss'), ('side', 'buy')), ('kind', 'take_profit'), _connector='OR')), fields=['stock', 'trigger_price'], name='market_order_open_rise_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'open'), models.Q(models.Q(('kind', 'limit'), ('side', 'buy')), models.Q(('kind', 'stop_loss'), ('side', 'sell')), _connector='OR')), fields=['stock', 'trigger_price'], name='market_order_open_fall_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:14
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_volume(apps, schema_editor):
+    Stock = apps.get_model('market', 'Stock')
+    StockActivity = apps.get_model('market', 'StockActivity')
+    Stock.objects.filter(activity__isnull=False).update(
+        volume=Subquery(StockActivity.objects.filter(stock=OuterRef('pk')).values('volume_24h')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0025_order_trigger_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='stockactivity',
+            name='market_activity_volume_idx',
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='volume',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['market', 'volume', 'id'], name='market_stock_volume_idx'),
+        ),
+        migrations.RunPython(fill_volume, migrations.RunPython.noop),
+    ]
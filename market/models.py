@@ -7,16 +7,74 @@ Description: Models for the market app.
 
 
 from django.db import models
+from django.db.models import F, Q
 import random
 from django.utils import timezone
 
+# The market created by the migrations; rows created without a market join it.
+DEFAULT_MARKET_ID = 1
+
+
+def default_market():
+    return DEFAULT_MARKET_ID
+
+
+class Market(models.Model):
+    """One isolated exchange with its own stocks, traders and leaderboard.
+
+    Traders belong to one market, so their balance and holdings are scoped
+    to it. Every market is moved by the same tick, but only on the base tick
+    periods (MARKET_TICK_SECONDS) where the sequence is a multiple of
+    `tick_every`, so markets can run at different speeds.
+    """
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(unique=True)
+    tick_every = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def is_due(self, sequence):
+        """Whether the market moves on tick `sequence`."""
+        return sequence % max(1, self.tick_every) == 0
+
+    def __str__(self):
+        return self.name
+
 class Stock(models.Model):
     """Model representing a stock in the market."""
+    # Not indexed on its own: every index on the table leads with market.
+    market = models.ForeignKey(
+        'Market', on_delete=models.CASCADE, default=default_market, related_name='stocks', db_index=False,
+    )
     name = models.CharField(max_length=100)
-    symbol = models.CharField(max_length=10, unique=True)
+    symbol = models.CharField(max_length=10)
     price = models.FloatField(default=10.0)
+    previous_price = models.FloatField(null=True, blank=True)
+    # Percent change of the last price move, kept by the price pipeline so
+    # the stock list can sort on an index.
+    change = models.FloatField(default=0.0)
+    # 24h share volume, copied from StockActivity by the activity rollup so
+    # the stock list can sort on an index too.
+    volume = models.BigIntegerField(default=0)
+    sector = models.CharField(max_length=50, default='general', db_index=True)
     volatility_min = models.FloatField(null=True, blank=True)
     volatility_max = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        # Every index leads with the market, so each market's stocks are
+        # one contiguous range of it.
+        constraints = [
+            models.UniqueConstraint(fields=['market', 'symbol'], name='market_stock_market_symbol_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['market', 'price', 'id'], name='market_stock_price_idx'),
+            models.Index(fields=['market', 'change', 'id'], name='market_stock_change_idx'),
+            models.Index(fields=['market', 'volume', 'id'], name='market_stock_volume_idx'),
+            # Symbol prefix search on PostgreSQL; a plain index elsewhere.
+            models.Index(
+                fields=['market', 'symbol'], name='market_stock_symbol_like_idx',
+                opclasses=['int8_ops', 'varchar_pattern_ops'],
+            ),
+        ]
     
     def save(self, *args, **kwargs):
         """Override save to set random volatility if not already set."""
@@ -25,38 +83,6 @@ class Stock(models.Model):
             self.volatility_max = random.uniform(0.05, 0.15)
         super().save(*args, **kwargs)
     
-    def random_fluctuate(self):
-        """Randomly fluctuate the stock price and maintain price history.
-        
-        Uses a realistic random walk with a small upward drift to compensate
-        for the mathematical downward bias of percentage-based changes and
-        simulate real economic growth.
-        """
-        if self.volatility_min is None or self.volatility_max is None or self.volatility_min != -1 * self.volatility_max:
-            base_volatility = random.uniform(0.05, 0.15)
-            self.volatility_min = -1 * base_volatility
-            self.volatility_max = base_volatility
-        
-        if self.price < 0.5:
-            drift = 0.005
-        elif self.price > 5000:
-            drift = -0.01
-        else:
-            drift = 0
-
-        random_change = random.uniform(self.volatility_min, self.volatility_max)
-        total_change = random_change + drift
-        
-        self.price = max(0.1, self.price * (1 + total_change))
-        super().save()  
-
-        StockPriceHistory.objects.create(stock=self, price=self.price)
-
-        history = self.history.order_by('-timestamp')
-        if history.count() > 5000:
-            for old in history[5000:]:
-                old.delete()
-
     def __str__(self):
         return f"{self.name} ({self.symbol}): ${self.price:.2f}"
     
@@ -68,19 +94,361 @@ class StockPriceHistory(models.Model):
 
     class Meta:
         ordering = ['timestamp']  
+        indexes = [
+            models.Index(fields=['stock', 'timestamp'], name='market_hist_stock_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.stock.symbol} @ {self.price:.2f} ({self.timestamp})"
 
+class StockPriceChunk(models.Model):
+    """A window of a stock's price ticks packed into one compressed row.
+
+    Used instead of StockPriceHistory when STOCK_HISTORY_BACKEND is "chunks".
+    Read and write it through market.history rather than directly.
+    """
+    stock = models.ForeignKey('Stock', on_delete=models.CASCADE, related_name='history_chunks')
+    window_start = models.DateTimeField()
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    last_price = models.FloatField()
+    count = models.IntegerField(default=0)
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ['window_start']
+        constraints = [
+            models.UniqueConstraint(fields=['stock', 'window_start'], name='market_chunk_stock_window_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.stock.symbol} chunk @ {self.window_start} ({self.count} ticks)"
+
+class StockActivityCounter(models.Model):
+    """One shard of a stock's trade counters for a short time bucket.
+
+    Trades increment a randomly chosen slot so concurrent trades on the same
+    stock rarely touch the same row. Read through StockActivity, which the
+    tick rolls these up into.
+    """
+    stock = models.ForeignKey('Stock', on_delete=models.CASCADE, related_name='activity_counters')
+    bucket_start = models.DateTimeField()
+    slot = models.SmallIntegerField()
+    trades = models.IntegerField(default=0)
+    shares = models.BigIntegerField(default=0)
+    notional = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['stock', 'bucket_start', 'slot'], name='market_activity_counter_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket_start'], name='market_activity_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.stock.symbol} @ {self.bucket_start.isoformat()} [{self.slot}]: {self.trades} trades"
+
+class StockPriceBucket(models.Model):
+    """Open, high and low price of one stock over a short time bucket.
+
+    Written by the price pipeline alongside history and rolled up every tick
+    into the 24h range on StockActivity. Read and write it through
+    market.ohlc.
+    """
+    stock = models.ForeignKey('Stock', on_delete=models.CASCADE, related_name='price_buckets')
+    bucket_start = models.DateTimeField()
+    open = models.FloatField()
+    high = models.FloatField()
+    low = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['stock', 'bucket_start'], name='market_price_bucket_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket_start'], name='market_price_bucket_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.stock.symbol} @ {self.bucket_start.isoformat()}: {self.low:.2f}-{self.high:.2f}"
+
+class StockActivity(models.Model):
+    """Rolling trade volume and 24h price range of one stock, refreshed every tick.
+
+    The 24h open, high and low are null until the stock has price buckets.
+    """
+    stock = models.OneToOneField('Stock', on_delete=models.CASCADE, primary_key=True, related_name='activity')
+    trades_1h = models.IntegerField(default=0)
+    volume_1h = models.BigIntegerField(default=0)
+    notional_1h = models.FloatField(default=0.0)
+    trades_24h = models.IntegerField(default=0)
+    volume_24h = models.BigIntegerField(default=0)
+    notional_24h = models.FloatField(default=0.0)
+    open_24h = models.FloatField(null=True, blank=True)
+    high_24h = models.FloatField(null=True, blank=True)
+    low_24h = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.stock.symbol}: {self.volume_24h} shares / 24h"
+
 class Holding(models.Model):
     """Model representing a user's holding of a stock."""
     user = models.ForeignKey('accounts.User', on_delete=models.CASCADE)
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
     shares = models.IntegerField(default=0)
+    cost_basis = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'stock'], name='market_holding_user_stock_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name} holds {self.shares} shares of {self.stock.symbol}"
 
+    def apply_buy(self, amount, price):
+        """Add `amount` shares bought at `price` to the holding and its cost basis."""
+        self.shares += amount
+        self.cost_basis += amount * price
+
+    def released_cost(self, amount):
+        """Return the cost basis released by selling `amount` shares at average cost."""
+        if amount >= self.shares:
+            return self.cost_basis
+        return (self.cost_basis / self.shares) * amount if self.shares else 0.0
+
+    def apply_sell(self, amount, price):
+        """Remove `amount` shares sold at `price` at average cost.
+
+        Returns the realized profit or loss of the sale.
+        """
+        released = self.released_cost(amount)
+        self.shares -= amount
+        self.cost_basis = max(0.0, self.cost_basis - released) if self.shares > 0 else 0.0
+        return amount * price - released
+
+class Trade(models.Model):
+    """One append-only ledger entry changing a user's cash and/or shares.
+
+    User.balance, User.realized_pnl and Holding are projections of this
+    ledger: each is the sum of the matching columns over a user's entries.
+    Post entries through market.ledger so the projections stay in step.
+    """
+    OPENING = 'opening'
+    BUY = 'buy'
+    SELL = 'sell'
+    LOAN = 'loan'
+    LOAN_REPAYMENT = 'loan_repayment'
+    GRANT = 'grant'
+    MONKEY_BUSINESS = 'monkey_business'
+
+    user = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='trades')
+    stock = models.ForeignKey(Stock, on_delete=models.SET_NULL, null=True, blank=True, related_name='trades')
+    kind = models.CharField(
+        max_length=15,
+        choices=[
+            (OPENING, "Opening balance"),
+            (BUY, "Buy"),
+            (SELL, "Sell"),
+            (LOAN, "Loan"),
+            (LOAN_REPAYMENT, "Loan repayment"),
+            (GRANT, "Admin grant"),
+            (MONKEY_BUSINESS, "Monkey business"),
+        ],
+    )
+    shares = models.IntegerField(default=0)
+    price = models.FloatField(null=True, blank=True)
+    cash = models.FloatField(default=0.0)
+    cost_basis = models.FloatField(default=0.0)
+    realized_pnl = models.FloatField(default=0.0)
+    note = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='market_trade_user_ts_idx'),
+            models.Index(fields=['stock', 'created_at'], name='market_trade_stock_ts_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Trades are append-only and cannot be modified")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        target = f" {self.shares} {self.stock.symbol}" if self.stock_id else ""
+        return f"{self.user} {self.kind}{target} {self.cash:+.2f} @ {self.created_at.isoformat()}"
+
+class PortfolioAnalytics(models.Model):
+    """Precomputed risk/return statistics for one user's portfolio.
+
+    Rebuilt for every user at once by the compute_portfolio_analytics command
+    so the portfolio page can render them without any computation.
+    """
+    user = models.OneToOneField('accounts.User', on_delete=models.CASCADE, related_name='analytics')
+    computed_at = models.DateTimeField(default=timezone.now)
+    lookback_days = models.IntegerField(default=7)
+
+    balance = models.FloatField(default=0.0)
+    stocks_value = models.FloatField(default=0.0)
+    net_worth = models.FloatField(default=0.0)
+    cost_basis = models.FloatField(default=0.0)
+    realized_pnl = models.FloatField(default=0.0)
+    unrealized_pnl = models.FloatField(default=0.0)
+    positions = models.IntegerField(default=0)
+    largest_position_weight = models.FloatField(default=0.0)
+
+    time_weighted_return = models.FloatField(null=True, blank=True)
+    volatility = models.FloatField(null=True, blank=True)
+    max_drawdown = models.FloatField(null=True, blank=True)
+    sharpe_ratio = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Analytics for {self.user} @ {self.computed_at.isoformat()}"
+
+class RankSnapshot(models.Model):
+    """One user's leaderboard rank within their market at the start of a period.
+
+    Written for every user at once by market.rankings.snapshot(); read
+    through the (user, period) and (market, period, rank) indexes.
+    """
+    market = models.ForeignKey(
+        'Market', on_delete=models.CASCADE, default=default_market, related_name='rank_snapshots', db_index=False,
+    )
+    period_start = models.DateTimeField()
+    user = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='rank_snapshots')
+    rank = models.IntegerField()
+    net_worth = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period_start'], name='market_rank_user_period_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['market', 'period_start', 'rank'], name='market_rank_period_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} #{self.rank} @ {self.period_start.isoformat()}"
+
+class PriceAlert(models.Model):
+    """A user's request to be notified when a stock crosses a price.
+
+    Pending alerts are evaluated by market.alerts whenever a price moves;
+    once fired, `triggered_at` is set and the alert shows up in the user's
+    notification feed.
+    """
+    ABOVE = 'above'
+    BELOW = 'below'
+
+    user = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='price_alerts')
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='alerts')
+    direction = models.CharField(
+        max_length=5,
+        choices=[
+            (ABOVE, "Rises above"),
+            (BELOW, "Falls below"),
+        ],
+    )
+    threshold = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    triggered_at = models.DateTimeField(null=True, blank=True)
+    triggered_price = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Only pending alerts are searched on a tick, as a range over
+            # threshold within one (stock, direction).
+            models.Index(
+                fields=['stock', 'direction', 'threshold'],
+                name='market_alert_pending_idx',
+                condition=Q(triggered_at__isnull=True),
+            ),
+            models.Index(fields=['user', 'triggered_at'], name='market_alert_user_fired_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} alert: {self.stock.symbol} {self.direction} {self.threshold:.2f}"
+
+# Orders that fire once the price rises to their trigger, and those that
+# fire once it falls to it (see market.orders.fires_on_rise).
+ORDER_FIRES_ON_RISE = Q(kind='limit', side='sell') | Q(kind='stop_loss', side='buy') | Q(kind='take_profit')
+ORDER_FIRES_ON_FALL = Q(kind='limit', side='buy') | Q(kind='stop_loss', side='sell')
+
+
+class Order(models.Model):
+    """A resting limit, stop-loss or take-profit order.
+
+    Open orders are executed at the new price once a price move reaches
+    their trigger price; market.orders finds them with a range scan of one of the two
+    partial indexes below.
+    """
+    BUY = 'buy'
+    SELL = 'sell'
+
+    LIMIT = 'limit'
+    STOP_LOSS = 'stop_loss'
+    TAKE_PROFIT = 'take_profit'
+
+    OPEN = 'open'
+    FILLED = 'filled'
+    CANCELLED = 'cancelled'
+    REJECTED = 'rejected'
+
+    user = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='orders')
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='orders')
+    side = models.CharField(max_length=4, choices=[(BUY, "Buy"), (SELL, "Sell")])
+    kind = models.CharField(
+        max_length=11,
+        choices=[
+            (LIMIT, "Limit"),
+            (STOP_LOSS, "Stop-loss"),
+            (TAKE_PROFIT, "Take-profit"),
+        ],
+    )
+    trigger_price = models.FloatField()
+    amount = models.IntegerField()
+    status = models.CharField(
+        max_length=9,
+        choices=[
+            (OPEN, "Open"),
+            (FILLED, "Filled"),
+            (CANCELLED, "Cancelled"),
+            (REJECTED, "Rejected"),
+        ],
+        default=OPEN,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    fill_price = models.FloatField(null=True, blank=True)
+    note = models.CharField(max_length=100, blank=True, default='')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Open orders by trigger direction, so a tick only reads the
+            # (stock, trigger_price) range its price has reached.
+            models.Index(
+                fields=['stock', 'trigger_price'],
+                name='market_order_open_rise_idx',
+                condition=Q(status='open') & ORDER_FIRES_ON_RISE,
+            ),
+            models.Index(
+                fields=['stock', 'trigger_price'],
+                name='market_order_open_fall_idx',
+                condition=Q(status='open') & ORDER_FIRES_ON_FALL,
+            ),
+            models.Index(fields=['user', 'status'], name='market_order_user_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.kind} {self.side} {self.amount} {self.stock.symbol} @ {self.trigger_price:.2f} ({self.status})"
+
+
 class MarketEvent(models.Model):
     """Model representing a market event that can impact stock prices."""
     text = models.CharField(max_length=200)
@@ -97,12 +465,6 @@ class MarketEvent(models.Model):
     impact_low = models.FloatField()
     impact_high = models.FloatField()
     
-    def apply_event(self, stock):
-        """Apply the market event to a given stock."""
-        impact = random.uniform(self.impact_low, self.impact_high)
-        stock.price = max(0.1, stock.price * (1 + impact))
-        stock.save()
-
     def __str__(self):
         return f"{self.text} (Impact: {self.impact_low} - {self.impact_high})"
 
@@ -122,3 +484,69 @@ class MarketEventApplication(models.Model):
     def __str__(self):
         return f"{self.event.text} -> {self.stock.symbol} @ {self.created_at.isoformat()}"
 
+
+class JobLease(models.Model):
+    """A named, expiring lock over a scheduled job, shared by every runner.
+
+    Only the holder may run the job until `expires_at`; a runner that dies
+    mid-job simply lets the lease lapse. `last_sequence` is the last tick
+    sequence the job completed, so a late duplicate run can tell it has
+    nothing to do. Managed through market.scheduling.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    holder = models.CharField(max_length=200, blank=True, default='')
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    last_sequence = models.BigIntegerField(default=0)
+    last_completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} held by {self.holder or 'nobody'} (sequence {self.last_sequence})"
+
+
+class MarketState(models.Model):
+    """Singleton row with market-wide counters shared by the web and cron processes.
+
+    `version` increases whenever recorded price history changes, so caches
+    derived from history can be keyed on it.
+    """
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SINGLETON_ID = 1
+
+    @classmethod
+    def current_version(cls):
+        """Return the current market version (0 before the first price change)."""
+        version = cls.objects.filter(id=cls.SINGLETON_ID).values_list('version', flat=True).first()
+        return version or 0
+
+    @classmethod
+    def bump_version(cls):
+        """Atomically increment the market version and return the new version."""
+        updated = cls.objects.filter(id=cls.SINGLETON_ID).update(
+            version=F('version') + 1, updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.objects.get_or_create(id=cls.SINGLETON_ID, defaults={'version': 1})
+        return cls.current_version()
+
+    def __str__(self):
+        return f"Market state v{self.version}"
+
+
+class TickerChangeSet(models.Model):
+    """One slot of the ring of recent market versions kept for delta ticker polls.
+
+    Slot `version % MARKET_TICKER_HISTORY` holds the symbols whose price
+    changed (`symbols`) or that were deleted (`removed`) at `version`, so a
+    client can ask for just what changed since the version it last saw.
+    Read and write it through market.ticker.
+    """
+    slot = models.PositiveIntegerField(primary_key=True)
+    version = models.BigIntegerField()
+    symbols = models.JSONField(default=list)
+    removed = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"Ticker changes v{self.version}: {len(self.symbols)} changed, {len(self.removed)} removed"
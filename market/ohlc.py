@@ -0,0 +1,119 @@
+"""
+File: ohlc.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Per-stock price buckets and the rolling 24h open/high/low rolled up from them.
+
+The price pipeline folds every recorded price into its stock's current
+bucket (open, high, low), so a stock's last 24h are at most 289 bucket rows
+instead of one history row per tick. Every tick the buckets are rolled up
+into the 24h open, high and low on StockActivity, which the stock list,
+stock detail and ticker already read.
+"""
+
+
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Max, Min, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from market import history
+from market.activity import bucket_start
+from market.models import Stock, StockActivity, StockPriceBucket
+
+
+WINDOW = timedelta(hours=24)
+
+
+def record(points, batch_size=500):
+    """Fold (stock_id, timestamp, price) points, oldest first, into their buckets.
+
+    One INSERT ... ON CONFLICT DO UPDATE per batch widens existing buckets
+    in place. Works on PostgreSQL and SQLite.
+    """
+    buckets = {}
+    for stock_id, timestamp, price in points:
+        key = (stock_id, bucket_start(timestamp))
+        entry = buckets.get(key)
+        if entry is None:
+            buckets[key] = [price, price, price]
+        else:
+            entry[1] = max(entry[1], price)
+            entry[2] = min(entry[2], price)
+    if not buckets:
+        return
+
+    rows = [
+        (stock_id, connection.ops.adapt_datetimefield_value(start), open_, high, low)
+        for (stock_id, start), (open_, high, low) in buckets.items()
+    ]
+    greatest, least = ('GREATEST', 'LEAST') if connection.vendor == 'postgresql' else ('MAX', 'MIN')
+    qn = connection.ops.quote_name
+    table = qn(StockPriceBucket._meta.db_table)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {table} (stock_id, bucket_start, {qn('open')}, high, low) VALUES {values} "
+                f"ON CONFLICT (stock_id, bucket_start) DO UPDATE SET "
+                f"high = {greatest}({table}.high, excluded.high), "
+                f"low = {least}({table}.low, excluded.low)",
+                [value for row in batch for value in row],
+            )
+
+
+def rollup(now=None):
+    """Recompute every stock's 24h open, high and low and drop expired buckets.
+
+    One aggregate query over the last 24h of buckets, one upsert of the
+    StockActivity rows and one DELETE. Returns the number of stocks updated.
+    """
+    now = now or timezone.now()
+    start = bucket_start(now - WINDOW)
+    in_window = Q(price_buckets__bucket_start__gte=start)
+    first_open = (
+        StockPriceBucket.objects.filter(stock=OuterRef('pk'), bucket_start__gte=start)
+        .order_by('bucket_start')
+        .values('open')[:1]
+    )
+
+    rows = Stock.objects.annotate(
+        open_24h=Subquery(first_open),
+        high_24h=Max('price_buckets__high', filter=in_window),
+        low_24h=Min('price_buckets__low', filter=in_window),
+    ).values_list('id', 'open_24h', 'high_24h', 'low_24h')
+
+    records = [
+        StockActivity(stock_id=stock_id, open_24h=open_24h, high_24h=high_24h, low_24h=low_24h)
+        for stock_id, open_24h, high_24h, low_24h in rows
+    ]
+    StockActivity.objects.bulk_create(
+        records,
+        update_conflicts=True,
+        unique_fields=['stock'],
+        update_fields=['open_24h', 'high_24h', 'low_24h'],
+    )
+    StockPriceBucket.objects.filter(bucket_start__lt=start).delete()
+    return len(records)
+
+
+def rebuild(now=None):
+    """Refill the last 24h of buckets from price history. Returns the number of points read."""
+    now = now or timezone.now()
+    since = bucket_start(now - WINDOW)
+    StockPriceBucket.objects.all().delete()
+
+    read = 0
+    batch = []
+    for point in history.iter_points(since=since):
+        batch.append(point)
+        if len(batch) >= 5000:
+            record(batch)
+            read += len(batch)
+            batch = []
+    if batch:
+        record(batch)
+        read += len(batch)
+    return read
@@ -0,0 +1,194 @@
+"""
+File: orders.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Finding the open orders a price move triggered and settling them in bulk.
+"""
+
+
+from collections import defaultdict
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import User
+from market import ledger
+from market.models import ORDER_FIRES_ON_FALL, ORDER_FIRES_ON_RISE, Holding, Order
+
+
+def fires_on_rise(side, kind):
+    """Return True if a (side, kind) order triggers at price >= trigger, False if at price <= trigger.
+
+    Limit buys and stop-loss sells wait for the price to fall; limit sells,
+    stop buys and take-profit sells wait for it to rise.
+    """
+    if kind == Order.LIMIT:
+        return side == Order.SELL
+    if kind == Order.STOP_LOSS:
+        return side == Order.BUY
+    return True
+
+
+def _reached(prices, direction, op, batch_size=500):
+    """Return (stock_id, order id, trigger price) of the open `direction` orders whose trigger is `op` their stock's price.
+
+    `prices` ({stock_id: price}) is joined as a VALUES list, so a batch of
+    stocks is one statement of fixed shape instead of one OR term per
+    stock, and each stock is one range scan of the direction's partial
+    (stock, trigger_price) index. Works on PostgreSQL and SQLite.
+    """
+    query = Order.objects.filter(direction, status=Order.OPEN).query
+    where, where_params = query.get_compiler(connection=connection).compile(query.where)
+    qn = connection.ops.quote_name
+    table = qn(Order._meta.db_table)
+    columns = f"{table}.stock_id, {table}.id, {table}.trigger_price"
+    condition = (
+        f"{table}.stock_id = reached.column1 AND {table}.trigger_price {op} reached.column2 AND {where}"
+    )
+    rows = list(prices.items())
+    found = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            values = ', '.join(['(%s, %s)'] * len(batch))
+            if connection.vendor == 'postgresql':
+                # OFFSET 0 stops PostgreSQL flattening the probe into a hash
+                # join over every open order: it cannot tell how few orders
+                # each price reaches.
+                sql = (
+                    f"SELECT found.* FROM (VALUES {values}) AS reached CROSS JOIN LATERAL "
+                    f"(SELECT {columns} FROM {table} WHERE {condition} OFFSET 0) AS found ORDER BY found.id"
+                )
+            else:
+                sql = f"SELECT {columns} FROM (VALUES {values}) AS reached, {table} WHERE {condition} ORDER BY {table}.id"
+            cursor.execute(sql, [value for row in batch for value in row] + list(where_params))
+            found.extend(cursor.fetchall())
+    return found
+
+
+def triggered(prices):
+    """Return {stock_id: [order ids]} of the open orders triggered by `prices` ({stock_id: price}).
+
+    Each trigger direction is one query over its partial index on
+    (stock, trigger_price), reading only the range each price has reached,
+    so the cost follows the orders that fire, not the ones that keep
+    resting. Nothing is kept between ticks, which run as separate processes.
+    """
+    if not prices:
+        return {}
+    found = defaultdict(list)
+    for direction, op in ((ORDER_FIRES_ON_RISE, '<='), (ORDER_FIRES_ON_FALL, '>=')):
+        for stock_id, order_id, _ in _reached(prices, direction, op):
+            found[stock_id].append(order_id)
+    return dict(found)
+
+
+def match(prices, now=None):
+    """Execute every open order triggered by `prices` ({stock_id: price}).
+
+    Returns (filled, rejected).
+    """
+    orders = triggered(prices)
+    if not orders:
+        return 0, 0
+    return settle(orders, prices, now=now)
+
+
+def match_path(stock_ids, path, times):
+    """Execute the open orders reached anywhere along a replayed price path.
+
+    `path` is a (steps, stocks) array of the prices of `stock_ids` at
+    `times`. One lookup per trigger direction finds the orders reached by
+    each stock's highest or lowest price on the path; each then executes at
+    the first step whose price reaches its trigger, earlier steps first.
+    Returns (filled, rejected).
+    """
+    column = {stock_id: i for i, stock_id in enumerate(stock_ids)}
+    highs = dict(zip(stock_ids, path.max(axis=0).tolist()))
+    lows = dict(zip(stock_ids, path.min(axis=0).tolist()))
+
+    by_step = defaultdict(lambda: defaultdict(list))
+    for direction, op, extremes in ((ORDER_FIRES_ON_RISE, '<=', highs), (ORDER_FIRES_ON_FALL, '>=', lows)):
+        for stock_id, order_id, trigger in _reached(extremes, direction, op):
+            prices = path[:, column[stock_id]]
+            step = int(np.argmax(prices >= trigger if op == '<=' else prices <= trigger))
+            by_step[step][stock_id].append(order_id)
+
+    filled = rejected = 0
+    for step in sorted(by_step):
+        reached = by_step[step]
+        step_filled, step_rejected = settle(
+            reached, {stock_id: float(path[step, column[stock_id]]) for stock_id in reached}, now=times[step],
+        )
+        filled += step_filled
+        rejected += step_rejected
+    return filled, rejected
+
+
+def settle(triggered, prices, now=None):
+    """Fill or reject triggered orders in a single transaction.
+
+    `triggered` maps stock_id -> order ids. Orders execute at the stock's
+    price in `prices`, in creation order, so earlier orders get the first
+    claim on a user's balance and shares. Fills are posted to the trade ledger in one
+    batch, so everything is read and written with a fixed number of bulk
+    queries regardless of how many orders fire.
+    """
+    now = now or timezone.now()
+    order_ids = [order_id for ids in triggered.values() for order_id in ids]
+
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(id__in=order_ids, status=Order.OPEN)
+            .order_by('created_at', 'id')
+        )
+        if not orders:
+            return 0, 0
+
+        user_ids = {order.user_id for order in orders}
+        stock_ids = {order.stock_id for order in orders}
+        balances = dict(User.objects.select_for_update().filter(id__in=user_ids).values_list('id', 'balance'))
+        holdings = {}
+        for holding in Holding.objects.select_for_update().filter(user_id__in=user_ids, stock_id__in=stock_ids).order_by('id'):
+            holdings.setdefault((holding.user_id, holding.stock_id), holding)
+
+        # Balances and holdings are tracked in memory so that later orders
+        # see the effect of earlier fills; the ledger applies the net result.
+        trades = []
+        filled = rejected = 0
+        for order in orders:
+            price = prices[order.stock_id]
+            key = (order.user_id, order.stock_id)
+            holding = holdings.get(key)
+            order.closed_at = now
+            note = f'order #{order.id}'
+
+            if order.side == Order.BUY:
+                cost = price * order.amount
+                if balances[order.user_id] < cost:
+                    order.status, order.note = Order.REJECTED, 'Insufficient funds'
+                    rejected += 1
+                    continue
+                if holding is None:
+                    holding = holdings[key] = Holding(user_id=order.user_id, stock_id=order.stock_id, shares=0)
+                trades.append(ledger.buy(order.user_id, order.stock_id, order.amount, price, note=note))
+                balances[order.user_id] -= cost
+                holding.apply_buy(order.amount, price)
+            else:
+                if holding is None or holding.shares < order.amount:
+                    order.status, order.note = Order.REJECTED, 'Not enough shares'
+                    rejected += 1
+                    continue
+                trades.append(ledger.sell(holding, order.amount, price, note=note))
+                balances[order.user_id] += price * order.amount
+                holding.apply_sell(order.amount, price)
+
+            order.status, order.fill_price = Order.FILLED, price
+            filled += 1
+
+        Order.objects.bulk_update(orders, ['status', 'closed_at', 'fill_price', 'note'])
+        ledger.post(trades)
+
+    return filled, rejected
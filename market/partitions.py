@@ -0,0 +1,269 @@
+"""
+File: partitions.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Time-range partition management for the stock price history table.
+"""
+
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from market.models import StockPriceHistory
+
+
+INTERVALS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+# One-letter tag baked into partition names so the window length can be
+# recovered from the name even after the configured mode changes.
+_MODE_TAGS = {'daily': 'd', 'weekly': 'w'}
+_TAG_MODES = {tag: mode for mode, tag in _MODE_TAGS.items()}
+
+
+def history_table():
+    """Return the database table name of StockPriceHistory."""
+    return StockPriceHistory._meta.db_table
+
+
+def partitioning_mode():
+    """Return the configured partition mode ('daily'/'weekly') or None when disabled."""
+    mode = (getattr(settings, 'STOCK_HISTORY_PARTITIONING', '') or '').strip().lower()
+    if not mode:
+        return None
+    if mode not in INTERVALS:
+        raise ValueError(f"Unknown STOCK_HISTORY_PARTITIONING mode: {mode}")
+    return mode
+
+
+def supports_partitioning():
+    """Native partitioning is only available on PostgreSQL."""
+    return connection.vendor == 'postgresql'
+
+
+def window_start(moment, mode):
+    """Return the UTC start of the partition window containing `moment`.
+
+    Daily windows start at midnight UTC, weekly windows on Monday midnight UTC.
+    """
+    moment = moment.astimezone(dt_timezone.utc)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if mode == 'weekly':
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def partition_name(start, mode):
+    """Return the child table name for the window starting at `start`."""
+    return f"{history_table()}_{_MODE_TAGS[mode]}{start:%Y%m%d}"
+
+
+def _parse_partition_name(name):
+    """Return (start, end) for a partition created by this module, else None."""
+    prefix = history_table() + '_'
+    if not name.startswith(prefix):
+        return None
+    suffix = name[len(prefix):]
+    mode = _TAG_MODES.get(suffix[:1])
+    if mode is None:
+        return None
+    try:
+        start = datetime.strptime(suffix[1:], '%Y%m%d').replace(tzinfo=dt_timezone.utc)
+    except ValueError:
+        return None
+    return start, start + INTERVALS[mode]
+
+
+def is_partitioned():
+    """Return True if the history table is already a partitioned parent."""
+    if not supports_partitioning():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [history_table()],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Return [(name, start, end)] for the managed partitions, oldest first."""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [history_table()],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        bounds = _parse_partition_name(name)
+        if bounds:
+            partitions.append((name, bounds[0], bounds[1]))
+    partitions.sort(key=lambda p: p[1])
+    return partitions
+
+
+def convert_to_partitioned():
+    """Rebuild the history table as a range-partitioned parent (PostgreSQL only).
+
+    Existing rows are copied into window partitions and a DEFAULT partition
+    catches anything outside the pre-created windows, so inserts never fail.
+    The table keeps its name, columns, indexes and foreign keys, so the ORM
+    does not notice the change. Returns False if nothing had to be done.
+    """
+    if not supports_partitioning():
+        raise RuntimeError("Table partitioning requires PostgreSQL")
+    if is_partitioned():
+        return False
+
+    mode = partitioning_mode() or 'daily'
+    table = history_table()
+    legacy = f"{table}_legacy"
+    seq = f"{table}_part_id_seq"
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = %s AND schemaname = current_schema()",
+            [table],
+        )
+        index_defs = [(name, ddl) for name, ddl in cursor.fetchall() if not name.endswith('_pkey')]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        fk_defs = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        for name, _ in index_defs:
+            cursor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(name + '_legacy')}")
+
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1, MIN(timestamp), MAX(timestamp) FROM {qn(legacy)}")
+        next_id, oldest, newest = cursor.fetchone()
+
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(seq)}")
+        cursor.execute("SELECT setval(%s, %s, false)", [seq, next_id])
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} ("
+            f" id bigint NOT NULL DEFAULT nextval('{seq}'),"
+            f" price double precision NOT NULL,"
+            f" timestamp timestamp with time zone NOT NULL,"
+            f" stock_id bigint NOT NULL,"
+            f" PRIMARY KEY (id, timestamp)"
+            f") PARTITION BY RANGE (timestamp)"
+        )
+        cursor.execute(f"ALTER SEQUENCE {qn(seq)} OWNED BY {qn(table)}.id")
+        for name, ddl in fk_defs:
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {ddl}")
+        for _, ddl in index_defs:
+            cursor.execute(ddl)
+        cursor.execute(f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT")
+
+        now = datetime.now(dt_timezone.utc)
+        _create_windows(cursor, mode, oldest or now, now)
+
+        cursor.execute(
+            f"INSERT INTO {qn(table)} (id, price, timestamp, stock_id) "
+            f"SELECT id, price, timestamp, stock_id FROM {qn(legacy)}"
+        )
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+    return True
+
+
+def _create_windows(cursor, mode, first, last):
+    """Create every missing window partition between `first` and `last`."""
+    existing = {name for name, _, _ in list_partitions()}
+    created = []
+    start = window_start(first, mode)
+    while start <= last:
+        name = partition_name(start, mode)
+        if name not in existing:
+            _create_partition(cursor, name, start, start + INTERVALS[mode])
+            created.append(name)
+        start += INTERVALS[mode]
+    return created
+
+
+def _create_partition(cursor, name, start, end):
+    """Create one window partition, moving any rows parked in the DEFAULT partition."""
+    qn = connection.ops.quote_name
+    table = history_table()
+    default = table + '_default'
+
+    cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {qn(default)} WHERE timestamp >= %s AND timestamp < %s RETURNING *) "
+        f"INSERT INTO {qn(name)} SELECT * FROM moved",
+        [start, end],
+    )
+    cursor.execute(
+        f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)",
+        [start, end],
+    )
+
+
+def ensure_partitions(ahead=None, now=None):
+    """Pre-create the current window plus `ahead` future windows.
+
+    Returns the names of the partitions created. A no-op (empty list) when
+    partitioning is disabled or the database cannot partition.
+    """
+    mode = partitioning_mode()
+    if mode is None or not is_partitioned():
+        return []
+    if ahead is None:
+        ahead = getattr(settings, 'STOCK_HISTORY_PARTITIONS_AHEAD', 7)
+    now = now or datetime.now(dt_timezone.utc)
+    with transaction.atomic(), connection.cursor() as cursor:
+        return _create_windows(cursor, mode, now, now + INTERVALS[mode] * ahead)
+
+
+def drop_partitions_before(cutoff):
+    """Drop all history in windows that end at or before `cutoff`.
+
+    On a partitioned PostgreSQL table this detaches nothing row by row: each
+    expired window is dropped as a whole table. Elsewhere (SQLite, or when
+    the table was never converted) it falls back to a single range DELETE
+    aligned to the same window boundaries. Returns (windows, rows) removed;
+    rows is None when the count is unknown because whole tables were dropped.
+    """
+    mode = partitioning_mode() or 'daily'
+    boundary = window_start(cutoff, mode)
+
+    if not is_partitioned():
+        deleted, _ = StockPriceHistory.objects.filter(timestamp__lt=boundary).delete()
+        return (1 if deleted else 0), deleted
+
+    qn = connection.ops.quote_name
+    dropped = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        for name, start, end in list_partitions():
+            if end <= boundary:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+                dropped += 1
+        cursor.execute(
+            f"DELETE FROM {qn(history_table() + '_default')} WHERE timestamp < %s",
+            [boundary],
+        )
+    return dropped, None
+
+
+def retention_cutoff(now=None):
+    """Return the oldest timestamp kept under STOCK_HISTORY_RETENTION_DAYS."""
+    days = getattr(settings, 'STOCK_HISTORY_RETENTION_DAYS', 14)
+    return (now or datetime.now(dt_timezone.utc)) - timedelta(days=days)
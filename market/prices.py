@@ -0,0 +1,132 @@
+"""
+File: prices.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: The single path for changing stock prices, batching price and history writes.
+"""
+
+
+from collections import namedtuple
+from contextlib import contextmanager
+import threading
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from market import alerts, history, ohlc, orders, ticker
+from market.models import MarketState, Stock
+
+
+PriceChange = namedtuple('PriceChange', ['stock_id', 'symbol', 'old_price', 'new_price', 'timestamp', 'source'])
+
+# Sent once per flushed batch after its transaction commits, with
+# `changes` (a list of PriceChange) and `version` (the new market version).
+price_changed = Signal()
+
+_local = threading.local()
+
+
+class PriceBatch:
+    """Price changes buffered until the end of the enclosing batch() block.
+
+    Several changes to the same stock collapse into one, keeping the first
+    old price and the last new price.
+    """
+
+    def __init__(self, source='', now=None):
+        self.source = source
+        self.now = now
+        self.pending = {}
+        self.changes = []
+        self.alerts_fired = 0
+        self.orders_filled = 0
+        self.orders_rejected = 0
+
+    def set(self, stock, price):
+        """Buffer `stock` moving to `price`; the instance is updated immediately."""
+        old_price = self.pending[stock.id][1] if stock.id in self.pending else stock.price
+        stock.price = price
+        self.pending[stock.id] = (stock, old_price)
+
+    def flush(self):
+        """Write all buffered changes and return them as PriceChange tuples.
+
+        One bulk UPDATE of the stock rows, one history write, one price
+        bucket upsert, one market version bump (with its ticker change set),
+        one alert evaluation and one order match, however many stocks moved.
+        """
+        if not self.pending:
+            return []
+        now = self.now or timezone.now()
+        changes = [
+            PriceChange(stock.id, stock.symbol, old_price, stock.price, now, self.source)
+            for stock, old_price in self.pending.values()
+        ]
+        stocks = []
+        for stock, old_price in self.pending.values():
+            stock.previous_price = old_price
+            stock.change = percent_change(old_price, stock.price)
+            stocks.append(stock)
+        self.pending = {}
+
+        with transaction.atomic():
+            Stock.objects.bulk_update(stocks, ['price', 'previous_price', 'change'])
+            history.record_many((c.stock_id, c.timestamp, c.new_price) for c in changes)
+            ohlc.record((c.stock_id, c.timestamp, c.new_price) for c in changes)
+            ticker.record(MarketState.bump_version(), ((stock.market_id, stock.symbol) for stock in stocks))
+            self.alerts_fired += alerts.evaluate((c.stock_id, c.old_price, c.new_price) for c in changes)
+            filled, rejected = orders.match({c.stock_id: c.new_price for c in changes}, now=now)
+            self.orders_filled += filled
+            self.orders_rejected += rejected
+            transaction.on_commit(lambda: _publish(changes))
+
+        self.changes.extend(changes)
+        return changes
+
+
+def percent_change(old_price, new_price):
+    """Return the move from `old_price` to `new_price` in percent, 0 when unknown."""
+    if not old_price:
+        return 0.0
+    return round((new_price - old_price) / old_price * 100, 4)
+
+
+def _publish(changes):
+    price_changed.send(sender=PriceBatch, changes=changes, version=MarketState.current_version())
+
+
+def current_batch():
+    """Return the innermost active PriceBatch on this thread, or None."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def batch(source='', now=None):
+    """Buffer every price change made inside the block and flush them together.
+
+    Nested blocks join the outermost batch, so a caller can wrap code that
+    changes prices one stock at a time and still get a single bulk write.
+    Everything runs in one transaction; nothing is written if the block
+    raises.
+    """
+    outer = current_batch()
+    if outer is not None:
+        yield outer
+        return
+
+    current = PriceBatch(source, now)
+    _local.stack = [current]
+    try:
+        with transaction.atomic():
+            yield current
+            current.flush()
+    finally:
+        _local.stack = []
+
+
+def set_price(stock, price, source=''):
+    """Change one stock's price, joining the active batch if there is one."""
+    with batch(source) as current:
+        current.set(stock, price)
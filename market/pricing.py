@@ -0,0 +1,236 @@
+"""
+File: pricing.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Pluggable, vectorized price models that move the whole market in one draw.
+"""
+
+
+import json
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+MIN_PRICE = 0.1
+
+
+class Universe:
+    """The tradable stocks as parallel NumPy arrays, in a fixed order."""
+
+    def __init__(self, ids, prices, volatility_min, volatility_max, sectors, all_sectors=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=float)
+        self.volatility_min = np.asarray(volatility_min, dtype=float)
+        self.volatility_max = np.asarray(volatility_max, dtype=float)
+        self.sectors = list(sectors)
+        # Every sector in the market, when this universe is only one shard of it.
+        self.all_sectors = sorted(set(all_sectors or ()) | set(self.sectors))
+
+    @classmethod
+    def from_stocks(cls, stocks, all_sectors=None):
+        return cls(
+            [s.id for s in stocks],
+            [s.price for s in stocks],
+            [s.volatility_min for s in stocks],
+            [s.volatility_max for s in stocks],
+            [s.sector or 'general' for s in stocks],
+            all_sectors,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def ensure_symmetric_volatility(stocks, rng=None):
+    """Give stocks with missing or lopsided volatility a fresh symmetric range.
+
+    Returns the stocks that changed so the caller can save them.
+    """
+    rng = rng or np.random.default_rng()
+    fixed = []
+    for stock in stocks:
+        if stock.volatility_min is None or stock.volatility_max is None or stock.volatility_min != -1 * stock.volatility_max:
+            base = float(rng.uniform(0.05, 0.15))
+            stock.volatility_min, stock.volatility_max = -base, base
+            fixed.append(stock)
+    return fixed
+
+
+def drift(prices):
+    """Small mean-reverting drift keeping prices away from the floor and runaway highs."""
+    return np.where(prices < 0.5, 0.005, np.where(prices > 5000, -0.01, 0.0))
+
+
+class PriceModel:
+    """Base class for price models; subclasses draw one tick of returns for a universe.
+
+    `rng` drives per-stock randomness. `common_rng` drives market-wide
+    randomness and is seeded identically on every shard of a sharded tick,
+    so shards agree on shared factors; it defaults to `rng`.
+    """
+
+    def returns(self, universe, rng, common_rng=None):
+        raise NotImplementedError
+
+    def returns_many(self, universe, steps, rng, common_rng=None):
+        """Return a (steps, stocks) array of returns for `steps` consecutive ticks.
+
+        Subclasses should override this with a single draw; the default
+        calls returns() once per tick.
+        """
+        return np.stack([self.returns(universe, rng, common_rng) for _ in range(steps)]).reshape(steps, len(universe))
+
+    def next_prices(self, universe, rng=None, common_rng=None):
+        """Return the universe's prices after one tick."""
+        rng = rng if rng is not None else np.random.default_rng()
+        change = self.returns(universe, rng, common_rng or rng) + drift(universe.prices)
+        return np.maximum(MIN_PRICE, universe.prices * (1 + change))
+
+    def simulate(self, universe, steps, rng=None, common_rng=None, active=None):
+        """Return a (steps, stocks) array of the prices after each of `steps` ticks.
+
+        All randomness is drawn up front; only the compounding, which
+        depends on the previous price through the drift and the price
+        floor, is walked tick by tick over whole rows. `active`, an optional
+        (steps, stocks) boolean array, holds a stock's price on the ticks
+        where it is False.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        returns = self.returns_many(universe, steps, rng, common_rng or rng)
+        path = np.empty((steps, len(universe)))
+        current = universe.prices
+        for step in range(steps):
+            moved = np.maximum(MIN_PRICE, current * (1 + returns[step] + drift(current)))
+            current = moved if active is None else np.where(active[step], moved, current)
+            path[step] = current
+        return path
+
+
+class UniformModel(PriceModel):
+    """Independent uniform returns within each stock's volatility range (the original behaviour)."""
+
+    def returns(self, universe, rng, common_rng=None):
+        return rng.uniform(universe.volatility_min, universe.volatility_max)
+
+    def returns_many(self, universe, steps, rng, common_rng=None):
+        return rng.uniform(universe.volatility_min, universe.volatility_max, size=(steps, len(universe)))
+
+
+class FactorModel(PriceModel):
+    """Correlated returns from one factor per sector plus idiosyncratic noise.
+
+    Sector factors are drawn jointly from the configured sector covariance
+    through its Cholesky factor, so a whole tick is two normal draws and
+    one small matrix product. Each stock keeps the variance of its uniform
+    volatility range; `factor_weight` of it comes from its sector factor,
+    which makes stocks in one sector correlated by `factor_weight` and
+    stocks in different sectors by `factor_weight` times the sector
+    correlation.
+    """
+
+    def __init__(self, factor_weight=0.6, sector_correlation=0.3, covariance=None):
+        if not 0.0 <= factor_weight <= 1.0:
+            raise ImproperlyConfigured("PRICE_FACTOR_WEIGHT must be between 0 and 1")
+        self.factor_weight = factor_weight
+        self.sector_correlation = sector_correlation
+        self.covariance = covariance
+        self._cache_key = None
+        self._cholesky = None
+        self._sector_index = None
+
+    def sector_covariance(self, sectors):
+        """Return the covariance matrix of the factors of `sectors` (in that order)."""
+        if self.covariance:
+            names = self.covariance['sectors']
+            matrix = np.asarray(self.covariance['matrix'], dtype=float)
+            missing = [s for s in sectors if s not in names]
+            if missing:
+                raise ImproperlyConfigured(f"PRICE_SECTOR_COVARIANCE has no entry for sectors: {', '.join(missing)}")
+            order = [names.index(s) for s in sectors]
+            return matrix[np.ix_(order, order)]
+        n = len(sectors)
+        return np.full((n, n), self.sector_correlation) + np.eye(n) * (1.0 - self.sector_correlation)
+
+    def _factor(self, universe):
+        """Return (cholesky of the sector correlation, sector index per stock), cached per sector layout."""
+        key = (tuple(universe.all_sectors), tuple(universe.sectors))
+        if key != self._cache_key:
+            sectors = universe.all_sectors
+            covariance = self.sector_covariance(sectors)
+            scale = np.sqrt(np.diag(covariance))
+            correlation = covariance / np.outer(scale, scale)
+            try:
+                self._cholesky = np.linalg.cholesky(correlation)
+            except np.linalg.LinAlgError:
+                raise ImproperlyConfigured("Sector covariance matrix is not positive definite")
+            lookup = {sector: i for i, sector in enumerate(sectors)}
+            self._sector_index = np.array([lookup[s] for s in universe.sectors], dtype=np.int64)
+            self._cache_key = key
+        return self._cholesky, self._sector_index
+
+    def returns(self, universe, rng, common_rng=None):
+        return self.returns_many(universe, 1, rng, common_rng)[0]
+
+    def returns_many(self, universe, steps, rng, common_rng=None):
+        cholesky, sector_index = self._factor(universe)
+        # Standard deviation of each stock's uniform range, so switching
+        # models keeps every stock's volatility.
+        sigma = (universe.volatility_max - universe.volatility_min) / np.sqrt(12.0)
+        factors = (common_rng or rng).standard_normal((steps, cholesky.shape[0])) @ cholesky.T
+        noise = rng.standard_normal((steps, len(universe)))
+        shocks = np.sqrt(self.factor_weight) * factors[:, sector_index] + np.sqrt(1.0 - self.factor_weight) * noise
+        return np.clip(sigma * shocks, -0.9, None)
+
+
+MODELS = {
+    'uniform': UniformModel,
+    'factor': FactorModel,
+}
+
+
+def _sector_covariance_setting():
+    raw = getattr(settings, 'PRICE_SECTOR_COVARIANCE', '') or ''
+    if not raw:
+        return None
+    try:
+        value = json.loads(raw) if isinstance(raw, str) else raw
+    except ValueError as e:
+        raise ImproperlyConfigured(f"PRICE_SECTOR_COVARIANCE is not valid JSON: {e}")
+    if not isinstance(value, dict) or 'sectors' not in value or 'matrix' not in value:
+        raise ImproperlyConfigured('PRICE_SECTOR_COVARIANCE must look like {"sectors": [...], "matrix": [[...]]}')
+    return value
+
+
+def build_model(name=None):
+    """Instantiate the price model named by `name` or the PRICE_MODEL setting.
+
+    Accepts one of MODELS or a dotted path to a PriceModel subclass.
+    """
+    name = name or getattr(settings, 'PRICE_MODEL', 'uniform') or 'uniform'
+    if name == 'factor':
+        return FactorModel(
+            factor_weight=float(getattr(settings, 'PRICE_FACTOR_WEIGHT', 0.6)),
+            sector_correlation=float(getattr(settings, 'PRICE_SECTOR_CORRELATION', 0.3)),
+            covariance=_sector_covariance_setting(),
+        )
+    if name in MODELS:
+        return MODELS[name]()
+    try:
+        model_class = import_string(name)
+    except ImportError:
+        raise ImproperlyConfigured(f"Unknown PRICE_MODEL: {name}")
+    return model_class()
+
+
+_model = None
+
+
+def get_model():
+    """Return the process-wide price model, built on first use."""
+    global _model
+    if _model is None:
+        _model = build_model()
+    return _model
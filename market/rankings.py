@@ -0,0 +1,108 @@
+"""
+File: rankings.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Leaderboard ranking by net worth, its periodic snapshots and queries over them.
+"""
+
+
+from datetime import timedelta
+
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce, Rank
+from django.utils import timezone
+
+from accounts.models import User
+from market.models import DEFAULT_MARKET_ID, Holding, RankSnapshot
+
+
+PERIOD = timedelta(hours=1)
+
+DEFAULT_TOP = 25
+MAX_TOP = 500
+
+
+def period_start(moment):
+    """Return the start of the snapshot period containing `moment`."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def ranked_users(market_id=None):
+    """Users annotated with `stocks_value`, `net_worth` and `rank`, best first.
+
+    Net worth is cash plus holdings at current prices, summed by a
+    correlated subquery, and ranked with RANK() in the same query; equal
+    net worths share a rank. Users are ranked within their market; without
+    `market_id` every market is returned, each ranked separately.
+    """
+    stocks_value = (
+        Holding.objects.filter(user=OuterRef('pk'))
+        .values('user')
+        .annotate(total=Sum(F('shares') * F('stock__price'), output_field=FloatField()))
+        .values('total')
+    )
+    users = User.objects.all() if market_id is None else User.objects.filter(market_id=market_id)
+    return (
+        users.annotate(stocks_value=Coalesce(Subquery(stocks_value, output_field=FloatField()), Value(0.0)))
+        .annotate(net_worth=F('balance') + F('stocks_value'))
+        .annotate(rank=Window(Rank(), partition_by=[F('market_id')], order_by=F('net_worth').desc()))
+        .order_by('market_id', 'rank', 'id')
+    )
+
+
+def snapshot(now=None):
+    """Store every user's current rank in their market for the period containing `now`; returns the number stored.
+
+    Running again in the same period overwrites that period's rows.
+    """
+    period = period_start(now or timezone.now())
+    rows = [
+        RankSnapshot(
+            period_start=period, market_id=market_id, user_id=user_id, rank=rank, net_worth=round(net_worth, 2),
+        )
+        for user_id, market_id, rank, net_worth in ranked_users().values_list('id', 'market_id', 'rank', 'net_worth')
+    ]
+    RankSnapshot.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user', 'period_start'],
+        update_fields=['market', 'rank', 'net_worth'],
+    )
+    return len(rows)
+
+
+def period_at(moment, market_id=DEFAULT_MARKET_ID):
+    """Return the start of the market's latest snapshot period at or before `moment`, or None."""
+    return (
+        RankSnapshot.objects.filter(market_id=market_id, period_start__lte=moment)
+        .order_by('-period_start')
+        .values_list('period_start', flat=True)
+        .first()
+    )
+
+
+def top_at(moment, limit=DEFAULT_TOP, market_id=DEFAULT_MARKET_ID):
+    """Return (period start, [RankSnapshot with user]) of a market's top `limit` at `moment`.
+
+    The period is None when no snapshot had been taken by then.
+    """
+    period = period_at(moment, market_id)
+    if period is None:
+        return None, []
+    rows = (
+        RankSnapshot.objects.filter(market_id=market_id, period_start=period, rank__lte=limit)
+        .select_related('user')
+        .order_by('rank', 'user_id')[:limit]
+    )
+    return period, list(rows)
+
+
+def history(user, since=None, until=None):
+    """Return [(period start, rank, net worth)] of `user`, oldest first."""
+    qs = RankSnapshot.objects.filter(user=user)
+    if since is not None:
+        qs = qs.filter(period_start__gte=since)
+    if until is not None:
+        qs = qs.filter(period_start__lte=until)
+    return list(qs.order_by('period_start').values_list('period_start', 'rank', 'net_worth'))
@@ -0,0 +1,108 @@
+"""
+File: replicas.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Routing the read-only market endpoints to read replicas.
+
+Every query goes to the primary (default) database unless it runs inside a
+view decorated with @replica_reads, whose reads then use one of the
+DATABASE_REPLICAS for the whole request. Writes always go to the primary,
+and cron jobs, trades and admin views never touch a replica.
+
+Replicas lag the primary, so PinPrimaryAfterWriteMiddleware marks the
+client of every unsafe request with a cookie that lasts
+DATABASE_REPLICA_STICKY_SECONDS; while it is present the client keeps
+reading the primary and sees its own trades straight away.
+
+Locally, add a second DATABASES alias standing in for the replica (a copy
+of the database, or the same SQLite file) and list it in DATABASE_REPLICAS.
+The test settings (conf.test_settings) add a `replica` alias mirroring the
+test database, which the tests in market/tests.py use to cover routing and
+pinning.
+"""
+
+
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+
+PIN_COOKIE = 'primary_pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Replica alias the current request reads from, None for the primary.
+_replica = ContextVar('replica', default=None)
+
+
+def replicas():
+    """Return the aliases of the configured read replicas."""
+    return [alias for alias in getattr(settings, 'DATABASE_REPLICAS', []) if alias in settings.DATABASES]
+
+
+def sticky_seconds():
+    """Return how long a client reads from the primary after a write."""
+    return max(0, int(getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10)))
+
+
+class ReplicaRouter:
+    """Send reads inside @replica_reads views to that request's replica, everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {'default', *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        if db in replicas():
+            return False
+        return None
+
+
+def replica_reads(view):
+    """Let `view` read from a random replica, unless its client is pinned to the primary.
+
+    Only for views that never write: the replica is used for every read of
+    the request.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        aliases = replicas()
+        if not aliases or request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+            return view(request, *args, **kwargs)
+        # Load the session and user from the primary first: a login moments
+        # ago may not have reached the replica yet.
+        request.user.is_authenticated
+        token = _replica.set(random.choice(aliases))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return wrapped
+
+
+class PinPrimaryAfterWriteMiddleware:
+    """Keep a client that just sent an unsafe request on the primary for DATABASE_REPLICA_STICKY_SECONDS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        seconds = sticky_seconds()
+        if request.method not in SAFE_METHODS and seconds and replicas():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=seconds, secure=request.is_secure(), httponly=True, samesite='Lax',
+            )
+        return response
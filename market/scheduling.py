@@ -0,0 +1,111 @@
+"""
+File: scheduling.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Lease-based leader election and tick sequencing for scheduled market jobs.
+"""
+
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+import os
+import socket
+import zlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from market.models import JobLease
+
+
+def holder_id():
+    """Identify this runner (host and process) as a lease holder."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_seconds():
+    return int(getattr(settings, 'MARKET_JOB_LEASE_SECONDS', 300))
+
+
+def tick_seconds():
+    return int(getattr(settings, 'MARKET_TICK_SECONDS', 60))
+
+
+def tick_sequence(now=None):
+    """Return the tick sequence number of the tick period containing `now`.
+
+    Derived from the clock, so every runner and shard agrees on it without
+    coordinating.
+    """
+    return int((now or timezone.now()).timestamp()) // tick_seconds()
+
+
+def sequence_time(sequence):
+    """Return the start of tick period `sequence`."""
+    return datetime.fromtimestamp(sequence * tick_seconds(), tz=dt_timezone.utc)
+
+
+def catch_up_limit():
+    return int(getattr(settings, 'MARKET_CATCH_UP_MAX_TICKS', 1440))
+
+
+def shard_of(symbol, shards):
+    """Return the shard (0..shards-1) a stock symbol belongs to."""
+    return zlib.crc32(symbol.encode('utf-8')) % shards if shards > 1 else 0
+
+
+def acquire(name, ttl=None, now=None):
+    """Try to take lease `name`; returns True if this runner now holds it.
+
+    Succeeds when the lease is free, expired or already held by this runner.
+    """
+    now = now or timezone.now()
+    me = holder_id()
+    expires = now + timedelta(seconds=ttl or lease_seconds())
+    available = Q(holder='') | Q(expires_at__isnull=True) | Q(expires_at__lt=now) | Q(holder=me)
+    if JobLease.objects.filter(available, name=name).update(holder=me, acquired_at=now, expires_at=expires):
+        return True
+    try:
+        with transaction.atomic():
+            JobLease.objects.create(name=name, holder=me, acquired_at=now, expires_at=expires)
+        return True
+    except IntegrityError:
+        # The lease exists and someone else holds it.
+        return False
+
+
+def release(name):
+    """Give up lease `name` if this runner holds it."""
+    JobLease.objects.filter(name=name, holder=holder_id()).update(holder='', expires_at=timezone.now())
+
+
+@contextmanager
+def lease(name, ttl=None):
+    """Hold lease `name` for the duration of the block.
+
+    Yields True if it was acquired, False if another live runner holds it;
+    the block should do nothing in that case.
+    """
+    held = acquire(name, ttl)
+    try:
+        yield held
+    finally:
+        if held:
+            release(name)
+
+
+def last_sequence(name):
+    return JobLease.objects.filter(name=name).values_list('last_sequence', flat=True).first() or 0
+
+
+def complete(name, sequence, now=None):
+    """Record that job `name` finished tick `sequence`."""
+    JobLease.objects.filter(name=name, holder=holder_id()).update(
+        last_sequence=sequence, last_completed_at=now or timezone.now(),
+    )
+
+
+def tick_lease_name(shard=0, shards=1):
+    return 'tick' if shards <= 1 else f'tick:{shard}/{shards}'
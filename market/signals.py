@@ -0,0 +1,46 @@
+"""
+File: signals.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Signal handlers for the market app.
+"""
+
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from market import ticker
+from market.models import MarketState, Stock, Trade
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def open_ledger(sender, instance, created, raw=False, **kwargs):
+    """Record a new user's starting balance as their first ledger entry."""
+    if not created or raw:
+        return
+    Trade.objects.create(
+        user=instance,
+        kind=Trade.OPENING,
+        cash=instance.balance or 0.0,
+        realized_pnl=instance.realized_pnl or 0.0,
+    )
+
+
+def _publish_ticker_change(stocks=(), removed=()):
+    with transaction.atomic():
+        ticker.record(MarketState.bump_version(), stocks, removed)
+
+
+@receiver(post_save, sender=Stock)
+def add_to_ticker(sender, instance, created, raw=False, **kwargs):
+    """Bump the market version for a new stock so delta ticker clients pick it up."""
+    if created and not raw:
+        _publish_ticker_change(stocks=[(instance.market_id, instance.symbol)])
+
+
+@receiver(post_delete, sender=Stock)
+def remove_from_ticker(sender, instance, **kwargs):
+    """Bump the market version for a deleted stock so delta ticker clients drop it."""
+    _publish_ticker_change(removed=[(instance.market_id, instance.symbol)])
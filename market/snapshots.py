@@ -0,0 +1,329 @@
+"""
+File: snapshots.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Streaming binary snapshots of the market state and bulk restore.
+
+An archive is the magic bytes, a format version byte and a sequence of
+length-prefixed frames:
+
+- a header frame (JSON): when and from which schema the snapshot was taken;
+- per table, a section frame (JSON): table label and column names;
+- then row frames: zlib-compressed JSON arrays of up to BATCH_SIZE rows;
+- an end frame.
+
+Rows are read and written one frame at a time, so neither taking nor
+restoring a snapshot holds a whole table in memory.
+"""
+
+
+import base64
+from datetime import datetime
+import io
+import json
+import struct
+import zlib
+
+from django.apps import apps
+from django.contrib.admin.models import LogEntry
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils import timezone
+
+from accounts.models import User
+from market import events
+from market.models import (
+    Holding, Market, MarketEvent, MarketEventApplication, MarketState, Order, PortfolioAnalytics, PriceAlert,
+    RankSnapshot, Stock, StockActivity, StockActivityCounter, StockPriceBucket, StockPriceChunk, StockPriceHistory,
+    TickerChangeSet, Trade,
+)
+
+
+MAGIC = b'PEELSNAP'
+FORMAT_VERSION = 1
+
+BATCH_SIZE = 5000
+
+FRAME_HEADER, FRAME_SECTION, FRAME_ROWS, FRAME_END = 1, 2, 3, 0
+_FRAME = struct.Struct('>BI')
+
+# Tables in the snapshot, parents before children.
+TABLES = [
+    ('markets', Market),
+    ('users', User),
+    ('user_groups', User.groups.through),
+    ('user_permissions', User.user_permissions.through),
+    ('admin_log', LogEntry),
+    ('stocks', Stock),
+    ('events', MarketEvent),
+    ('holdings', Holding),
+    ('trades', Trade),
+    ('orders', Order),
+    ('alerts', PriceAlert),
+]
+HISTORY_TABLES = [
+    ('history', StockPriceHistory),
+    ('history_chunks', StockPriceChunk),
+]
+# Derived tables that reference snapshot rows; emptied on restore and
+# rebuilt by their scheduled jobs.
+DERIVED = [
+    MarketEventApplication, PortfolioAnalytics, RankSnapshot, StockActivityCounter, StockActivity, StockPriceBucket,
+    TickerChangeSet,
+]
+
+# Everything restore() empties, children before parents.
+CLEARED = DERIVED + [model for _, model in HISTORY_TABLES] + [model for _, model in reversed(TABLES)]
+
+
+def dependents():
+    """Return the models outside CLEARED with a foreign key into a CLEARED table.
+
+    restore() refuses to run while any of them has rows, instead of letting
+    the cascade delete them.
+    """
+    cleared = set(CLEARED)
+    return [
+        model for model in apps.get_models(include_auto_created=True)
+        if model not in cleared and any(
+            field.is_relation and field.related_model in cleared for field in model._meta.concrete_fields
+        )
+    ]
+
+
+class SnapshotError(Exception):
+    """Raised when an archive cannot be read or does not fit this database."""
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    return value
+
+
+def _schema():
+    """Return the latest applied migration of each snapshotted app."""
+    applied = MigrationRecorder(connection).applied_migrations()
+    snapshotted = {model._meta.app_label for _, model in TABLES}
+    latest = {}
+    for app, name in sorted(applied):
+        if app in snapshotted:
+            latest[app] = name
+    return latest
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def _write_frame(out, kind, payload):
+    out.write(_FRAME.pack(kind, len(payload)))
+    out.write(payload)
+
+
+def _write_json(out, kind, value):
+    _write_frame(out, kind, json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+
+def _write_rows(out, rows):
+    payload = json.dumps(rows, separators=(',', ':')).encode('utf-8')
+    _write_frame(out, FRAME_ROWS, zlib.compress(payload))
+
+
+def dump(out, include_history=False):
+    """Write a snapshot of the market to the binary file `out`.
+
+    Returns {label: rows written}. On PostgreSQL every table is read from
+    one repeatable-read transaction (or the caller's transaction, when
+    there is one) so the archive is consistent.
+    """
+    tables = TABLES + (HISTORY_TABLES if include_history else [])
+    counts = {}
+    out.write(MAGIC + bytes([FORMAT_VERSION]))
+    # The isolation level can only be set first thing in a transaction;
+    # inside a caller's transaction the caller's snapshot is what we read.
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if connection.vendor == 'postgresql' and outermost:
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        _write_json(out, FRAME_HEADER, {
+            'created_at': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'schema': _schema(),
+            'history': include_history,
+        })
+        for label, model in tables:
+            columns = _columns(model)
+            attnames = [field.attname for field in model._meta.concrete_fields]
+            _write_json(out, FRAME_SECTION, {'table': label, 'columns': columns})
+
+            batch, total = [], 0
+            rows = model.objects.order_by('pk').values_list(*attnames).iterator(chunk_size=BATCH_SIZE)
+            for row in rows:
+                batch.append([_encode(value) for value in row])
+                if len(batch) >= BATCH_SIZE:
+                    _write_rows(out, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                _write_rows(out, batch)
+                total += len(batch)
+            counts[label] = total
+    _write_frame(out, FRAME_END, b'')
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def _read_exact(source, size):
+    data = source.read(size)
+    if len(data) != size:
+        raise SnapshotError("Snapshot archive is truncated")
+    return data
+
+
+def iter_frames(source):
+    """Yield (kind, payload) for every frame of the archive in `source`."""
+    prefix = source.read(len(MAGIC) + 1)
+    if prefix[:len(MAGIC)] != MAGIC:
+        raise SnapshotError("Not a market snapshot archive")
+    if prefix[len(MAGIC)] != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format version: {prefix[len(MAGIC)]}")
+
+    while True:
+        kind, size = _FRAME.unpack(_read_exact(source, _FRAME.size))
+        if kind == FRAME_END:
+            return
+        payload = _read_exact(source, size)
+        if kind == FRAME_ROWS:
+            yield kind, json.loads(zlib.decompress(payload))
+        else:
+            yield kind, json.loads(payload)
+
+
+# ---------------------------------------------------------------------------
+# Restoring
+# ---------------------------------------------------------------------------
+
+def _copy_text(value, field):
+    """Format one value for PostgreSQL's COPY text format."""
+    if value is None:
+        return '\\N'
+    if field.get_internal_type() == 'BinaryField':
+        return '\\\\x' + base64.b64decode(value).hex()
+    text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy_rows(cursor, model, fields, rows):
+    """Load `rows` into `model`'s table with one COPY ... FROM STDIN."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_text(value, field) for value, field in zip(row, fields)))
+        buffer.write('\n')
+    buffer.seek(0)
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(field.column) for field in fields)
+    cursor.copy_expert(f"COPY {qn(model._meta.db_table)} ({columns}) FROM STDIN", buffer)
+
+
+def _insert_rows(cursor, model, fields, rows):
+    """Load `rows` into `model`'s table with one batched INSERT (non-PostgreSQL databases).
+
+    Written as plain SQL rather than bulk_create() so fields like
+    auto_now_add keep the values from the snapshot.
+    """
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    cursor.executemany(
+        f"INSERT INTO {qn(model._meta.db_table)} ({columns}) VALUES ({placeholders})",
+        [
+            [None if value is None else field.get_db_prep_save(field.to_python(value), connection)
+             for value, field in zip(row, fields)]
+            for row in rows
+        ],
+    )
+
+
+def _clear(models):
+    """Empty every table of `models` (children before parents)."""
+    if connection.vendor == 'postgresql':
+        qn = connection.ops.quote_name
+        tables = ', '.join(qn(model._meta.db_table) for model in models)
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {tables} CASCADE")
+        return
+    for model in models:
+        model.objects.all().delete()
+
+
+def restore(source):
+    """Replace the market with the snapshot read from the binary file `source`.
+
+    Snapshot tables, the derived tables that point at them and (when the
+    archive has no history) the price history are emptied first, then
+    reloaded frame by frame: with COPY on PostgreSQL, bulk inserts
+    elsewhere. Foreign keys are checked once at commit, so tables can be
+    loaded in archive order. Returns (header, {label: rows loaded}).
+    """
+    models = dict(TABLES + HISTORY_TABLES)
+    header, counts = None, {}
+    model = fields = None
+    postgres = connection.vendor == 'postgresql'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if postgres:
+            cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+        for kind, payload in iter_frames(source):
+            if kind == FRAME_HEADER:
+                header = payload
+                blocking = [model._meta.db_table for model in dependents() if model.objects.exists()]
+                if blocking:
+                    raise SnapshotError(
+                        f"Restoring would delete rows of tables outside the snapshot: {', '.join(blocking)}"
+                    )
+                _clear(CLEARED)
+            elif kind == FRAME_SECTION:
+                if header is None:
+                    raise SnapshotError("Snapshot archive has no header")
+                label = payload['table']
+                model = models.get(label)
+                if model is None:
+                    raise SnapshotError(f"Unknown table in snapshot: {label}")
+                if payload['columns'] != _columns(model):
+                    raise SnapshotError(
+                        f"Snapshot table {label} does not match the current schema; "
+                        f"it was taken at {header.get('schema')}"
+                    )
+                fields = list(model._meta.concrete_fields)
+                counts[label] = 0
+            elif kind == FRAME_ROWS:
+                if model is None:
+                    raise SnapshotError("Snapshot rows before any table section")
+                if postgres:
+                    _copy_rows(cursor, model, fields, payload)
+                else:
+                    _insert_rows(cursor, model, fields, payload)
+                counts[label] += len(payload)
+
+        if header is None:
+            raise SnapshotError("Snapshot archive is empty")
+
+        for sql in connection.ops.sequence_reset_sql(no_style(), CLEARED):
+            cursor.execute(sql)
+        MarketState.bump_version()
+
+    events.reset_catalog()
+    return header, counts
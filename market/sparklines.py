@@ -0,0 +1,77 @@
+"""
+File: sparklines.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Downsampled recent prices of many stocks at once, for mini charts.
+
+A sparkline is the last SPAN ticks of a stock reduced to `points` evenly
+spaced prices, always ending on the latest one. Sparklines are encoded in
+whole cents, the first price as is and each following one as the change from
+the one before, which keeps a response for the whole market small.
+"""
+
+
+import numpy as np
+from django.core.cache import cache
+
+from market import history
+from market.models import MarketState
+
+
+# Ticks a sparkline covers (four hours at the one-minute tick).
+SPAN = 240
+
+DEFAULT_POINTS = 30
+MIN_POINTS = 2
+MAX_POINTS = 120
+
+CACHE_TIMEOUT = 60 * 10
+
+
+def _cache_key(version, points, stock_id):
+    return f"sparklines:{version}:{points}:{stock_id}"
+
+
+def downsample(prices, points):
+    """Return `points` evenly spaced values of `prices`, keeping the first and last."""
+    if len(prices) <= points:
+        return list(prices)
+    indices = np.linspace(0, len(prices) - 1, points).round().astype(int)
+    return [prices[i] for i in indices]
+
+
+def encode(prices):
+    """Encode prices as [first in cents, change in cents, ...]."""
+    cents = np.rint(np.asarray(prices, dtype=float) * 100).astype(np.int64)
+    if not len(cents):
+        return []
+    return [int(cents[0])] + np.diff(cents).tolist()
+
+
+def decode(encoded):
+    """Inverse of encode()."""
+    return (np.cumsum(np.asarray(encoded, dtype=np.int64)) / 100).tolist()
+
+
+def sparklines(symbols, points=DEFAULT_POINTS):
+    """Return (market version, {symbol: encoded sparkline}) for `symbols` ({stock_id: symbol}).
+
+    Sparklines are cached per stock for the market version they were built
+    at; the ones missing from the cache are read from history together with
+    one windowed query.
+    """
+    version = MarketState.current_version()
+    keys = {stock_id: _cache_key(version, points, stock_id) for stock_id in symbols}
+    cached = cache.get_many(keys.values())
+
+    encoded = {stock_id: cached[key] for stock_id, key in keys.items() if key in cached}
+    missing = [stock_id for stock_id in symbols if stock_id not in encoded]
+    if missing:
+        fresh = {
+            stock_id: encode(downsample(prices, points))
+            for stock_id, prices in history.recent_prices(missing, n=SPAN).items()
+        }
+        cache.set_many({keys[stock_id]: line for stock_id, line in fresh.items()}, CACHE_TIMEOUT)
+        encoded.update(fresh)
+
+    return version, {symbol: encoded[stock_id] for stock_id, symbol in symbols.items()}
@@ -0,0 +1,100 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from market import ledger, loans
+from market.models import Holding, Stock, Trade
+
+
+class AccountSummaryTests(TestCase):
+    url = '/api/account/summary/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='summary@example.com')
+        self.stock = Stock.objects.create(symbol='SUMM', name='Summary', price=10.0)
+        self.client.force_login(self.user)
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_values_holdings_at_live_prices(self):
+        ledger.post([ledger.buy(self.user.id, self.stock.id, 4, 10.0)])
+        ledger.post([ledger.sell(Holding.objects.get(user=self.user), 1, 12.0)])
+        Stock.objects.filter(id=self.stock.id).update(price=15.0, previous_price=10.0)
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['balance'], 72.0)
+        self.assertEqual(data['stocks_value'], 45.0)
+        self.assertEqual(data['net_worth'], 117.0)
+        self.assertEqual((data['cost_basis'], data['unrealized_pnl'], data['realized_pnl']), (30.0, 15.0, 2.0))
+        self.assertEqual(data['holdings'], [{
+            'symbol': 'SUMM', 'shares': 3, 'price': 15.0, 'direction': 1,
+            'value': 45.0, 'cost_basis': 30.0, 'unrealized_pnl': 15.0,
+        }])
+        self.assertEqual(data['loan'], {'has_loan': False, 'amount': 0, 'repay_at': loans.REPAY_AT, 'eligible': False})
+
+    def test_unchanged_summary_is_not_modified(self):
+        ledger.post([ledger.buy(self.user.id, self.stock.id, 1, 10.0)])
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A price move changes the holding's value, so the summary changes.
+        Stock.objects.filter(id=self.stock.id).update(price=11.0)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['net_worth'], 101.0)
+
+        # Stocks the user does not hold do not.
+        etag = response['ETag']
+        Stock.objects.create(symbol='ELSE', name='Elsewhere', price=3.0)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class LoanTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='loan@example.com')
+        self.client.force_login(self.user)
+
+    def broke(self, user=None):
+        user = user or self.user
+        ledger.post([ledger.cash(user.id, Trade.GRANT, -98.0)])
+
+    def take(self):
+        return self.client.post('/api/loan/take/')
+
+    def test_only_the_nearly_broke_qualify(self):
+        self.assertEqual(self.take().status_code, 400)
+        self.broke()
+        response = self.take()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'success': True, 'loan_given': 20.0, 'to_repay': 25.0, 'new_balance': 22.0})
+        self.assertEqual(self.take().status_code, 400)
+
+        summary = self.client.get('/api/account/summary/').json()
+        self.assertEqual(summary['loan'], {'has_loan': True, 'amount': 25.0, 'repay_at': loans.REPAY_AT, 'eligible': False})
+
+    def test_settle_repays_everyone_who_can_afford_it(self):
+        other = User.objects.create_user(email='still-broke@example.com')
+        for user in (self.user, other):
+            self.broke(user)
+            ledger.post(
+                [ledger.cash(user.id, Trade.LOAN, loans.LOAN_AMOUNT)],
+                user_fields={'has_loan': True, 'loan_amount': 25.0},
+            )
+        self.assertEqual(loans.settle(), 0)
+
+        ledger.post([ledger.cash(self.user.id, Trade.GRANT, 30.0)])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(loans.settle(), 1)
+        # One read of who is due, one ledger insert, one UPDATE of the users.
+        self.assertEqual(len([q for q in queries if 'SAVEPOINT' not in q['sql']]), 3)
+
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.user.balance, self.user.has_loan, self.user.loan_amount), (27.0, False, 0.0))
+        self.assertTrue(other.has_loan)
+        self.assertEqual(Trade.objects.get(user=self.user, kind=Trade.LOAN_REPAYMENT).cash, -25.0)
+        self.assertEqual(loans.settle(), 0)
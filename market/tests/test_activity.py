@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from market import activity, ledger
+from market.models import Stock, StockActivity, StockActivityCounter, Trade
+
+
+NOW = datetime(2026, 10, 19, 12, 7, 30, tzinfo=dt_timezone.utc)
+
+
+class ActivityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='activity@example.com')
+        self.stock = Stock.objects.create(symbol='ACTV', name='Active', price=10.0)
+        self.quiet = Stock.objects.create(symbol='QUIT', name='Quiet', price=10.0)
+
+    def trades(self, count=1, shares=2, price=10.0):
+        return [ledger.buy(self.user.id, self.stock.id, shares, price) for _ in range(count)]
+
+    def test_bucket_start(self):
+        self.assertEqual(activity.bucket_start(NOW), datetime(2026, 10, 19, 12, 5, tzinfo=dt_timezone.utc))
+
+    def test_record_counts_buys_and_sells_only(self):
+        activity.record(self.trades(3) + [ledger.cash(self.user.id, Trade.GRANT, 5.0)], now=NOW)
+        counters = StockActivityCounter.objects.filter(stock=self.stock)
+        self.assertEqual(sum(c.trades for c in counters), 3)
+        self.assertEqual(sum(c.shares for c in counters), 6)
+        self.assertEqual(sum(c.notional for c in counters), 60.0)
+        self.assertEqual({c.bucket_start for c in counters}, {activity.bucket_start(NOW)})
+
+    @override_settings(STOCK_ACTIVITY_SLOTS=1)
+    def test_one_slot_accumulates_in_place(self):
+        for _ in range(4):
+            activity.record(self.trades(), now=NOW)
+        counter = StockActivityCounter.objects.get(stock=self.stock)
+        self.assertEqual((counter.slot, counter.trades, counter.shares), (0, 4, 8))
+
+    @override_settings(STOCK_ACTIVITY_SLOTS=4)
+    def test_slots_spread_the_writes(self):
+        for _ in range(40):
+            activity.record(self.trades(), now=NOW)
+        counters = StockActivityCounter.objects.filter(stock=self.stock)
+        self.assertGreater(counters.count(), 1)
+        self.assertLessEqual(counters.count(), 4)
+        self.assertEqual(sum(c.trades for c in counters), 40)
+
+    def test_ledger_posts_are_counted(self):
+        ledger.post(self.trades(2))
+        self.assertEqual(sum(StockActivityCounter.objects.values_list('trades', flat=True)), 2)
+
+    def test_rollup_windows(self):
+        activity.record(self.trades(1, shares=1), now=NOW - timedelta(minutes=20))
+        activity.record(self.trades(2, shares=3), now=NOW - timedelta(hours=5))
+        activity.record(self.trades(4, shares=5), now=NOW - timedelta(hours=30))
+
+        self.assertEqual(activity.rollup(now=NOW), 2)
+        stats = activity.stats_by_stock()
+        self.assertEqual(stats[self.stock.id]['trades_1h'], 1)
+        self.assertEqual(stats[self.stock.id]['volume_1h'], 1)
+        self.assertEqual(stats[self.stock.id]['trades_24h'], 3)
+        self.assertEqual(stats[self.stock.id]['volume_24h'], 7)
+        self.assertEqual(stats[self.quiet.id]['trades_24h'], 0)
+        self.assertEqual(StockActivity.objects.get(stock=self.stock).notional_24h, 70.0)
+
+        # The expired counters are gone and the volume is on the stock for sorting.
+        self.assertFalse(StockActivityCounter.objects.filter(bucket_start__lt=NOW - timedelta(hours=24)).exists())
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.volume, 7)
+
+    def test_rollup_moves_volume_out_of_the_window(self):
+        activity.record(self.trades(1, shares=4), now=NOW - timedelta(hours=23))
+        activity.rollup(now=NOW)
+        activity.rollup(now=NOW + timedelta(hours=2))
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.volume, 0)
+        self.assertEqual(activity.stats_by_stock([self.stock.id])[self.stock.id]['volume_24h'], 0)
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from accounts.models import User
+from market import alerts
+from market.models import PriceAlert, Stock
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class AlertEvaluationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='alerts@example.com')
+        self.stock = Stock.objects.create(symbol='ALRT', name='Alerting', price=10.0)
+        self.other = Stock.objects.create(symbol='OTHR', name='Other', price=10.0)
+
+    def alert(self, direction, threshold, stock=None):
+        return PriceAlert.objects.create(user=self.user, stock=stock or self.stock, direction=direction, threshold=threshold)
+
+    def fired(self):
+        return set(PriceAlert.objects.filter(triggered_at__isnull=False).values_list('id', flat=True))
+
+    def test_rise_fires_above_alerts_up_to_and_including_the_new_price(self):
+        at_old = self.alert(PriceAlert.ABOVE, 10.0)
+        inside = self.alert(PriceAlert.ABOVE, 11.0)
+        at_new = self.alert(PriceAlert.ABOVE, 12.0)
+        beyond = self.alert(PriceAlert.ABOVE, 12.01)
+        below = self.alert(PriceAlert.BELOW, 11.0)
+
+        self.assertEqual(alerts.evaluate([(self.stock.id, 10.0, 12.0)], now=NOW), 2)
+        self.assertEqual(self.fired(), {inside.id, at_new.id})
+        self.assertNotIn(at_old.id, self.fired())
+        self.assertNotIn(beyond.id, self.fired())
+        self.assertNotIn(below.id, self.fired())
+
+    def test_fall_fires_below_alerts(self):
+        inside = self.alert(PriceAlert.BELOW, 9.5)
+        at_new = self.alert(PriceAlert.BELOW, 9.0)
+        self.alert(PriceAlert.BELOW, 8.99)
+        self.alert(PriceAlert.BELOW, 10.0)
+        self.alert(PriceAlert.ABOVE, 9.5)
+
+        self.assertEqual(alerts.evaluate([(self.stock.id, 10.0, 9.0)], now=NOW), 2)
+        self.assertEqual(self.fired(), {inside.id, at_new.id})
+
+    def test_each_stock_records_its_own_price(self):
+        up = self.alert(PriceAlert.ABOVE, 11.0)
+        down = self.alert(PriceAlert.BELOW, 9.0, stock=self.other)
+        alerts.evaluate([(self.stock.id, 10.0, 11.5), (self.other.id, 10.0, 8.5)], now=NOW)
+
+        up.refresh_from_db()
+        down.refresh_from_db()
+        self.assertEqual((up.triggered_at, up.triggered_price), (NOW, 11.5))
+        self.assertEqual((down.triggered_at, down.triggered_price), (NOW, 8.5))
+
+    def test_fired_alerts_do_not_fire_again(self):
+        self.alert(PriceAlert.ABOVE, 11.0)
+        self.assertEqual(alerts.evaluate([(self.stock.id, 10.0, 12.0)], now=NOW), 1)
+        self.assertEqual(alerts.evaluate([(self.stock.id, 10.0, 12.0)], now=NOW + timedelta(minutes=1)), 0)
+        self.assertEqual(PriceAlert.objects.get().triggered_at, NOW)
+
+    def test_unchanged_prices_run_no_query(self):
+        self.alert(PriceAlert.ABOVE, 11.0)
+        with self.assertNumQueries(0):
+            self.assertEqual(alerts.evaluate([(self.stock.id, 10.0, 10.0)]), 0)
+
+
+class AlertViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='alerts@example.com')
+        self.stock = Stock.objects.create(symbol='ALRT', name='Alerting', price=10.0)
+        self.client.force_login(self.user)
+
+    def create(self, **payload):
+        return self.client.post('/api/alerts/create/', payload, content_type='application/json')
+
+    def test_threshold_must_be_across_the_price(self):
+        self.assertEqual(self.create(symbol='ALRT', direction='above', threshold=9.0).status_code, 400)
+        self.assertEqual(self.create(symbol='ALRT', direction='below', threshold=11.0).status_code, 400)
+        self.assertEqual(self.create(symbol='ALRT', direction='sideways', threshold=11.0).status_code, 400)
+        self.assertEqual(self.create(symbol='NOPE', direction='above', threshold=11.0).status_code, 404)
+        self.assertFalse(PriceAlert.objects.exists())
+
+    def test_pending_limit(self):
+        PriceAlert.objects.bulk_create([
+            PriceAlert(user=self.user, stock=self.stock, direction=PriceAlert.ABOVE, threshold=20.0)
+            for _ in range(alerts.MAX_PENDING_PER_USER)
+        ])
+        self.assertEqual(self.create(symbol='ALRT', direction='above', threshold=11.0).status_code, 400)
+
+    def test_fired_alert_moves_to_notifications(self):
+        response = self.create(symbol='ALRT', direction='above', threshold=11.0)
+        self.assertEqual(response.status_code, 200)
+        alert_id = response.json()['alert']['id']
+        self.assertEqual([a['id'] for a in self.client.get('/api/alerts/').json()['alerts']], [alert_id])
+
+        alerts.evaluate([(self.stock.id, 10.0, 11.25)], now=NOW)
+        self.assertEqual(self.client.get('/api/alerts/').json()['alerts'], [])
+        notes = self.client.get('/api/notifications/').json()['notifications']
+        self.assertEqual([(n['id'], n['triggered_price']) for n in notes], [(alert_id, 11.25)])
+        since = (NOW + timedelta(seconds=1)).isoformat()
+        self.assertEqual(self.client.get('/api/notifications/', {'since': since}).json()['notifications'], [])
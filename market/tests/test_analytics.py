@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from accounts.models import User
+from market import analytics, history, ledger
+from market.models import PortfolioAnalytics, Stock, Trade
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class SeriesStatsTests(SimpleTestCase):
+    def test_steady_growth(self):
+        values = np.array([100.0 * 1.01 ** np.arange(10)])
+        twr, volatility, drawdown, _ = analytics.series_stats(values, 24)
+        self.assertAlmostEqual(twr[0], 1.01 ** 9 - 1)
+        self.assertAlmostEqual(volatility[0], 0.0)
+        self.assertEqual(drawdown[0], 0.0)
+
+    def test_volatility_and_sharpe_scale_to_a_day(self):
+        values = np.array([[100.0, 102.0, 100.98, 103.0, 101.97]])
+        returns = values[0, 1:] / values[0, :-1] - 1
+        _, volatility, _, sharpe = analytics.series_stats(values, 24)
+        self.assertAlmostEqual(volatility[0], returns.std(ddof=1) * np.sqrt(24))
+        self.assertAlmostEqual(sharpe[0], returns.mean() / returns.std(ddof=1) * np.sqrt(24))
+
+    def test_flows_are_not_returns(self):
+        values = np.array([[100.0, 100.0, 600.0, 600.0, 300.0]])
+        flows = np.array([[0.0, 0.0, 500.0, 0.0, -300.0]])
+        twr, _, drawdown, _ = analytics.series_stats(values, 24, flows)
+        self.assertAlmostEqual(twr[0], 0.0)
+        self.assertAlmostEqual(drawdown[0], 0.0)
+
+    def test_drawdown_is_measured_from_the_peak(self):
+        values = np.array([[100.0, 120.0, 90.0, 110.0]])
+        twr, _, drawdown, _ = analytics.series_stats(values, 24)
+        self.assertAlmostEqual(twr[0], 0.1)
+        self.assertAlmostEqual(drawdown[0], 90.0 / 120.0 - 1)
+
+    def test_empty_history_is_nan(self):
+        twr, volatility, _, sharpe = analytics.series_stats(np.zeros((1, 5)), 24)
+        self.assertTrue(np.isnan(twr[0]) and np.isnan(volatility[0]) and np.isnan(sharpe[0]))
+
+
+class PriceMatrixTests(TestCase):
+    def test_samples_last_price_at_or_before_each_time(self):
+        stock = Stock.objects.create(symbol='MTRX', name='Matrix')
+        empty = Stock.objects.create(symbol='NONE', name='No history')
+        start = NOW - timedelta(hours=10)
+        history.record_many([(stock.id, start + timedelta(hours=h), 10.0 + h) for h in range(2, 9)])
+        grid = np.array([(start + timedelta(hours=h, minutes=30)).timestamp() for h in range(10)])
+
+        expected = [12.0, 12.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0, 18.0, 18.0]
+        for buffer_size in (65536, 3, 1):
+            matrix = analytics.price_matrix([stock.id, empty.id], grid, buffer_size=buffer_size)
+            self.assertEqual(matrix[0].tolist(), expected)
+            self.assertTrue(np.isnan(matrix[1]).all())
+
+
+@override_settings(PORTFOLIO_ANALYTICS_LOOKBACK_DAYS=7, PORTFOLIO_ANALYTICS_SAMPLE_MINUTES=60)
+class ComputeAllTests(TestCase):
+    def setUp(self):
+        self.start = NOW - timedelta(days=7)
+        self.stock = Stock.objects.create(symbol='TWRX', name='Time weighted', price=20.0)
+        # Rises steadily from 10 to 20 over the week.
+        history.record_many([
+            (self.stock.id, self.start + timedelta(hours=h), 10 + 10 * h / 168) for h in range(169)
+        ])
+
+    def user(self, email, balance, opened):
+        user = User.objects.create_user(email=email, password='pw')
+        Trade.objects.filter(user=user).delete()
+        User.objects.filter(id=user.id).update(balance=0.0)
+        entry = ledger.opening(user.id, balance=balance)
+        entry.created_at = opened
+        ledger.post([entry])
+        return user
+
+    def post_at(self, entry, moment):
+        entry.created_at = moment
+        ledger.post([entry])
+
+    def test_time_weighted_return_replays_trades(self):
+        trader = self.user('trader@example.com', 1000.0, self.start + timedelta(minutes=30))
+        middle = self.start + timedelta(hours=84)
+        # Half-way up, at 15: 750 of 1000 moves into shares that end at 20.
+        self.post_at(ledger.buy(trader.id, self.stock.id, 50, 15.0), middle + timedelta(minutes=1))
+
+        self.assertEqual(analytics.compute_all(NOW), 1)
+        result = PortfolioAnalytics.objects.get(user=trader)
+        self.assertEqual(result.net_worth, 1250.0)
+        self.assertEqual(result.stocks_value, 1000.0)
+        self.assertEqual(result.unrealized_pnl, 250.0)
+        self.assertEqual(result.positions, 1)
+        # Flat in cash, then 750 earns a third: 1250 / 1000.
+        self.assertAlmostEqual(result.time_weighted_return, 0.25, places=6)
+        self.assertEqual(result.max_drawdown, 0.0)
+        trader.refresh_from_db()
+        self.assertEqual(trader.analytics_net_worth, 1250.0)
+
+    def test_outside_money_is_not_a_return(self):
+        saver = self.user('saver@example.com', 1000.0, self.start + timedelta(minutes=30))
+        middle = self.start + timedelta(hours=84)
+        self.post_at(ledger.cash(saver.id, Trade.GRANT, 500.0), middle)
+        self.post_at(ledger.grant_shares(saver.id, self.stock.id, 10), middle + timedelta(hours=1))
+        self.post_at(ledger.cash(saver.id, Trade.LOAN, 200.0), middle + timedelta(hours=2))
+
+        analytics.compute_all(NOW)
+        result = PortfolioAnalytics.objects.get(user=saver)
+        self.assertEqual(result.net_worth, 1900.0)
+        # Only the granted shares move after they arrive.
+        shares_return = 20.0 / (10 + 10 * 85 / 168)
+        self.assertGreater(result.time_weighted_return, 0.0)
+        self.assertLess(result.time_weighted_return, shares_return - 1)
+
+    def test_cash_only_user_has_zero_return(self):
+        idle = self.user('idle@example.com', 100.0, self.start - timedelta(days=30))
+        analytics.compute_all(NOW)
+        result = PortfolioAnalytics.objects.get(user=idle)
+        self.assertEqual(result.time_weighted_return, 0.0)
+        self.assertEqual(result.volatility, 0.0)
+        self.assertEqual(result.max_drawdown, 0.0)
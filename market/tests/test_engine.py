@@ -0,0 +1,85 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase
+
+from accounts.models import User
+from market import engine, history, pricing, scheduling
+from market.models import Market, MarketState, Order, PriceAlert, Stock
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+# Every stock moves by the same scripted return on each tick: 10, 11, 12.1, 9.68, 7.744, 8.1312, ...
+RETURNS = [0.1, 0.1, -0.2, -0.2, 0.05] * 40
+
+
+class ScriptedModel(pricing.PriceModel):
+    def returns_many(self, universe, steps, rng, common_rng=None):
+        return np.tile(np.array(RETURNS[:steps])[:, None], (1, len(universe)))
+
+
+class CatchUpTests(TestCase):
+    def setUp(self):
+        sequence = scheduling.tick_sequence(NOW)
+        self.last = sequence - sequence % 6
+        self.stock = Stock.objects.create(symbol='CTCH', name='Catching up', price=10.0)
+        patcher = mock.patch.object(pricing, 'get_model', return_value=ScriptedModel())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def times(self, first, last):
+        return [scheduling.sequence_time(sequence) for sequence in range(first, last + 1)]
+
+    def test_nothing_to_replay(self):
+        self.assertEqual(engine.catch_up(0, self.last + 5), 0)
+        self.assertEqual(engine.catch_up(self.last, self.last + 1), 0)
+        self.assertEqual(engine.catch_up(self.last, self.last + 5, limit=0), 0)
+        self.assertEqual(history.count(self.stock), 0)
+
+    def test_missed_ticks_are_replayed_with_their_own_times(self):
+        version = MarketState.current_version()
+        self.assertEqual(engine.catch_up(self.last, self.last + 6), 5)
+
+        points = history.read(self.stock)
+        self.assertEqual([ts for ts, _ in points], self.times(self.last + 1, self.last + 5))
+        np.testing.assert_allclose([price for _, price in points], [11.0, 12.1, 9.68, 7.744, 8.1312])
+        self.stock.refresh_from_db()
+        self.assertAlmostEqual(self.stock.price, 8.1312)
+        self.assertAlmostEqual(self.stock.previous_price, 10.0)
+        self.assertEqual(MarketState.current_version(), version + 1)
+
+    def test_replay_is_capped_to_the_latest_ticks(self):
+        self.assertEqual(engine.catch_up(self.last, self.last + 100, limit=10), 10)
+        points = history.read(self.stock)
+        self.assertEqual([ts for ts, _ in points], self.times(self.last + 90, self.last + 99))
+
+    def test_slow_markets_move_on_their_own_ticks(self):
+        slow = Market.objects.create(name='Slow', slug='slow', tick_every=3)
+        stock = Stock.objects.create(market=slow, symbol='SLOW', name='Slow', price=10.0)
+        engine.catch_up(self.last, self.last + 6)
+
+        # It moved once, on its due tick, and the pipeline stamps where it is now.
+        self.assertEqual(history.read(stock), [
+            (scheduling.sequence_time(self.last + 3), 8.0),
+            (scheduling.sequence_time(self.last + 5), 8.0),
+        ])
+        stock.refresh_from_db()
+        self.assertEqual(stock.price, 8.0)
+        self.assertEqual(history.count(self.stock), 5)
+
+    def test_triggers_crossed_mid_path_fire_where_they_crossed(self):
+        user = User.objects.create_user(email='catchup@example.com')
+        alert = PriceAlert.objects.create(user=user, stock=self.stock, direction=PriceAlert.ABOVE, threshold=12.0)
+        order = Order.objects.create(
+            user=user, stock=self.stock, side=Order.BUY, kind=Order.LIMIT, trigger_price=8.0, amount=2,
+        )
+        engine.catch_up(self.last, self.last + 6)
+
+        alert.refresh_from_db()
+        self.assertEqual(alert.triggered_at, scheduling.sequence_time(self.last + 2))
+        self.assertAlmostEqual(alert.triggered_price, 12.1)
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.closed_at), (Order.FILLED, scheduling.sequence_time(self.last + 4)))
+        self.assertAlmostEqual(order.fill_price, 7.744)
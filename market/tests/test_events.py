@@ -0,0 +1,94 @@
+from collections import Counter
+import random
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from market import events
+from market.models import Market, MarketEvent, MarketEventApplication, Stock
+
+
+class AliasSamplerTests(SimpleTestCase):
+    def test_draws_follow_the_weights(self):
+        weights = [1, 2, 0, 7]
+        sampler = events.AliasSampler(weights)
+        rng = random.Random(3)
+        draws = Counter(sampler.sample(rng) for _ in range(50000))
+        self.assertNotIn(2, draws)
+        for index, weight in enumerate(weights):
+            self.assertAlmostEqual(draws[index] / 50000, weight / 10, delta=0.01)
+
+    def test_single_weight(self):
+        self.assertEqual({events.AliasSampler([5]).sample() for _ in range(20)}, {0})
+
+    def test_needs_a_positive_weight(self):
+        for weights in ([], [0, 0]):
+            with self.assertRaises(ValueError):
+                events.AliasSampler(weights)
+
+    @override_settings(MARKET_EVENT_LEVEL_WEIGHTS={'minor': 1, 'apocalyptic': 2})
+    def test_unknown_levels_are_rejected(self):
+        with self.assertRaises(ValueError):
+            events.level_weights()
+
+    @override_settings(MARKET_EVENT_LEVEL_WEIGHTS={'minor': 3, 'severe': 0})
+    def test_zero_weights_are_dropped(self):
+        self.assertEqual(events.level_weights(), {'minor': 3.0})
+
+
+class EventCatalogTests(TestCase):
+    def setUp(self):
+        events.reset_catalog()
+        self.addCleanup(events.reset_catalog)
+        MarketEvent.objects.all().delete()
+        self.minor = MarketEvent.objects.create(text='{company} shrugs', impact_level='minor', impact_low=-0.01, impact_high=0.01)
+        self.severe = MarketEvent.objects.create(text='{company} melts', impact_level='severe', impact_low=-0.5, impact_high=-0.4)
+
+    def test_levels_without_events_are_skipped(self):
+        catalog = events.EventCatalog(MarketEvent.objects.all(), {'minor': 1.0, 'major': 100.0, 'severe': 1.0})
+        self.assertEqual(catalog.levels, ['minor', 'severe'])
+        rng = random.Random(1)
+        self.assertEqual({catalog.sample_event(rng=rng) for _ in range(200)}, {self.minor, self.severe})
+        self.assertEqual(catalog.sample_event('severe', rng), self.severe)
+        self.assertIsNone(catalog.sample_event('major', rng))
+
+    def test_empty_catalog_samples_nothing(self):
+        catalog = events.EventCatalog([], events.DEFAULT_LEVEL_WEIGHTS)
+        self.assertIsNone(catalog.sample_level())
+        self.assertIsNone(catalog.sample_event())
+
+    def test_catalog_is_cached_until_events_change(self):
+        first = events.catalog()
+        with self.assertNumQueries(0):
+            self.assertIs(events.catalog(), first)
+        MarketEvent.objects.create(text='{company} booms', impact_level='major', impact_low=0.1, impact_high=0.2)
+        self.assertIn('major', events.catalog().levels)
+
+    def test_apply_events_moves_prices_in_one_batch(self):
+        stocks = [Stock.objects.create(symbol=f'EV{i}', name=f'Event {i}', price=10.0) for i in range(3)]
+        applied = events.apply_events(level='severe', stocks=stocks, rng=random.Random(5))
+
+        self.assertEqual([stock for _, stock, _ in applied], stocks)
+        for event, stock, old_price in applied:
+            self.assertEqual((event, old_price), (self.severe, 10.0))
+            stored = Stock.objects.get(id=stock.id)
+            self.assertEqual(stored.price, stock.price)
+            self.assertGreaterEqual(stored.price, 5.0)
+            self.assertLessEqual(stored.price, 6.0)
+        self.assertEqual(MarketEventApplication.objects.filter(event=self.severe).count(), 3)
+
+    def test_prices_never_fall_below_the_floor(self):
+        MarketEvent.objects.create(text='{company} vanishes', impact_level='major', impact_low=-1.0, impact_high=-1.0)
+        stock = Stock.objects.create(symbol='GONE', name='Gone', price=10.0)
+        events.apply_events(level='major', stocks=[stock])
+        self.assertEqual(Stock.objects.get(id=stock.id).price, 0.1)
+
+    def test_random_stocks_are_distinct_and_stay_in_their_market(self):
+        other = Market.objects.create(name='Other', slug='other')
+        here = {Stock.objects.create(symbol=f'RS{i}', name=f'Random {i}').id for i in range(6)}
+        Stock.objects.create(symbol='ELSE', name='Elsewhere', market=other)
+
+        picked = [stock.id for stock in events.random_stocks(4, random.Random(2))]
+        self.assertEqual(len(set(picked)), 4)
+        self.assertTrue(set(picked) <= here)
+        self.assertEqual(len(events.random_stocks(50)), 6)
+        self.assertEqual([s.symbol for s in events.random_stocks(5, market_id=other.id)], ['ELSE'])
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+import csv
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from accounts.models import User
+from market import exports, history
+from market.models import Market, Stock
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol='EXPT', name='Exported', price=10.0)
+        self.other = Stock.objects.create(symbol='OTHR', name='Other', price=5.0)
+        self.times = [NOW + timedelta(minutes=i) for i in range(5)]
+        history.record_many(
+            [(self.stock.id, ts, 10.0 + i) for i, ts in enumerate(self.times)]
+            + [(self.other.id, ts, 5.0 - i / 4) for i, ts in enumerate(self.times)]
+        )
+
+    def csv_rows(self, chunks):
+        return list(csv.reader(io.StringIO(''.join(chunks))))
+
+    def columnar_points(self, data):
+        header, blocks = exports.read_columnar(io.BytesIO(data))
+        points = [
+            (int(stock_id), int(millis), float(price))
+            for block in blocks
+            for stock_id, millis, price in zip(block['stock_id'], block['timestamp'], block['price'])
+        ]
+        return header, points
+
+
+class ExportFormatTests(ExportTestCase):
+    def test_resolve_symbols(self):
+        self.assertEqual(exports.resolve_symbols([' expt', '']), ({self.stock.id: 'EXPT'}, []))
+        self.assertEqual(exports.resolve_symbols(['EXPT', 'NOPE'])[1], ['NOPE'])
+        self.assertEqual(exports.resolve_symbols()[0], {self.stock.id: 'EXPT', self.other.id: 'OTHR'})
+
+        elsewhere = Market.objects.create(name='Elsewhere', slug='elsewhere')
+        self.assertEqual(exports.resolve_symbols(['EXPT'], elsewhere.id), ({}, ['EXPT']))
+
+    def test_csv(self):
+        with mock.patch.object(exports, 'CSV_ROWS_PER_CHUNK', 2):
+            chunks = list(exports.iter_csv({self.stock.id: 'EXPT'}, since=self.times[1], until=self.times[3]))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(self.csv_rows(chunks), [
+            ['symbol', 'timestamp', 'price'],
+            ['EXPT', self.times[1].isoformat(), '11.0'],
+            ['EXPT', self.times[2].isoformat(), '12.0'],
+            ['EXPT', self.times[3].isoformat(), '13.0'],
+        ])
+
+    def test_columnar_round_trip(self):
+        symbols = {self.stock.id: 'EXPT', self.other.id: 'OTHR'}
+        with mock.patch.object(exports, 'BLOCK_SIZE', 3):
+            header, points = self.columnar_points(b''.join(exports.iter_columnar(symbols, since=self.times[0])))
+
+        self.assertEqual(header['symbols'], {str(self.stock.id): 'EXPT', str(self.other.id): 'OTHR'})
+        self.assertEqual(header['since'], self.times[0].isoformat())
+        expected = [
+            (stock_id, round(ts.timestamp() * 1000), price)
+            for stock_id, ts, price in history.iter_points(list(symbols))
+        ]
+        self.assertEqual(points, expected)
+        self.assertEqual(len(points), 10)
+
+    def test_columnar_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            exports.read_columnar(io.BytesIO(b'symbol,timestamp,price\n'))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            exports.stream('xml', {})
+
+
+class ExportViewTests(ExportTestCase):
+    url = '/api/admin/history/export/'
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_user(email='staff@example.com', is_staff=True))
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user(email='trader@example.com'))
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_streams_csv(self):
+        response = self.client.get(self.url, {'symbols': 'EXPT', 'until': self.times[1].isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="price-history-', response['Content-Disposition'])
+        rows = self.csv_rows(chunk.decode('utf-8') for chunk in response.streaming_content)
+        self.assertEqual([row[2] for row in rows[1:]], ['10.0', '11.0'])
+
+    def test_streams_columnar(self):
+        response = self.client.get(self.url, {'format': 'columnar'})
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        _, points = self.columnar_points(b''.join(response.streaming_content))
+        self.assertEqual(len(points), 10)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        response = self.client.get(self.url, {'symbols': 'EXPT,NOPE'})
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('NOPE', response.json()['error'])
+
+
+class ExportCommandTests(ExportTestCase):
+    def test_writes_a_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'history.csv')
+            call_command('export_history', path, '--symbols', 'OTHR', stdout=io.StringIO())
+            with open(path, newline='') as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row[0] for row in rows[1:]}, {'OTHR'})
+
+    def test_unknown_market(self):
+        with self.assertRaises(CommandError):
+            call_command('export_history', '-', '--market', 'nowhere', stdout=io.StringIO())
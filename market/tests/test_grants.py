@@ -0,0 +1,136 @@
+import random
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from market import grants, ledger
+from market.models import Holding, Market, Stock, Trade
+
+
+class GrantTestCase(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(email=f'student{i}@school.example') for i in range(4)]
+        self.outsider = User.objects.create_user(email='visitor@example.com')
+        self.stocks = [Stock.objects.create(symbol=f'GR{i}', name=f'Granted {i}', price=float(i + 1)) for i in range(5)]
+
+    def ids(self, users):
+        return [user.id for user in users]
+
+
+class SelectUsersTests(GrantTestCase):
+    def test_by_ids(self):
+        self.assertEqual(grants.select_users({'user_ids': [self.users[1].id, 99999, str(self.users[0].id)]}), self.ids(self.users[:2]))
+        for user_ids in ([], 'all', None):
+            with self.assertRaises(ValueError):
+                grants.select_users({'user_ids': user_ids})
+
+    def test_by_filter(self):
+        ledger.post([ledger.cash(self.users[0].id, Trade.GRANT, -90.0)])
+        self.assertEqual(grants.select_users({'filter': {'email_endswith': '@SCHOOL.example'}}), self.ids(self.users))
+        self.assertEqual(grants.select_users({'filter': {'balance_lt': 50}}), [self.users[0].id])
+        self.assertEqual(len(grants.select_users({'filter': {}})), 5)
+        self.assertEqual(grants.select_users({'filter': {'market': 'nowhere'}}), [])
+
+    def test_bad_filters(self):
+        for payload in ({}, {'filter': []}, {'filter': {'name': 'x'}}, {'filter': {'joined_after': 'last week'}}):
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValueError):
+                    grants.select_users(payload)
+
+
+class GrantMoneyTests(GrantTestCase):
+    def test_credits_every_user_with_a_fixed_number_of_queries(self):
+        def run(user_ids):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(grants.grant_money(user_ids, 15.0, note='prize'), len(user_ids))
+            return len(queries)
+
+        self.assertEqual(run(self.ids(self.users[:1])), run(self.ids(self.users)))
+        balances = dict(User.objects.values_list('id', 'balance'))
+        self.assertEqual(balances[self.users[0].id], 130.0)
+        self.assertEqual([balances[user.id] for user in self.users[1:]], [115.0] * 3)
+        self.assertEqual(balances[self.outsider.id], 100.0)
+        self.assertEqual(Trade.objects.filter(kind=Trade.GRANT, note='prize').count(), 5)
+
+    def test_totals(self):
+        ledger.post([ledger.grant_shares(self.users[0].id, self.stocks[2].id, 2)])
+        self.assertEqual(grants.totals(self.ids(self.users[:2])), (200.0, 6.0))
+
+
+class GrantSharesTests(GrantTestCase):
+    def test_each_user_gets_distinct_stocks(self):
+        ledger.post([ledger.grant_shares(self.users[0].id, self.stocks[0].id, 100)])
+        result = grants.grant_random_shares(self.ids(self.users), 3, 2, 4, rng=random.Random(8))
+
+        self.assertEqual((result['users'], result['holdings']), (4, 12))
+        granted = Trade.objects.filter(kind=Trade.MONKEY_BUSINESS).exclude(shares=100)
+        self.assertEqual(sum(granted.values_list('shares', flat=True)), result['shares'])
+        self.assertAlmostEqual(sum(t.shares * t.stock.price for t in granted.select_related('stock')), result['value'])
+        for user in self.users:
+            stocks = list(granted.filter(user=user).values_list('stock_id', flat=True))
+            self.assertEqual(len(set(stocks)), 3)
+        for trade in granted:
+            self.assertTrue(2 <= trade.shares <= 4)
+
+        # Earlier holdings are added to, not replaced.
+        extra = granted.filter(user=self.users[0], stock=self.stocks[0]).first()
+        self.assertEqual(Holding.objects.get(user=self.users[0], stock=self.stocks[0]).shares, 100 + (extra.shares if extra else 0))
+
+    def test_stocks_come_from_each_users_market(self):
+        other = Market.objects.create(name='Other', slug='other')
+        far = Stock.objects.create(market=other, symbol='FAR', name='Far away', price=9.0)
+        moved = User.objects.create_user(email='moved@example.com', market=other)
+
+        result = grants.grant_random_shares([moved.id, self.users[0].id], 10, 1, 1)
+        self.assertEqual(result['holdings'], 1 + len(self.stocks))
+        self.assertEqual(list(Holding.objects.filter(user=moved).values_list('stock_id', flat=True)), [far.id])
+        self.assertFalse(Holding.objects.filter(user=self.users[0], stock=far).exists())
+
+    def test_no_stocks(self):
+        Stock.objects.all().delete()
+        with self.assertRaises(ValueError):
+            grants.grant_random_shares(self.ids(self.users), 1, 1, 1)
+
+
+class BulkViewTests(GrantTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email='teacher@example.com', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def post(self, url, **payload):
+        return self.client.post(url, payload, content_type='application/json')
+
+    def test_staff_only(self):
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.post('/api/admin/bulk/add-money/', amount=5, filter={}).status_code, 302)
+        self.assertEqual(User.objects.get(id=self.users[0].id).balance, 100.0)
+
+    def test_add_money(self):
+        response = self.post('/api/admin/bulk/add-money/', amount=12.5, filter={'email_endswith': 'school.example'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'success': True, 'users': 4, 'added_each': 12.5, 'added_total': 50.0, 'total_balance': 450.0,
+        })
+
+    def test_add_money_rejections(self):
+        self.assertEqual(self.post('/api/admin/bulk/add-money/', amount=0, filter={}).status_code, 400)
+        self.assertEqual(self.post('/api/admin/bulk/add-money/', amount=5, filter={'name': 'x'}).status_code, 400)
+        self.assertEqual(self.post('/api/admin/bulk/add-money/', amount=5, filter={'balance_gte': 1e9}).status_code, 404)
+        self.assertEqual(set(User.objects.values_list('balance', flat=True)), {100.0})
+
+    def test_monkey_business(self):
+        response = self.post('/api/admin/bulk/monkey-business/', num_stocks=2, shares_min=1, shares_max=1, user_ids=self.ids(self.users[:3]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['users'], data['holdings_granted'], data['total_shares_added']), (3, 6, 6))
+        self.assertEqual(data['total_stocks_value'], data['value_added'])
+
+    def test_monkey_business_rejections(self):
+        url = '/api/admin/bulk/monkey-business/'
+        self.assertEqual(self.post(url, num_stocks=0, filter={}).status_code, 400)
+        self.assertEqual(self.post(url, num_stocks=2, shares_min=5, shares_max=2, filter={}).status_code, 400)
+        self.assertEqual(self.post(url, num_stocks=2, user_ids=[99999]).status_code, 404)
+        self.assertFalse(Holding.objects.exists())
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from market import history
+from market.models import Stock, StockPriceChunk, StockPriceHistory
+
+
+START = datetime(2026, 10, 19, 9, 0, tzinfo=dt_timezone.utc)
+
+
+def series(stock_id, count, start=START, step=timedelta(minutes=1)):
+    """`count` (stock_id, timestamp, price) points one `step` apart."""
+    return [(stock_id, start + i * step, round(10 + (i % 13) * 0.37 - (i % 5) * 0.011, 6)) for i in range(count)]
+
+
+class ChunkEncodingTests(SimpleTestCase):
+    def test_round_trip(self):
+        points = [(ts, price) for _, ts, price in series(1, 500)]
+        points.append((START + timedelta(days=3, milliseconds=7), 0.000001))
+        self.assertEqual(history.decode_points(history.encode_points(points)), points)
+
+    def test_falling_prices_and_gaps_round_trip(self):
+        points = [(START + timedelta(seconds=i * i), 1000.0 - i * 9.5) for i in range(100)]
+        self.assertEqual(history.decode_points(history.encode_points(points)), points)
+
+    def test_empty_round_trip(self):
+        self.assertEqual(history.decode_points(history.encode_points([])), [])
+        self.assertEqual(history.decode_points(b''), [])
+
+    def test_unknown_format_is_rejected(self):
+        blob = history.encode_points([(START, 1.0)])
+        with self.assertRaises(ValueError):
+            history.decode_points(bytes([history.FORMAT_VERSION + 1]) + blob[1:])
+
+    def test_steady_series_packs_small(self):
+        blob = history.encode_points([(ts, price) for _, ts, price in series(1, 1000)])
+        self.assertLess(len(blob), 1000 * 2)
+
+    @override_settings(STOCK_HISTORY_CHUNK_SECONDS=600)
+    def test_window_start(self):
+        self.assertEqual(history.window_start(START + timedelta(minutes=17, seconds=5)), START + timedelta(minutes=10))
+
+
+@override_settings(STOCK_HISTORY_BACKEND='chunks', STOCK_HISTORY_CHUNK_SECONDS=600)
+class ChunkBackendTests(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol='CHNK', name='Chunked')
+        self.other = Stock.objects.create(symbol='OTHR', name='Other')
+
+    def test_points_pack_into_one_chunk_per_window(self):
+        history.record_many(series(self.stock.id, 60))
+        chunks = StockPriceChunk.objects.filter(stock=self.stock).order_by('window_start')
+        self.assertEqual([chunk.count for chunk in chunks], [10] * 6)
+        self.assertEqual(chunks[0].window_start, START)
+        self.assertEqual(history.count(self.stock), 60)
+        self.assertEqual(history.latest_timestamp(self.stock), START + timedelta(minutes=59))
+
+    def test_read_matches_what_was_written(self):
+        points = series(self.stock.id, 60)
+        # Written out of order and in pieces, with another stock interleaved.
+        history.record_many(points[30:] + series(self.other.id, 5))
+        history.record_many(points[:30])
+        expected = [(ts, price) for _, ts, price in points]
+
+        self.assertEqual(history.read(self.stock), expected)
+        self.assertEqual(history.read(self.stock, limit=15), expected[-15:])
+        self.assertEqual(history.read(self.stock, limit=0), [])
+        since, until = expected[12][0], expected[41][0]
+        self.assertEqual(history.read(self.stock, since=since, until=until), expected[12:42])
+        self.assertEqual(history.read(self.stock, since=since, limit=5), expected[-5:])
+
+    def test_iter_points_and_recent_prices(self):
+        history.record_many(series(self.stock.id, 25) + series(self.other.id, 3))
+        streamed = list(history.iter_points([self.stock.id, self.other.id]))
+        self.assertEqual(streamed, series(self.stock.id, 25) + series(self.other.id, 3))
+
+        recent = history.recent_prices([self.stock.id, self.other.id], n=12)
+        self.assertEqual(recent[self.stock.id], [price for _, _, price in series(self.stock.id, 25)][-12:])
+        self.assertEqual(recent[self.other.id], [price for _, _, price in series(self.other.id, 3)])
+
+    def test_trim_keeps_the_most_recent_points(self):
+        points = series(self.stock.id, 45)
+        history.record_many(points)
+        self.assertEqual(history.trim(self.stock, 17), 28)
+        self.assertEqual(history.read(self.stock), [(ts, price) for _, ts, price in points[-17:]])
+        # 5 + 10 points in the last two windows, 2 left in the third.
+        self.assertEqual(StockPriceChunk.objects.filter(stock=self.stock).count(), 3)
+
+    def test_trim_many(self):
+        history.record_many(series(self.stock.id, 30) + series(self.other.id, 30))
+        self.assertEqual(history.trim_many(5), 50)
+        self.assertEqual(history.count(self.stock), 5)
+        self.assertEqual(history.count(self.other), 5)
+
+    def test_compaction_copies_rows_once(self):
+        points = series(self.stock.id, 40)
+        StockPriceHistory.objects.bulk_create([
+            StockPriceHistory(stock_id=stock_id, timestamp=ts, price=price) for stock_id, ts, price in points[:25]
+        ])
+        self.assertEqual(history.compact_rows(batch_size=7), 25)
+        self.assertEqual(history.compact_rows(), 0)
+
+        StockPriceHistory.objects.bulk_create([
+            StockPriceHistory(stock_id=stock_id, timestamp=ts, price=price) for stock_id, ts, price in points[25:]
+        ])
+        self.assertEqual(history.compact_rows(), 15)
+        self.assertEqual(history.read(self.stock), [(ts, price) for _, ts, price in points])
+
+
+class RowBackendTests(TestCase):
+    def test_rows_and_chunks_read_the_same(self):
+        stock = Stock.objects.create(symbol='BOTH', name='Both')
+        points = series(stock.id, 33, step=timedelta(seconds=97))
+        history.record_many(points)
+        with override_settings(STOCK_HISTORY_BACKEND='chunks', STOCK_HISTORY_CHUNK_SECONDS=600):
+            history.record_many(points)
+            chunked = history.read(stock, limit=20, since=points[3][1])
+        self.assertEqual(history.read(stock, limit=20, since=points[3][1]), chunked)
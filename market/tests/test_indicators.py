@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from market import history, indicators
+from market.models import MarketState, Stock
+
+
+START = datetime(2026, 10, 19, 9, 0, tzinfo=dt_timezone.utc)
+
+
+def walk(count, seed=7):
+    return 50 + np.cumsum(np.random.default_rng(seed).normal(0, 0.5, count))
+
+
+def reference_ema(prices, window):
+    out = [np.nan] * len(prices)
+    value = prices[:window].mean()
+    out[window - 1] = value
+    for i in range(window, len(prices)):
+        value += 2.0 / (window + 1) * (prices[i] - value)
+        out[i] = value
+    return np.array(out)
+
+
+def reference_rsi(prices, window):
+    deltas = np.diff(prices)
+    out = [np.nan] * len(prices)
+    gain = np.clip(deltas[:window], 0, None).mean()
+    loss = np.clip(-deltas[:window], 0, None).mean()
+    for i in range(window, len(prices)):
+        if i > window:
+            delta = deltas[i - 1]
+            gain = (gain * (window - 1) + max(delta, 0)) / window
+            loss = (loss * (window - 1) + max(-delta, 0)) / window
+        out[i] = 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+    return np.array(out)
+
+
+class IndicatorMathTests(SimpleTestCase):
+    def setUp(self):
+        self.prices = walk(300)
+
+    def test_sma(self):
+        expected = np.convolve(self.prices, np.ones(20) / 20, mode='valid')
+        result = indicators.sma(self.prices, 20)
+        self.assertTrue(np.isnan(result[:19]).all())
+        np.testing.assert_allclose(result[19:], expected)
+
+    def test_bollinger(self):
+        middle, upper, lower = indicators.bollinger(self.prices, 20)
+        spread = np.array([self.prices[i - 19:i + 1].std() for i in range(19, 300)]) * indicators.BOLLINGER_K
+        np.testing.assert_allclose(upper[19:] - middle[19:], spread)
+        np.testing.assert_allclose(middle[19:] - lower[19:], spread)
+
+    def test_ema(self):
+        np.testing.assert_allclose(indicators.ema(self.prices, 14), reference_ema(self.prices, 14))
+
+    def test_rsi(self):
+        values, _, _ = indicators.rsi(self.prices, 14)
+        np.testing.assert_allclose(values, reference_rsi(self.prices, 14))
+
+    def test_rsi_without_losses_is_100(self):
+        values, _, _ = indicators.rsi(np.arange(1.0, 40.0), 14)
+        self.assertTrue((values[14:] == 100.0).all())
+
+    def test_short_input_is_all_nan(self):
+        for kind in indicators.KINDS:
+            series, _ = indicators._compute(kind, self.prices[:5], 14)
+            for values in series.values():
+                self.assertTrue(np.isnan(values).all())
+
+    def test_extend_matches_full_computation(self):
+        for kind in indicators.KINDS:
+            for split in (3, 15, 200):
+                full, _ = indicators._compute(kind, self.prices, 14)
+                head, state = indicators._compute(kind, self.prices[:split], 14)
+                tail, state = indicators._extend(kind, state, self.prices[split:], 14)
+                self.assertEqual(state['seen'], len(self.prices))
+                for name, values in full.items():
+                    np.testing.assert_allclose(
+                        np.concatenate([head[name], tail[name]]), values, err_msg=f"{kind} split at {split}",
+                    )
+
+
+class IndicatorCacheTests(TestCase):
+    kinds = list(indicators.KINDS)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.stock = Stock.objects.create(symbol='INDX', name='Indicators')
+        self.prices = walk(400, seed=11)
+
+    def write(self, start, stop, shift=timedelta(0)):
+        history.record_many([
+            (self.stock.id, START + timedelta(minutes=2 * i) + shift, float(self.prices[i])) for i in range(start, stop)
+        ])
+        MarketState.bump_version()
+
+    def series(self):
+        return indicators.indicator_series(self.stock, self.kinds, 14, 100)
+
+    def cold(self):
+        cache.clear()
+        return self.series()
+
+    def assertSeriesClose(self, first, second):
+        self.assertEqual(first['timestamps'], second['timestamps'])
+        for kind in self.kinds:
+            for name, values in first[kind].items():
+                other = second[kind][name]
+                self.assertEqual([v is None for v in values], [v is None for v in other])
+                np.testing.assert_allclose(
+                    [v for v in values if v is not None], [v for v in other if v is not None], atol=1e-3,
+                )
+
+    def test_warm_and_cold_caches_agree(self):
+        self.write(0, 250)
+        self.series()
+        self.write(250, 270)
+        warm = self.series()
+        self.assertEqual(len(warm['timestamps']), 100)
+        self.assertSeriesClose(warm, self.cold())
+
+    def test_unchanged_version_is_served_from_cache(self):
+        self.write(0, 250)
+        first = self.series()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.series(), first)
+
+    def test_backfill_inside_the_window_recomputes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.write(0, 250)
+        before = self.series()
+        # Points between cached ones, as a catch-up replay writes them.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.write(200, 240, shift=timedelta(minutes=1))
+        warm = self.series()
+        self.assertNotEqual(warm['timestamps'], before['timestamps'])
+        self.assertSeriesClose(warm, self.cold())
+
+    def test_appends_do_not_mark_a_backfill(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.write(0, 250)
+        mark = history.backfill_mark(self.stock)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.write(250, 260)
+        self.assertEqual(history.backfill_mark(self.stock), mark)
+
+    def test_unknown_latest_mark_counts_as_backfill(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.write(0, 250)
+        before = self.series()
+        cache.delete(history._latest_key(self.stock.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.write(200, 240, shift=timedelta(minutes=1))
+        self.assertNotEqual(self.series()['timestamps'], before['timestamps'])
+
+    def test_endpoint(self):
+        self.write(0, 50)
+        response = self.client.get('/api/stocks/INDX/indicators/', {'kind': 'rsi,sma', 'window': 14, 'points': 20})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['timestamps']), 20)
+        self.assertEqual(set(data['rsi']), {'rsi'})
+        self.assertEqual(len(data['sma']['sma']), 20)
+
+        for params in ({'kind': 'macd'}, {'window': 1}, {'points': 'x'}):
+            self.assertEqual(self.client.get('/api/stocks/INDX/indicators/', params).status_code, 400)
+        self.assertEqual(self.client.get('/api/stocks/NOPE/indicators/').status_code, 404)
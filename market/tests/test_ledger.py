@@ -0,0 +1,163 @@
+from django.test import TestCase
+
+from accounts.models import User
+from market import ledger
+from market.models import Holding, Stock, Trade
+
+
+class LedgerTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='ledger@example.com')
+        self.other = User.objects.create_user(email='other@example.com')
+        self.stock = Stock.objects.create(symbol='LDGR', name='Ledger', price=10.0)
+        self.second = Stock.objects.create(symbol='SCND', name='Second', price=5.0)
+
+    def holding(self, user=None, stock=None):
+        return Holding.objects.filter(user=user or self.user, stock=stock or self.stock).first()
+
+    def projections(self):
+        users = dict(User.objects.values_list('id', 'balance'))
+        pnl = dict(User.objects.values_list('id', 'realized_pnl'))
+        holdings = {
+            (user_id, stock_id): (shares, round(cost, 6))
+            for user_id, stock_id, shares, cost in Holding.objects.values_list('user_id', 'stock_id', 'shares', 'cost_basis')
+        }
+        return users, pnl, holdings
+
+
+class PostTests(LedgerTestCase):
+    def test_new_users_open_their_ledger(self):
+        opening = Trade.objects.get(user=self.user)
+        self.assertEqual((opening.kind, opening.cash), (Trade.OPENING, 100.0))
+
+    def test_buy_and_sell_project_into_balance_and_holding(self):
+        ledger.post([ledger.buy(self.user.id, self.stock.id, 4, 10.0)])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, 60.0)
+        self.assertEqual((self.holding().shares, self.holding().cost_basis), (4, 40.0))
+
+        ledger.post([ledger.sell(self.holding(), 3, 12.0)])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, 96.0)
+        self.assertAlmostEqual(self.user.realized_pnl, 6.0)
+        self.assertEqual((self.holding().shares, self.holding().cost_basis), (1, 10.0))
+
+        ledger.post([ledger.sell(self.holding(), 1, 8.0)])
+        self.assertIsNone(self.holding())
+
+    def test_one_post_covers_many_users_and_stocks(self):
+        ledger.post([
+            ledger.buy(self.user.id, self.stock.id, 2, 10.0),
+            ledger.buy(self.user.id, self.second.id, 4, 5.0),
+            ledger.buy(self.other.id, self.stock.id, 1, 10.0),
+            ledger.cash(self.other.id, Trade.GRANT, 25.0),
+            ledger.grant_shares(self.other.id, self.second.id, 3),
+        ])
+        users, _, holdings = self.projections()
+        self.assertEqual(users[self.user.id], 60.0)
+        self.assertEqual(users[self.other.id], 115.0)
+        self.assertEqual(holdings, {
+            (self.user.id, self.stock.id): (2, 20.0),
+            (self.user.id, self.second.id): (4, 20.0),
+            (self.other.id, self.stock.id): (1, 10.0),
+            (self.other.id, self.second.id): (3, 0.0),
+        })
+
+    def test_overdraft_rolls_back_the_whole_post(self):
+        with self.assertRaises(ledger.InsufficientFunds):
+            ledger.post([
+                ledger.cash(self.other.id, Trade.GRANT, 5.0),
+                ledger.buy(self.user.id, self.stock.id, 11, 10.0),
+            ], require_funds=True)
+        users, _, holdings = self.projections()
+        self.assertEqual(users, {self.user.id: 100.0, self.other.id: 100.0})
+        self.assertEqual(holdings, {})
+        self.assertEqual(Trade.objects.count(), 2)
+
+    def test_overselling_is_refused(self):
+        ledger.post([ledger.buy(self.user.id, self.stock.id, 2, 10.0)])
+        holding = self.holding()
+        with self.assertRaises(ledger.InsufficientShares):
+            ledger.post([ledger.sell(holding, 3, 10.0)])
+        self.assertEqual(self.holding().shares, 2)
+
+    def test_user_fields_are_set_in_the_same_update(self):
+        ledger.post([ledger.cash(self.user.id, Trade.LOAN, 20.0)], user_fields={'has_loan': True, 'loan_amount': 20.0})
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.balance, self.user.has_loan, self.user.loan_amount), (120.0, True, 20.0))
+
+    def test_trades_are_append_only(self):
+        trade = Trade.objects.get(user=self.user)
+        trade.cash = 1e6
+        with self.assertRaises(ValueError):
+            trade.save()
+
+
+class RebuildTests(LedgerTestCase):
+    def trade_a_while(self):
+        ledger.post([
+            ledger.buy(self.user.id, self.stock.id, 5, 10.0),
+            ledger.buy(self.other.id, self.second.id, 8, 5.0),
+        ])
+        ledger.post([ledger.sell(self.holding(), 2, 11.0), ledger.cash(self.other.id, Trade.GRANT, 7.5)])
+        ledger.post([ledger.grant_shares(self.user.id, self.second.id, 4)])
+        ledger.post([ledger.sell(self.holding(self.other, self.second), 8, 4.0)])
+
+    def test_rebuild_matches_posted_projections(self):
+        self.trade_a_while()
+        posted = self.projections()
+        self.assertEqual(ledger.rebuild_projections(dry_run=True)[2], 0)
+        self.assertEqual(ledger.rebuild_projections(), (2, 2, 0))
+        self.assertEqual(self.projections(), posted)
+
+    def test_rebuild_repairs_drift_in_small_batches(self):
+        self.trade_a_while()
+        posted = self.projections()
+        User.objects.filter(id=self.user.id).update(balance=0.0)
+        Holding.objects.filter(user=self.user, stock=self.second).delete()
+        Holding.objects.create(user=self.other, stock=self.stock, shares=9)
+
+        self.assertEqual(ledger.rebuild_projections(dry_run=True), (2, 2, 2))
+        self.assertEqual(User.objects.get(id=self.user.id).balance, 0.0)
+        self.assertEqual(ledger.rebuild_projections(batch_size=1), (2, 2, 2))
+        self.assertEqual(self.projections(), posted)
+
+    def test_iter_user_totals_sums_each_user(self):
+        self.trade_a_while()
+        totals = {user_id: (balance, pnl, holdings) for user_id, balance, pnl, holdings in ledger.iter_user_totals(chunk_size=2)}
+        balance, pnl, holdings = totals[self.user.id]
+        self.assertAlmostEqual(balance, 100.0 - 50.0 + 22.0)
+        self.assertAlmostEqual(pnl, 2.0)
+        self.assertEqual(holdings[self.stock.id], (3, 30.0))
+        self.assertEqual(holdings[self.second.id], (4, 0.0))
+        self.assertEqual(totals[self.other.id][2][self.second.id], (0, 0.0))
+
+
+class TradeViewTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def post(self, url, **payload):
+        return self.client.post(url, payload, content_type='application/json')
+
+    def test_buy_then_sell_through_the_api(self):
+        response = self.post('/api/buy/', symbol='LDGR', amount=3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['balance'], 70.0)
+        self.assertEqual(response.json()['holding']['shares'], 3)
+
+        self.assertEqual(self.post('/api/sell/', symbol='LDGR', amount=4).status_code, 400)
+        self.assertEqual(self.post('/api/sell/', symbol='LDGR', amount=3).status_code, 200)
+        self.assertIsNone(self.holding())
+        self.assertEqual(
+            list(Trade.objects.filter(user=self.user).values_list('kind', flat=True)),
+            [Trade.OPENING, Trade.BUY, Trade.SELL],
+        )
+
+    def test_buy_without_funds(self):
+        response = self.post('/api/buy/', symbol='LDGR', amount=11)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['balance'], 100.0)
+        self.assertIsNone(self.holding())
+        self.assertEqual(Trade.objects.filter(user=self.user).count(), 1)
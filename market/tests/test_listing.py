@@ -0,0 +1,151 @@
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import User
+from market import listing
+from market.models import DEFAULT_MARKET_ID, Market, Stock
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        cursor = listing.encode_cursor('-price', 12.5, 7)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(listing.decode_cursor(cursor, '-price'), (12.5, 7))
+
+    def test_bad_cursors(self):
+        with self.assertRaises(listing.InvalidCursor):
+            listing.decode_cursor(listing.encode_cursor('price', 1.0, 1), '-price')
+        for cursor in ('!!!', 'bm90IGpzb24', listing.encode_cursor('price', 1.0, 1)[:-3]):
+            with self.assertRaises(listing.InvalidCursor):
+                listing.decode_cursor(cursor, 'price')
+
+
+class StockPageTests(TestCase):
+    def setUp(self):
+        # Few distinct values, so every page boundary falls inside a tie.
+        for i in range(23):
+            Stock.objects.create(
+                symbol=f'L{i:02d}', name=f'Listed {i}', price=float(10 + i % 3), change=[-1.5, 0.0, 2.25][i % 3] if i % 2 else 0.0,
+            )
+        Stock.objects.update(volume=0)
+        Stock.objects.filter(symbol__in=['L03', 'L07']).update(volume=40)
+        self.elsewhere = Market.objects.create(name='Elsewhere', slug='elsewhere')
+        Stock.objects.create(market=self.elsewhere, symbol='L00', name='Listed elsewhere')
+
+    def walk(self, sort, limit=4, query=''):
+        seen, cursor = [], None
+        while True:
+            stocks, cursor = listing.page(query, sort, cursor, limit, market_id=DEFAULT_MARKET_ID)
+            self.assertLessEqual(len(stocks), limit)
+            seen += [stock.id for stock in stocks]
+            if cursor is None:
+                return seen
+
+    def test_every_sort_visits_each_stock_once_in_order(self):
+        stocks = list(Stock.objects.filter(market_id=DEFAULT_MARKET_ID))
+        for sort, (field, descending) in listing.SORTS.items():
+            with self.subTest(sort=sort):
+                expected = sorted(stocks, key=lambda s: (getattr(s, field), s.id), reverse=descending)
+                self.assertEqual(self.walk(sort), [s.id for s in expected])
+
+    def test_page_size_does_not_change_the_order(self):
+        self.assertEqual(self.walk('-price', limit=1), self.walk('-price', limit=200))
+
+    def test_cursor_survives_a_new_row_before_it(self):
+        first, cursor = listing.page(sort='price', limit=5, market_id=DEFAULT_MARKET_ID)
+        Stock.objects.create(symbol='AAA', name='Cheap newcomer', price=1.0)
+        second, _ = listing.page(sort='price', cursor=cursor, limit=5, market_id=DEFAULT_MARKET_ID)
+        self.assertFalse({s.id for s in first} & {s.id for s in second})
+        self.assertEqual((second[0].price, second[0].id > first[-1].id), (first[-1].price, True))
+
+    def test_search(self):
+        self.assertEqual(len(self.walk('symbol', query='l1')), 10)
+        self.assertEqual(len(self.walk('symbol', query='listed 2')), 4)
+        stocks, _ = listing.page(query='L00', market_id=self.elsewhere.id)
+        self.assertEqual([s.name for s in stocks], ['Listed elsewhere'])
+
+    def test_unknown_sort(self):
+        with self.assertRaises(ValueError):
+            listing.page(sort='name')
+
+
+class StockListViewTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            Stock.objects.create(symbol=f'V{i}', name=f'Viewed {i}', price=10.0)
+
+    def test_follows_next(self):
+        first = self.client.get('/api/stocks/', {'sort': '-price', 'limit': 3}).json()
+        second = self.client.get('/api/stocks/', {'sort': '-price', 'limit': 3, 'cursor': first['next']}).json()
+        self.assertEqual(len(first['results']), 3)
+        self.assertIsNone(second['next'])
+        self.assertEqual(
+            sorted(s['symbol'] for s in first['results'] + second['results']), ['V0', 'V1', 'V2', 'V3', 'V4'],
+        )
+
+    def test_bad_requests(self):
+        for params in ({'sort': 'name'}, {'limit': 0}, {'limit': 'ten'}, {'sort': 'price', 'cursor': 'garbage'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/stocks/', params).status_code, 400)
+
+
+class UserPageTests(TestCase):
+    def setUp(self):
+        for i in range(13):
+            User.objects.create_user(email=f'u{i:02d}@example.com', first_name=['Ada', 'Bob', ''][i % 3])
+        # Three distinct net worths, so page boundaries fall inside ties.
+        for user in User.objects.all():
+            User.objects.filter(id=user.id).update(analytics_net_worth=float(100 * (user.id % 3)))
+
+    def walk(self, sort, limit=3, **kwargs):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = listing.user_page(sort=sort, cursor=cursor, limit=limit, **kwargs)
+            seen += rows
+            if cursor is None:
+                return seen
+
+    def test_every_sort_visits_each_user_once_in_order(self):
+        users = list(User.objects.all())
+        for sort, (field, descending) in listing.USER_SORTS.items():
+            with self.subTest(sort=sort):
+                key = (lambda u: u.email) if field == 'email' else (lambda u: (u.analytics_net_worth, u.id))
+                expected = [u.id for u in sorted(users, key=key, reverse=descending)]
+                self.assertEqual([row['id'] for row in self.walk(sort)], expected)
+
+    def test_rows_are_plain_values(self):
+        rows, _ = listing.user_page(limit=1)
+        self.assertEqual(set(rows[0]), {'id', 'email', 'first_name', 'last_name', 'balance'})
+        rows, _ = listing.user_page(limit=1, net_worth=True)
+        self.assertIn('net_worth', rows[0])
+        self.assertIn('net_worth', self.walk('-net_worth')[0])
+
+    def test_search(self):
+        self.assertEqual(len(self.walk('email', query='ADA')), 5)
+        self.assertEqual(len(self.walk('-net_worth', query='u1')), 3)
+
+
+class AdminUserListViewTests(TestCase):
+    url = '/api/admin/users/'
+
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', first_name='Ad', last_name='Min', is_staff=True)
+        self.client.force_login(self.admin)
+        User.objects.create_user(email='nameless@example.com')
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.get(email='nameless@example.com'))
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_pages(self):
+        first = self.client.get(self.url, {'limit': 1, 'include': 'net_worth'}).json()
+        self.assertEqual(first['users'], [
+            {'id': self.admin.id, 'name': 'Ad Min', 'email': 'admin@example.com', 'balance': 100.0, 'net_worth': 100.0},
+        ])
+        second = self.client.get(self.url, {'limit': 1, 'cursor': first['next']}).json()
+        self.assertEqual([(u['name'], u['email']) for u in second['users']], [('No Name', 'nameless@example.com')])
+        self.assertIsNone(second['next'])
+
+    def test_bad_requests(self):
+        for params in ({'sort': 'balance'}, {'limit': 501}, {'limit': 'x'}, {'cursor': listing.encode_cursor('-email', 'a', 1)}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import CommandError, call_command
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from accounts.models import User
+from market import engine, history, markets
+from market.models import DEFAULT_MARKET_ID, Holding, Market, Stock
+
+
+class MarketTestCase(TestCase):
+    def setUp(self):
+        self.other = Market.objects.create(name='Second cohort', slug='second', tick_every=2)
+        self.here = Stock.objects.create(symbol='SAME', name='Main listing', price=10.0, sector='tech')
+        self.there = Stock.objects.create(market=self.other, symbol='SAME', name='Second listing', price=20.0)
+
+
+class ForRequestTests(MarketTestCase):
+    def request(self, user=None, **params):
+        request = RequestFactory().get('/', params)
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_visitors_pick_a_market_by_slug(self):
+        self.assertEqual(markets.for_request(self.request()), DEFAULT_MARKET_ID)
+        self.assertEqual(markets.for_request(self.request(market='second')), self.other.id)
+        with self.assertRaises(Http404):
+            markets.for_request(self.request(market='nowhere'))
+
+    def test_traders_stay_in_their_market(self):
+        trader = User.objects.create_user(email='trader@example.com', market=self.other)
+        self.assertEqual(markets.for_request(self.request(trader, market='main')), self.other.id)
+
+    def test_staff_may_look_at_any_market(self):
+        staff = User.objects.create_user(email='staff@example.com', is_staff=True)
+        self.assertEqual(markets.for_request(self.request(staff)), DEFAULT_MARKET_ID)
+        self.assertEqual(markets.for_request(self.request(staff), 'second'), self.other.id)
+
+
+class ScheduleTests(MarketTestCase):
+    def test_due_markets(self):
+        self.assertEqual(markets.tick_every(), {DEFAULT_MARKET_ID: 1, self.other.id: 2})
+        self.assertEqual(markets.due(11), [DEFAULT_MARKET_ID])
+        self.assertEqual(sorted(markets.due(12)), sorted([DEFAULT_MARKET_ID, self.other.id]))
+        self.assertEqual(len(markets.due()), 2)
+
+    def test_tick_moves_only_due_markets(self):
+        engine.tick(sequence=11)
+        self.assertEqual((history.count(self.here), history.count(self.there)), (1, 0))
+        engine.tick(sequence=12)
+        self.assertEqual((history.count(self.here), history.count(self.there)), (2, 1))
+
+
+class CreateMarketTests(MarketTestCase):
+    def test_copy_lists_the_same_stocks_fresh(self):
+        copy = markets.create('third', 'Third cohort', tick_every=5, copy_from=Market.objects.get(id=DEFAULT_MARKET_ID))
+        listed = Stock.objects.get(market=copy)
+        self.assertEqual((listed.symbol, listed.name, listed.sector, listed.price), ('SAME', 'Main listing', 'tech', 10.0))
+        self.assertNotEqual(listed.id, self.here.id)
+        self.assertNotEqual((listed.volatility_min, listed.volatility_max), (self.here.volatility_min, self.here.volatility_max))
+        self.assertEqual(history.count(listed), 0)
+        self.assertEqual(copy.tick_every, 5)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('create_market', 'fourth', 'Fourth cohort', '--copy-stocks-from', 'second', stdout=out)
+        self.assertIn('with 1 stocks', out.getvalue())
+        self.assertEqual(Stock.objects.get(market__slug='fourth').price, 20.0)
+
+        for args in (['fourth', 'Again'], ['fifth', 'Fifth', '--copy-stocks-from', 'nowhere'], ['sixth', 'Sixth', '--tick-every', '0']):
+            with self.subTest(args=args):
+                with self.assertRaises(CommandError):
+                    call_command('create_market', *args, stdout=StringIO())
+        self.assertFalse(Market.objects.filter(slug__in=['fifth', 'sixth']).exists())
+
+
+class IsolationTests(MarketTestCase):
+    def setUp(self):
+        super().setUp()
+        self.trader = User.objects.create_user(email='cohort@example.com', market=self.other)
+        self.client.force_login(self.trader)
+
+    def test_trades_use_the_traders_market(self):
+        response = self.client.post('/api/buy/', {'symbol': 'SAME', 'amount': 2}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Holding.objects.get(user=self.trader).stock, self.there)
+        self.assertEqual(response.json()['balance'], 60.0)
+
+    def test_listings_show_only_the_traders_market(self):
+        self.assertEqual(self.client.get('/api/stocks/SAME/').json()['price'], 20.0)
+        self.assertEqual([item['price'] for item in self.client.get('/api/ticker/', {'market': 'main'}).json()], [20.0])
+
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/stocks/SAME/').json()['price'], 10.0)
+        self.assertEqual(self.client.get('/api/stocks/SAME/', {'market': 'second'}).json()['price'], 20.0)
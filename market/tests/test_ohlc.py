@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from market import history, ohlc
+from market.models import Stock, StockActivity, StockPriceBucket
+
+
+NOW = datetime(2026, 10, 19, 12, 7, tzinfo=dt_timezone.utc)
+
+
+class BucketTests(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol='OHLC', name='Ranged', price=10.0)
+        self.quiet = Stock.objects.create(symbol='QUIT', name='Quiet', price=3.0)
+
+    def buckets(self):
+        return list(
+            StockPriceBucket.objects.filter(stock=self.stock).order_by('bucket_start')
+            .values_list('bucket_start', 'open', 'high', 'low')
+        )
+
+    def at(self, minutes):
+        return NOW + timedelta(minutes=minutes)
+
+    def test_record_folds_prices_into_buckets(self):
+        ohlc.record([(self.stock.id, self.at(0), 10.0), (self.stock.id, self.at(1), 12.0), (self.stock.id, self.at(2), 9.0)])
+        ohlc.record([(self.stock.id, self.at(2), 11.0), (self.stock.id, self.at(3), 8.5), (self.stock.id, self.at(4), 10.0)], batch_size=1)
+        ohlc.record([])
+
+        bucket = datetime(2026, 10, 19, 12, 5, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.buckets(), [
+            (bucket, 10.0, 12.0, 9.0),
+            (bucket + timedelta(minutes=5), 8.5, 10.0, 8.5),
+        ])
+
+    def test_rollup_covers_the_last_24_hours(self):
+        ohlc.record([
+            (self.stock.id, NOW - timedelta(hours=25), 50.0),
+            (self.stock.id, NOW - timedelta(hours=23), 9.0),
+            (self.stock.id, NOW - timedelta(hours=5), 14.0),
+            (self.stock.id, NOW - timedelta(hours=5), 7.0),
+            (self.stock.id, NOW, 10.0),
+        ])
+        self.assertEqual(ohlc.rollup(now=NOW), 2)
+
+        stats = StockActivity.objects.get(stock=self.stock)
+        self.assertEqual((stats.open_24h, stats.high_24h, stats.low_24h), (9.0, 14.0, 7.0))
+        quiet = StockActivity.objects.get(stock=self.quiet)
+        self.assertEqual((quiet.open_24h, quiet.high_24h, quiet.low_24h), (None, None, None))
+        self.assertEqual(len(self.buckets()), 3)
+
+        # The window moves on.
+        ohlc.rollup(now=NOW + timedelta(hours=20))
+        stats.refresh_from_db()
+        self.assertEqual((stats.open_24h, stats.high_24h, stats.low_24h), (10.0, 10.0, 10.0))
+
+    def test_rebuild_matches_recording(self):
+        points = [(self.stock.id, self.at(-i * 3), 10.0 + (i % 4)) for i in range(40, -1, -1)]
+        history.record_many(points)
+        ohlc.record(points)
+        recorded = self.buckets()
+
+        self.assertEqual(ohlc.rebuild(now=NOW), len(points))
+        self.assertEqual(self.buckets(), recorded)
+
+
+class RangeViewTests(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol='OHLC', name='Ranged', price=12.0)
+        ohlc.record([(self.stock.id, NOW, 10.0), (self.stock.id, NOW, 11.0), (self.stock.id, NOW, 9.5)])
+        ohlc.rollup(now=NOW)
+
+    def test_current_price_widens_the_rolled_up_range(self):
+        data = self.client.get('/api/stocks/OHLC/').json()
+        self.assertEqual(
+            {key: data[key] for key in ('open_24h', 'high_24h', 'low_24h', 'change_24h')},
+            {'open_24h': 10.0, 'high_24h': 12.0, 'low_24h': 9.5, 'change_24h': 20.0},
+        )
+
+    def test_list_and_ticker_carry_the_range(self):
+        for item in (self.client.get('/api/stocks/').json()['results'][0], self.client.get('/api/ticker/').json()[0]):
+            self.assertEqual((item['open_24h'], item['low_24h']), (10.0, 9.5))
+
+    def test_stock_without_buckets_reports_its_price(self):
+        Stock.objects.create(symbol='NEW', name='Newcomer', price=4.0)
+        data = self.client.get('/api/stocks/NEW/').json()
+        self.assertEqual((data['open_24h'], data['high_24h'], data['low_24h'], data['change_24h']), (4.0, 4.0, 4.0, 0.0))
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import TestCase
+
+from accounts.models import User
+from market import ledger, orders, prices
+from market.models import Holding, Order, Stock, Trade
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class OrderTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='orders@example.com')
+        self.stock = Stock.objects.create(symbol='ORDR', name='Ordered', price=10.0)
+
+    def order(self, side, kind, trigger, amount=1, stock=None):
+        return Order.objects.create(
+            user=self.user, stock=stock or self.stock, side=side, kind=kind, trigger_price=trigger, amount=amount,
+        )
+
+    def give_shares(self, amount):
+        ledger.post([ledger.grant_shares(self.user.id, self.stock.id, amount)])
+
+    def refresh(self, *objects):
+        for obj in objects:
+            obj.refresh_from_db()
+
+
+class TriggerTests(OrderTestCase):
+    def test_trigger_directions(self):
+        self.assertTrue(orders.fires_on_rise(Order.SELL, Order.LIMIT))
+        self.assertFalse(orders.fires_on_rise(Order.BUY, Order.LIMIT))
+        self.assertTrue(orders.fires_on_rise(Order.BUY, Order.STOP_LOSS))
+        self.assertFalse(orders.fires_on_rise(Order.SELL, Order.STOP_LOSS))
+        self.assertTrue(orders.fires_on_rise(Order.SELL, Order.TAKE_PROFIT))
+
+    def test_orders_fire_at_their_trigger_and_not_before(self):
+        buy_limit = self.order(Order.BUY, Order.LIMIT, 9.0)
+        stop_loss = self.order(Order.SELL, Order.STOP_LOSS, 9.0)
+        sell_limit = self.order(Order.SELL, Order.LIMIT, 11.0)
+        take_profit = self.order(Order.SELL, Order.TAKE_PROFIT, 11.0)
+        stop_buy = self.order(Order.BUY, Order.STOP_LOSS, 11.0)
+
+        self.assertEqual(orders.triggered({self.stock.id: 9.01}), {})
+        self.assertEqual(orders.triggered({self.stock.id: 10.99}), {})
+        self.assertEqual(orders.triggered({self.stock.id: 9.0}), {self.stock.id: [buy_limit.id, stop_loss.id]})
+        self.assertEqual(
+            orders.triggered({self.stock.id: 11.0}), {self.stock.id: [sell_limit.id, take_profit.id, stop_buy.id]},
+        )
+
+    def test_closed_orders_never_fire(self):
+        for status in (Order.FILLED, Order.CANCELLED, Order.REJECTED):
+            Order.objects.filter(id=self.order(Order.BUY, Order.LIMIT, 9.0).id).update(status=status)
+        self.assertEqual(orders.triggered({self.stock.id: 5.0}), {})
+
+    def test_each_stock_is_matched_against_its_own_price(self):
+        other = Stock.objects.create(symbol='OTHR', name='Other', price=10.0)
+        here = self.order(Order.BUY, Order.LIMIT, 9.0)
+        there = self.order(Order.BUY, Order.LIMIT, 9.0, stock=other)
+        self.assertEqual(orders.triggered({self.stock.id: 8.0, other.id: 9.5}), {self.stock.id: [here.id]})
+
+        # Batches of one stock each find the same orders.
+        found = orders._reached({self.stock.id: 8.0, other.id: 8.5}, orders.ORDER_FIRES_ON_FALL, '>=', batch_size=1)
+        self.assertEqual(sorted(order_id for _, order_id, _ in found), [here.id, there.id])
+
+
+class SettlementTests(OrderTestCase):
+    def test_buy_fills_at_the_new_price(self):
+        order = self.order(Order.BUY, Order.LIMIT, 9.0, amount=5)
+        self.assertEqual(orders.match({self.stock.id: 8.5}, now=NOW), (1, 0))
+
+        self.refresh(order, self.user)
+        self.assertEqual((order.status, order.fill_price, order.closed_at), (Order.FILLED, 8.5, NOW))
+        self.assertAlmostEqual(self.user.balance, 100.0 - 42.5)
+        holding = Holding.objects.get(user=self.user, stock=self.stock)
+        self.assertEqual((holding.shares, holding.cost_basis), (5, 42.5))
+        trade = Trade.objects.get(kind=Trade.BUY)
+        self.assertEqual((trade.shares, trade.cash, trade.note), (5, -42.5, f'order #{order.id}'))
+
+    def test_sell_fills_and_realizes_profit(self):
+        ledger.post([ledger.buy(self.user.id, self.stock.id, 4, 10.0)])
+        order = self.order(Order.SELL, Order.TAKE_PROFIT, 12.0, amount=3)
+        self.assertEqual(orders.match({self.stock.id: 12.5}), (1, 0))
+
+        self.refresh(order, self.user)
+        self.assertEqual(order.status, Order.FILLED)
+        self.assertAlmostEqual(self.user.balance, 60.0 + 37.5)
+        self.assertAlmostEqual(self.user.realized_pnl, 37.5 - 30.0)
+        self.assertEqual(Holding.objects.get(user=self.user, stock=self.stock).shares, 1)
+
+    def test_rejections(self):
+        too_big = self.order(Order.BUY, Order.LIMIT, 9.0, amount=100)
+        no_shares = self.order(Order.SELL, Order.STOP_LOSS, 9.0)
+        self.assertEqual(orders.match({self.stock.id: 9.0}), (0, 2))
+
+        self.refresh(too_big, no_shares, self.user)
+        self.assertEqual((too_big.status, too_big.note), (Order.REJECTED, 'Insufficient funds'))
+        self.assertEqual((no_shares.status, no_shares.note), (Order.REJECTED, 'Not enough shares'))
+        self.assertEqual(self.user.balance, 100.0)
+        self.assertFalse(Trade.objects.exclude(kind=Trade.OPENING).exists())
+
+    def test_earlier_orders_claim_funds_first(self):
+        first = self.order(Order.BUY, Order.LIMIT, 9.0, amount=10)
+        second = self.order(Order.BUY, Order.LIMIT, 9.0, amount=10)
+        self.assertEqual(orders.match({self.stock.id: 9.0}), (1, 1))
+        self.refresh(first, second)
+        self.assertEqual([first.status, second.status], [Order.FILLED, Order.REJECTED])
+
+    def test_earlier_orders_claim_shares_first(self):
+        self.give_shares(3)
+        first = self.order(Order.SELL, Order.LIMIT, 9.5, amount=2)
+        second = self.order(Order.SELL, Order.STOP_LOSS, 9.5, amount=2)
+        self.assertEqual(orders.match({self.stock.id: 9.5}), (1, 1))
+        self.refresh(first, second)
+        self.assertEqual([first.status, second.status], [Order.FILLED, Order.REJECTED])
+
+    def test_price_pipeline_matches_orders(self):
+        order = self.order(Order.BUY, Order.LIMIT, 9.0)
+        with prices.batch('test') as batch:
+            prices.set_price(self.stock, 8.75)
+        self.assertEqual((batch.orders_filled, batch.orders_rejected), (1, 0))
+        self.refresh(order)
+        self.assertEqual(order.fill_price, 8.75)
+
+    def test_admin_price_change_matches_orders(self):
+        admin = User.objects.create_user(email='admin@example.com', is_staff=True)
+        self.client.force_login(admin)
+        order = self.order(Order.SELL, Order.STOP_LOSS, 9.0)
+        self.give_shares(1)
+
+        response = self.client.post(
+            '/api/admin/set-price/', {'stock_symbol': 'ORDR', 'price': 8.0}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.refresh(order)
+        self.assertEqual((order.status, order.fill_price), (Order.FILLED, 8.0))
+
+
+class OrderViewTests(OrderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def place(self, **payload):
+        return self.client.post('/api/orders/place/', payload, content_type='application/json')
+
+    def test_trigger_must_be_on_the_waiting_side(self):
+        self.assertEqual(self.place(symbol='ORDR', side='buy', kind='limit', trigger_price=10.5, amount=1).status_code, 400)
+        self.assertEqual(self.place(symbol='ORDR', side='buy', kind='stop_loss', trigger_price=9.5, amount=1).status_code, 400)
+        self.assertEqual(self.place(symbol='ORDR', side='buy', kind='take_profit', trigger_price=11, amount=1).status_code, 400)
+        self.assertEqual(self.place(symbol='ORDR', side='sell', kind='limit', trigger_price=11, amount=1).status_code, 400)
+        self.assertEqual(self.place(symbol='ORDR', side='buy', kind='limit', trigger_price=9, amount=20).status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+        response = self.place(symbol='ORDR', side='buy', kind='limit', trigger_price=9, amount=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.get().trigger_price, 9.0)
+
+    def test_cancel(self):
+        order = self.order(Order.BUY, Order.LIMIT, 9.0)
+        response = self.client.post('/api/orders/cancel/', {'id': order.id}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.refresh(order)
+        self.assertEqual(order.status, Order.CANCELLED)
+        self.assertEqual(orders.triggered({self.stock.id: 1.0}), {})
+        response = self.client.post('/api/orders/cancel/', {'id': order.id}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
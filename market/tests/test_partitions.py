@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from market import partitions
+from market.models import Stock, StockPriceHistory
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class PartitionWindowTests(SimpleTestCase):
+    def test_daily_window_starts_at_utc_midnight(self):
+        self.assertEqual(partitions.window_start(utc(2026, 10, 21, 17, 30), 'daily'), utc(2026, 10, 21))
+
+    def test_weekly_window_starts_on_monday(self):
+        # 2026-10-21 is a Wednesday.
+        self.assertEqual(partitions.window_start(utc(2026, 10, 21, 17, 30), 'weekly'), utc(2026, 10, 19))
+
+    def test_partition_name_round_trips(self):
+        for mode in ('daily', 'weekly'):
+            start = partitions.window_start(utc(2026, 10, 21), mode)
+            name = partitions.partition_name(start, mode)
+            self.assertEqual(partitions._parse_partition_name(name), (start, start + partitions.INTERVALS[mode]))
+
+    def test_foreign_names_are_ignored(self):
+        self.assertIsNone(partitions._parse_partition_name('market_stockpricehistory_default'))
+        self.assertIsNone(partitions._parse_partition_name('market_stock'))
+
+    @override_settings(STOCK_HISTORY_PARTITIONING='hourly')
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            partitions.partitioning_mode()
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol='PART', name='Partitioned')
+        self.times = [utc(2026, 10, day, 12) for day in (18, 19, 20, 21)]
+        StockPriceHistory.objects.bulk_create([
+            StockPriceHistory(stock=self.stock, timestamp=ts, price=10.0) for ts in self.times
+        ])
+
+    def convert(self):
+        # Check the rows inserted by setUp now, as a committed table would
+        # have; PostgreSQL will not drop a table with deferred checks pending.
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        return partitions.convert_to_partitioned()
+
+    def remaining(self):
+        return list(StockPriceHistory.objects.order_by('timestamp').values_list('timestamp', flat=True))
+
+    @override_settings(STOCK_HISTORY_PARTITIONING='daily')
+    def test_range_delete_keeps_the_cutoff_window(self):
+        windows, rows = partitions.drop_partitions_before(utc(2026, 10, 20, 18))
+        self.assertEqual((windows, rows), (1, 2))
+        self.assertEqual(self.remaining(), self.times[2:])
+
+    @skipUnless(connection.vendor == 'postgresql', "Native partitioning needs PostgreSQL")
+    @override_settings(STOCK_HISTORY_PARTITIONING='daily')
+    def test_converted_table_keeps_rows_and_drops_whole_windows(self):
+        self.assertTrue(self.convert())
+        self.assertTrue(partitions.is_partitioned())
+        self.assertFalse(partitions.convert_to_partitioned())
+        self.assertEqual(self.remaining(), self.times)
+
+        names = [name for name, _, _ in partitions.list_partitions()]
+        self.assertIn(partitions.partition_name(utc(2026, 10, 18), 'daily'), names)
+
+        # New rows still insert through the ORM, into their window.
+        StockPriceHistory.objects.create(stock=self.stock, timestamp=utc(2026, 10, 21, 13), price=11.0)
+
+        windows, rows = partitions.drop_partitions_before(utc(2026, 10, 20, 18))
+        self.assertEqual((windows, rows), (2, None))
+        self.assertEqual(self.remaining(), self.times[2:] + [utc(2026, 10, 21, 13)])
+
+    @skipUnless(connection.vendor == 'postgresql', "Native partitioning needs PostgreSQL")
+    @override_settings(STOCK_HISTORY_PARTITIONING='daily')
+    def test_ensure_partitions_creates_windows_ahead(self):
+        self.convert()
+        now = datetime.now(dt_timezone.utc)
+        partitions.ensure_partitions(ahead=3, now=now)
+        names = {name for name, _, _ in partitions.list_partitions()}
+        for days in range(4):
+            start = partitions.window_start(now + timedelta(days=days), 'daily')
+            self.assertIn(partitions.partition_name(start, 'daily'), names)
+        self.assertEqual(partitions.ensure_partitions(ahead=3, now=now), [])
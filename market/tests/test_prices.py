@@ -0,0 +1,99 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from market import history, prices
+from market.models import MarketState, Stock, TickerChangeSet
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class PriceBatchTests(TestCase):
+    def setUp(self):
+        self.stocks = [Stock.objects.create(symbol=f'PB{i}', name=f'Batch {i}', price=10.0) for i in range(12)]
+        self.stock = self.stocks[0]
+
+    def test_percent_change(self):
+        self.assertEqual(prices.percent_change(10.0, 11.0), 10.0)
+        self.assertEqual(prices.percent_change(8.0, 6.0), -25.0)
+        self.assertEqual(prices.percent_change(0.0, 6.0), 0.0)
+        self.assertEqual(prices.percent_change(None, 6.0), 0.0)
+
+    def test_changes_to_one_stock_collapse(self):
+        with prices.batch('test', now=NOW) as batch:
+            prices.set_price(self.stock, 11.0)
+            prices.set_price(self.stock, 12.0)
+            self.assertEqual(self.stock.price, 12.0)
+            self.assertEqual(Stock.objects.get(id=self.stock.id).price, 10.0)
+
+        self.assertEqual(batch.changes, [prices.PriceChange(self.stock.id, 'PB0', 10.0, 12.0, NOW, 'test')])
+        stored = Stock.objects.get(id=self.stock.id)
+        self.assertEqual((stored.price, stored.previous_price, stored.change), (12.0, 10.0, 20.0))
+        self.assertEqual(history.read(stored), [(NOW, 12.0)])
+
+    def test_one_version_bump_and_change_set_per_batch(self):
+        before = MarketState.current_version()
+        with prices.batch('test', now=NOW):
+            for stock in self.stocks[:3]:
+                prices.set_price(stock, 9.0)
+        version = MarketState.current_version()
+        self.assertEqual(version, before + 1)
+        change_set = TickerChangeSet.objects.get(version=version)
+        self.assertEqual(change_set.symbols, [[1, 'PB0'], [1, 'PB1'], [1, 'PB2']])
+
+    def test_nested_batches_join_the_outer_one(self):
+        before = MarketState.current_version()
+        with prices.batch('outer', now=NOW) as outer:
+            with prices.batch('inner') as inner:
+                self.assertIs(inner, outer)
+                prices.set_price(self.stock, 11.0)
+            prices.set_price(self.stocks[1], 12.0)
+            self.assertEqual(MarketState.current_version(), before)
+        self.assertEqual({c.source for c in outer.changes}, {'outer'})
+        self.assertEqual(len(outer.changes), 2)
+        self.assertIsNone(prices.current_batch())
+
+    def test_nothing_is_written_when_the_block_raises(self):
+        with self.assertRaises(RuntimeError):
+            with prices.batch('test', now=NOW):
+                prices.set_price(self.stock, 11.0)
+                raise RuntimeError("boom")
+        self.assertEqual(Stock.objects.get(id=self.stock.id).price, 10.0)
+        self.assertEqual(history.count(self.stock), 0)
+        self.assertIsNone(prices.current_batch())
+
+    def test_empty_batch_writes_nothing(self):
+        before = MarketState.current_version()
+        with CaptureQueriesContext(connection) as queries:
+            with prices.batch('test'):
+                pass
+        self.assertFalse([q for q in queries if 'SAVEPOINT' not in q['sql']])
+        self.assertEqual(MarketState.current_version(), before)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        def run(stocks, price):
+            with CaptureQueriesContext(connection) as queries:
+                with prices.batch('test', now=NOW):
+                    for stock in stocks:
+                        prices.set_price(stock, price)
+            return len(queries)
+
+        self.assertEqual(run(self.stocks[:2], 11.0), run(self.stocks, 12.0))
+
+    def test_price_changed_is_sent_after_commit(self):
+        received = []
+
+        def listener(sender, changes, version, **kwargs):
+            received.append(([c.symbol for c in changes], version))
+
+        prices.price_changed.connect(listener)
+        self.addCleanup(prices.price_changed.disconnect, listener)
+        with self.captureOnCommitCallbacks(execute=True):
+            with prices.batch('test', now=NOW):
+                prices.set_price(self.stock, 11.0)
+                prices.set_price(self.stocks[1], 11.0)
+            self.assertEqual(received, [])
+        self.assertEqual(received, [(['PB0', 'PB1'], MarketState.current_version())])
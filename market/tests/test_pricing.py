@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+
+import numpy as np
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from market import pricing
+
+
+def universe(count=4, price=10.0, volatility=0.1, sectors=None):
+    return pricing.Universe(
+        range(1, count + 1), [price] * count, [-volatility] * count, [volatility] * count,
+        sectors or ['general'] * count,
+    )
+
+
+class UniformModelTests(SimpleTestCase):
+    def test_returns_stay_in_each_stocks_range(self):
+        returns = pricing.UniformModel().returns_many(universe(volatility=0.05), 500, np.random.default_rng(1))
+        self.assertEqual(returns.shape, (500, 4))
+        self.assertTrue((np.abs(returns) <= 0.05).all())
+
+    def test_simulate_matches_stepping_one_tick_at_a_time(self):
+        model = pricing.UniformModel()
+        path = model.simulate(universe(), 20, np.random.default_rng(7))
+
+        stepped = universe()
+        rng = np.random.default_rng(7)
+        for step in range(20):
+            stepped.prices = model.next_prices(stepped, rng)
+            np.testing.assert_allclose(path[step], stepped.prices)
+
+    def test_simulate_is_deterministic_for_a_seed(self):
+        model = pricing.UniformModel()
+        first = model.simulate(universe(), 10, np.random.default_rng(3))
+        np.testing.assert_array_equal(first, model.simulate(universe(), 10, np.random.default_rng(3)))
+
+    def test_inactive_stocks_hold_their_price(self):
+        active = np.ones((5, 4), dtype=bool)
+        active[:, 1] = False
+        active[2:, 3] = False
+        path = pricing.UniformModel().simulate(universe(), 5, np.random.default_rng(2), active=active)
+        self.assertTrue((path[:, 1] == 10.0).all())
+        self.assertTrue((path[2:, 3] == path[1, 3]).all())
+
+    def test_prices_never_fall_below_the_floor(self):
+        path = pricing.UniformModel().simulate(universe(price=0.1, volatility=0.9), 50, np.random.default_rng(4))
+        self.assertGreaterEqual(path.min(), pricing.MIN_PRICE)
+
+
+class FactorModelTests(SimpleTestCase):
+    def test_stocks_in_a_sector_move_together(self):
+        sectors = ['tech'] * 2 + ['energy'] * 2
+        returns = pricing.FactorModel(factor_weight=0.6, sector_correlation=0.3).returns_many(
+            universe(sectors=sectors), 40000, np.random.default_rng(5),
+        )
+        correlation = np.corrcoef(returns.T)
+        self.assertAlmostEqual(correlation[0, 1], 0.6, delta=0.03)
+        self.assertAlmostEqual(correlation[0, 2], 0.18, delta=0.03)
+
+    def test_volatility_matches_the_uniform_range(self):
+        returns = pricing.FactorModel().returns_many(universe(volatility=0.1), 40000, np.random.default_rng(6))
+        np.testing.assert_allclose(returns.std(axis=0), 0.2 / np.sqrt(12.0), rtol=0.03)
+
+    def test_shards_share_the_common_factor(self):
+        model = pricing.FactorModel(factor_weight=1.0)
+        shard = pricing.Universe([1], [10.0], [-0.1], [0.1], ['tech'], all_sectors=['energy', 'tech'])
+        other = pricing.Universe([2], [10.0], [-0.1], [0.1], ['tech'], all_sectors=['energy', 'tech'])
+        first = model.returns_many(shard, 3, np.random.default_rng(1), np.random.default_rng(99))
+        second = model.returns_many(other, 3, np.random.default_rng(2), np.random.default_rng(99))
+        np.testing.assert_allclose(first, second)
+
+    def test_configured_covariance(self):
+        covariance = {'sectors': ['a', 'b'], 'matrix': [[4.0, 1.0], [1.0, 1.0]]}
+        model = pricing.FactorModel(covariance=covariance)
+        np.testing.assert_array_equal(model.sector_covariance(['b', 'a']), [[1.0, 1.0], [1.0, 4.0]])
+        with self.assertRaises(ImproperlyConfigured):
+            model.sector_covariance(['a', 'c'])
+
+        singular = pricing.FactorModel(covariance={'sectors': ['a', 'b'], 'matrix': [[1.0, 2.0], [2.0, 1.0]]})
+        with self.assertRaises(ImproperlyConfigured):
+            singular.returns(universe(sectors=['a', 'b', 'a', 'b']), np.random.default_rng())
+
+    def test_factor_weight_must_be_a_fraction(self):
+        with self.assertRaises(ImproperlyConfigured):
+            pricing.FactorModel(factor_weight=1.5)
+
+
+class BuildModelTests(SimpleTestCase):
+    def test_named_models(self):
+        self.assertIsInstance(pricing.build_model('uniform'), pricing.UniformModel)
+        self.assertIsInstance(pricing.build_model('market.pricing.UniformModel'), pricing.UniformModel)
+        with self.assertRaises(ImproperlyConfigured):
+            pricing.build_model('nonsense')
+
+    @override_settings(PRICE_MODEL='factor', PRICE_FACTOR_WEIGHT='0.25', PRICE_SECTOR_COVARIANCE='{"sectors": []}')
+    def test_factor_settings_are_validated(self):
+        with self.assertRaises(ImproperlyConfigured):
+            pricing.build_model()
+
+    @override_settings(PRICE_MODEL='factor', PRICE_FACTOR_WEIGHT='0.25', PRICE_SECTOR_COVARIANCE='')
+    def test_factor_settings(self):
+        model = pricing.build_model()
+        self.assertIsInstance(model, pricing.FactorModel)
+        self.assertEqual(model.factor_weight, 0.25)
+
+    def test_lopsided_volatility_is_made_symmetric(self):
+        stocks = [
+            SimpleNamespace(volatility_min=-0.1, volatility_max=0.1),
+            SimpleNamespace(volatility_min=-0.05, volatility_max=0.2),
+            SimpleNamespace(volatility_min=None, volatility_max=0.1),
+        ]
+        fixed = pricing.ensure_symmetric_volatility(stocks, np.random.default_rng(0))
+        self.assertEqual(fixed, stocks[1:])
+        for stock in stocks:
+            self.assertEqual(stock.volatility_min, -stock.volatility_max)
+            self.assertTrue(0.05 <= stock.volatility_max <= 0.15 or stock is stocks[0])
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from accounts.models import User
+from market import ledger, rankings
+from market.models import Market, RankSnapshot, Stock, Trade
+
+
+NOW = datetime(2026, 10, 19, 12, 40, tzinfo=dt_timezone.utc)
+HOUR = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class RankingTestCase(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol='RANK', name='Ranked', price=10.0)
+        self.rich = User.objects.create_user(email='rich@example.com', first_name='Rich')
+        self.shares = User.objects.create_user(email='shares@example.com')
+        self.tied = User.objects.create_user(email='tied@example.com')
+        self.poor = User.objects.create_user(email='poor@example.com')
+        ledger.post([
+            ledger.cash(self.rich.id, Trade.GRANT, 50.0),
+            ledger.grant_shares(self.shares.id, self.stock.id, 2),
+            ledger.cash(self.tied.id, Trade.GRANT, 20.0),
+            ledger.cash(self.poor.id, Trade.GRANT, -40.0),
+        ])
+        self.other = Market.objects.create(name='Other', slug='other')
+        self.elsewhere = User.objects.create_user(email='elsewhere@example.com', market=self.other)
+
+    def standings(self, market_id=None):
+        return [(user.id, user.rank, user.net_worth) for user in rankings.ranked_users(market_id)]
+
+
+class RankedUsersTests(RankingTestCase):
+    def test_ranks_by_net_worth_with_shared_ties(self):
+        self.assertEqual(self.standings(self.rich.market_id), [
+            (self.rich.id, 1, 150.0),
+            (self.shares.id, 2, 120.0),
+            (self.tied.id, 2, 120.0),
+            (self.poor.id, 4, 60.0),
+        ])
+
+    def test_each_market_is_ranked_separately(self):
+        self.assertEqual(self.standings(self.other.id), [(self.elsewhere.id, 1, 100.0)])
+        ranks = {user_id: rank for user_id, rank, _ in self.standings()}
+        self.assertEqual((ranks[self.rich.id], ranks[self.elsewhere.id]), (1, 1))
+
+    def test_prices_move_the_ranking(self):
+        Stock.objects.filter(id=self.stock.id).update(price=40.0)
+        self.assertEqual(self.standings(self.rich.market_id)[0], (self.shares.id, 1, 180.0))
+
+
+class SnapshotTests(RankingTestCase):
+    def test_one_row_per_user_per_period(self):
+        self.assertEqual(rankings.snapshot(now=NOW), 5)
+        Stock.objects.filter(id=self.stock.id).update(price=40.0)
+        self.assertEqual(rankings.snapshot(now=NOW + timedelta(minutes=10)), 5)
+
+        self.assertEqual(RankSnapshot.objects.count(), 5)
+        row = RankSnapshot.objects.get(user=self.shares)
+        self.assertEqual((row.period_start, row.rank, row.net_worth), (HOUR, 1, 180.0))
+
+    def test_top_and_history_at_past_times(self):
+        rankings.snapshot(now=NOW - timedelta(hours=2))
+        Stock.objects.filter(id=self.stock.id).update(price=40.0)
+        rankings.snapshot(now=NOW)
+
+        self.assertEqual(rankings.top_at(NOW - timedelta(hours=3)), (None, []))
+        period, rows = rankings.top_at(NOW - timedelta(hours=1), limit=2)
+        self.assertEqual(period, HOUR - timedelta(hours=2))
+        self.assertEqual([(row.user_id, row.rank) for row in rows], [(self.rich.id, 1), (self.shares.id, 2)])
+        self.assertEqual(rankings.top_at(NOW, limit=1)[1][0].user, self.shares)
+        self.assertEqual([row.user_id for row in rankings.top_at(NOW, market_id=self.other.id)[1]], [self.elsewhere.id])
+
+        self.assertEqual(rankings.history(self.shares), [(HOUR - timedelta(hours=2), 2, 120.0), (HOUR, 1, 180.0)])
+        self.assertEqual(rankings.history(self.shares, since=HOUR - timedelta(minutes=1)), [(HOUR, 1, 180.0)])
+        self.assertEqual(len(rankings.history(self.shares, until=HOUR - timedelta(minutes=1))), 1)
+
+
+class LeaderboardViewTests(RankingTestCase):
+    def setUp(self):
+        super().setUp()
+        rankings.snapshot(now=NOW)
+        self.client.force_login(self.poor)
+
+    def test_standings(self):
+        data = self.client.get('/api/leaderboard/', {'at': (NOW + timedelta(days=1)).isoformat(), 'limit': 1}).json()
+        self.assertEqual(data, {
+            'period': HOUR.isoformat(),
+            'users': [{'rank': 1, 'user_id': self.rich.id, 'name': 'Rich', 'net_worth': 150.0}],
+        })
+        self.assertIsNone(self.client.get('/api/leaderboard/', {'at': '2020-01-01T00:00:00Z'}).json()['period'])
+
+    def test_history(self):
+        data = self.client.get('/api/leaderboard/history/').json()
+        self.assertEqual(data, {'user_id': self.poor.id, 'history': [{'period': HOUR.isoformat(), 'rank': 4, 'net_worth': 60.0}]})
+
+    def test_only_staff_see_other_users(self):
+        self.assertEqual(self.client.get('/api/leaderboard/history/', {'user_id': self.rich.id}).status_code, 403)
+        self.client.force_login(User.objects.create_user(email='teacher@example.com', is_staff=True))
+        self.assertEqual(self.client.get('/api/leaderboard/history/', {'user_id': self.rich.id}).json()['history'][0]['rank'], 1)
+        self.assertEqual(self.client.get('/api/leaderboard/history/', {'user_id': 99999}).status_code, 404)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/api/leaderboard/', {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get('/api/leaderboard/', {'at': 'tomorrow'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/leaderboard/history/', {'since': 'never'}).status_code, 400)
@@ -0,0 +1,78 @@
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from market.models import Stock
+from market.replicas import PIN_COOKIE, ReplicaRouter, _replica
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_primary_outside_replica_views(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Stock), 'default')
+
+    def test_reads_use_request_replica(self):
+        token = _replica.set('replica')
+        try:
+            self.assertEqual(ReplicaRouter().db_for_read(Stock), 'replica')
+            self.assertEqual(ReplicaRouter().db_for_write(Stock), 'default')
+        finally:
+            _replica.reset(token)
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(ReplicaRouter().allow_migrate('replica', 'market'), False)
+        self.assertIsNone(ReplicaRouter().allow_migrate('default', 'market'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_STICKY_SECONDS=10)
+class ReplicaReadsTests(TransactionTestCase):
+    """Runs against the `replica` test alias, which mirrors the test database."""
+    databases = {'default', 'replica'}
+
+    def get_stocks(self):
+        """GET the stock list and return the number of queries it ran on (default, replica)."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get('/api/stocks/')
+        self.assertEqual(response.status_code, 200)
+        return len(primary), len(replica)
+
+    def test_read_only_view_reads_replica(self):
+        primary, replica = self.get_stocks()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_post_pins_client_to_primary(self):
+        response = self.client.post('/api/buy/', '{}', content_type='application/json')
+        self.assertEqual(int(response.cookies[PIN_COOKIE]['max-age']), 10)
+
+        primary, replica = self.get_stocks()
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_reads_return_to_replica_when_pin_expires(self):
+        self.client.post('/api/buy/', '{}', content_type='application/json')
+        # The test client never expires cookies; drop it as a browser would after max-age.
+        del self.client.cookies[PIN_COOKIE]
+
+        primary, replica = self.get_stocks()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_get_does_not_pin(self):
+        response = self.client.get('/api/stocks/')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICA_STICKY_SECONDS=0)
+    def test_no_pin_without_sticky_seconds(self):
+        response = self.client.post('/api/buy/', '{}', content_type='application/json')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_everything_uses_primary_without_replicas(self):
+        response = self.client.post('/api/buy/', '{}', content_type='application/json')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        primary, replica = self.get_stocks()
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from market import history, scheduling
+from market.models import JobLease, Stock
+
+
+NOW = datetime(2026, 10, 19, 12, 0, 30, tzinfo=dt_timezone.utc)
+
+
+class SequenceTests(SimpleTestCase):
+    def test_sequence_round_trip(self):
+        sequence = scheduling.tick_sequence(NOW)
+        self.assertEqual(scheduling.sequence_time(sequence), datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(scheduling.tick_sequence(NOW + timedelta(seconds=29)), sequence)
+        self.assertEqual(scheduling.tick_sequence(NOW + timedelta(seconds=30)), sequence + 1)
+
+    @override_settings(MARKET_TICK_SECONDS=300)
+    def test_tick_length_is_configurable(self):
+        self.assertEqual(scheduling.sequence_time(scheduling.tick_sequence(NOW)), datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(scheduling.tick_sequence(NOW + timedelta(minutes=5)), scheduling.tick_sequence(NOW) + 1)
+
+    def test_shards_split_every_symbol_once(self):
+        symbols = [f'S{i}' for i in range(200)]
+        shards = [scheduling.shard_of(symbol, 4) for symbol in symbols]
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+        self.assertEqual(shards, [scheduling.shard_of(symbol, 4) for symbol in symbols])
+        self.assertEqual({scheduling.shard_of(symbol, 1) for symbol in symbols}, {0})
+
+    def test_lease_names(self):
+        self.assertEqual(scheduling.tick_lease_name(), 'tick')
+        self.assertEqual(scheduling.tick_lease_name(2, 4), 'tick:2/4')
+
+
+class LeaseTests(TestCase):
+    def take(self, holder, expires_at):
+        JobLease.objects.create(name='job', holder=holder, expires_at=expires_at)
+
+    def test_acquire_and_release(self):
+        self.assertTrue(scheduling.acquire('job', now=NOW))
+        self.assertTrue(scheduling.acquire('job', now=NOW))
+        lease = JobLease.objects.get(name='job')
+        self.assertEqual((lease.holder, lease.expires_at), (scheduling.holder_id(), NOW + timedelta(seconds=300)))
+
+        scheduling.release('job')
+        self.assertEqual(JobLease.objects.get(name='job').holder, '')
+
+    def test_a_live_lease_is_exclusive(self):
+        self.take('elsewhere:1', NOW + timedelta(minutes=1))
+        self.assertFalse(scheduling.acquire('job', now=NOW))
+        scheduling.release('job')
+        self.assertEqual(JobLease.objects.get(name='job').holder, 'elsewhere:1')
+
+    def test_an_expired_lease_is_taken_over(self):
+        self.take('crashed:1', NOW - timedelta(seconds=1))
+        self.assertTrue(scheduling.acquire('job', ttl=60, now=NOW))
+        self.assertEqual(JobLease.objects.get(name='job').expires_at, NOW + timedelta(seconds=60))
+
+    def test_lease_block_releases_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with scheduling.lease('job') as held:
+                self.assertTrue(held)
+                raise RuntimeError("boom")
+        self.assertEqual(JobLease.objects.get(name='job').holder, '')
+
+    def test_only_the_holder_completes(self):
+        self.assertEqual(scheduling.last_sequence('job'), 0)
+        self.take('elsewhere:1', None)
+        scheduling.complete('job', 10)
+        self.assertEqual(scheduling.last_sequence('job'), 0)
+
+        with scheduling.lease('job') as held:
+            self.assertTrue(held)
+            scheduling.complete('job', 11, now=NOW)
+        lease = JobLease.objects.get(name='job')
+        self.assertEqual((lease.last_sequence, lease.last_completed_at), (11, NOW))
+
+
+class UpdateStocksCommandTests(TestCase):
+    def setUp(self):
+        self.stocks = [Stock.objects.create(symbol=f'TK{i}', name=f'Tick {i}', price=10.0) for i in range(8)]
+        patcher = mock.patch.object(scheduling, 'tick_sequence', return_value=scheduling.tick_sequence(NOW))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('update_stocks', '--no-catch-up', *args, stdout=out)
+        return out.getvalue()
+
+    def test_each_tick_runs_once(self):
+        self.assertIn('8 stocks', self.run_command())
+        self.assertEqual(scheduling.last_sequence('tick'), scheduling.tick_sequence())
+        self.assertIn('already ran', self.run_command())
+        self.assertEqual(sum(history.count(stock) for stock in self.stocks), 8)
+
+    def test_skips_while_another_runner_holds_the_lease(self):
+        JobLease.objects.create(name='tick', holder='elsewhere:1', expires_at=NOW + timedelta(days=3650))
+        self.assertIn('skipping', self.run_command())
+        self.assertEqual(sum(history.count(stock) for stock in self.stocks), 0)
+
+    def test_shards_tick_disjoint_stocks(self):
+        self.run_command('--shard', '0', '--shards', '2')
+        first = {stock.id for stock in self.stocks if history.count(stock)}
+        self.run_command('--shard', '1', '--shards', '2')
+        both = {stock.id for stock in self.stocks if history.count(stock)}
+
+        self.assertEqual(first, {stock.id for stock in self.stocks if scheduling.shard_of(stock.symbol, 2) == 0})
+        self.assertEqual(both, {stock.id for stock in self.stocks})
+        self.assertEqual(scheduling.last_sequence('tick:1/2'), scheduling.tick_sequence())
+
+    def test_invalid_shard(self):
+        with self.assertRaises(CommandError):
+            self.run_command('--shard', '2', '--shards', '2')
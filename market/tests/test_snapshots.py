@@ -0,0 +1,113 @@
+from datetime import datetime, timezone as dt_timezone
+import io
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from accounts.models import User
+from market import history, ledger, snapshots
+from market.models import (
+    Holding, Market, MarketState, Order, PriceAlert, Stock, StockActivityCounter, StockPriceHistory, Trade,
+)
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='snap@example.com', password='secret')
+        self.stock = Stock.objects.create(symbol='SNAP', name='Snapshot', price=12.5, sector='tech')
+        self.other = Stock.objects.create(symbol='SHOT', name='Shot', price=3.0)
+        ledger.post([ledger.buy(self.user.id, self.stock.id, 3, 12.5), ledger.grant_shares(self.user.id, self.other.id, 2)])
+        Order.objects.create(
+            user=self.user, stock=self.stock, side=Order.SELL, kind=Order.TAKE_PROFIT, trigger_price=20.0, amount=1,
+        )
+        PriceAlert.objects.create(user=self.user, stock=self.other, direction=PriceAlert.BELOW, threshold=2.0)
+        history.record_many([(self.stock.id, NOW, 12.0), (self.other.id, NOW, 3.0)])
+
+    def state(self):
+        return {
+            label: list(model.objects.order_by('pk').values_list())
+            for label, model in snapshots.TABLES + snapshots.HISTORY_TABLES
+        }
+
+    def dump(self, **kwargs):
+        out = io.BytesIO()
+        counts = snapshots.dump(out, **kwargs)
+        out.seek(0)
+        return out, counts
+
+    def restore(self, source):
+        if connection.vendor == 'postgresql':
+            # Check the rows inserted by setUp now, as committed rows would
+            # have been; PostgreSQL will not truncate with deferred checks pending.
+            with connection.cursor() as cursor:
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        return snapshots.restore(source)
+
+    def scribble(self):
+        Stock.objects.filter(id=self.stock.id).update(price=99.0)
+        User.objects.filter(id=self.user.id).update(balance=0.0)
+        ledger.post([ledger.sell(Holding.objects.get(user=self.user, stock=self.other), 2, 3.0)])
+        Stock.objects.create(symbol='NEW', name='After the snapshot')
+        User.objects.create_user(email='late@example.com')
+
+    def test_round_trip(self):
+        before = self.state()
+        with mock.patch.object(snapshots, 'BATCH_SIZE', 2):
+            archive, counts = self.dump(include_history=True)
+        self.assertEqual(counts['trades'], Trade.objects.count())
+        self.assertEqual(counts['history'], StockPriceHistory.objects.count())
+
+        self.scribble()
+        version = MarketState.current_version()
+        header, restored = self.restore(archive)
+
+        self.assertTrue(header['history'])
+        self.assertEqual(restored, counts)
+        self.assertEqual(self.state(), before)
+        self.assertTrue(User.objects.get(email='snap@example.com').check_password('secret'))
+        self.assertGreater(MarketState.current_version(), version)
+
+        # Restored ids do not collide with new rows.
+        self.assertGreater(Stock.objects.create(symbol='NEXT', name='Next').id, self.other.id)
+
+    def test_restore_without_history_empties_it(self):
+        archive, counts = self.dump()
+        self.assertNotIn('history', counts)
+        self.restore(archive)
+        self.assertEqual(history.count(self.stock), 0)
+        self.assertEqual(Stock.objects.get(id=self.stock.id).price, 12.5)
+
+    def test_derived_tables_are_emptied(self):
+        archive, _ = self.dump()
+        self.assertTrue(StockActivityCounter.objects.exists())
+        self.restore(archive)
+        self.assertFalse(StockActivityCounter.objects.exists())
+
+    def test_markets_are_restored(self):
+        Market.objects.create(name='Second', slug='second', tick_every=5)
+        archive, _ = self.dump()
+        Market.objects.filter(slug='second').delete()
+        self.restore(archive)
+        self.assertEqual(Market.objects.get(slug='second').tick_every, 5)
+
+    def test_bad_archives_are_refused(self):
+        archive, _ = self.dump()
+        data = archive.getvalue()
+        for broken in (b'NOTASNAP' + data[8:], data[:8] + bytes([9]) + data[9:], data[:len(data) // 2]):
+            with self.assertRaises(snapshots.SnapshotError):
+                self.restore(io.BytesIO(broken))
+        self.assertEqual(Stock.objects.get(id=self.stock.id).price, 12.5)
+
+    def test_schema_mismatch_is_refused(self):
+        archive = io.BytesIO()
+        archive.write(snapshots.MAGIC + bytes([snapshots.FORMAT_VERSION]))
+        snapshots._write_json(archive, snapshots.FRAME_HEADER, {'created_at': NOW.isoformat(), 'schema': {}})
+        snapshots._write_json(archive, snapshots.FRAME_SECTION, {'table': 'stocks', 'columns': ['id', 'symbol']})
+        snapshots._write_frame(archive, snapshots.FRAME_END, b'')
+        archive.seek(0)
+        with self.assertRaises(snapshots.SnapshotError):
+            self.restore(archive)
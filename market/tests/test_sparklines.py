@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from market import history, prices, sparklines
+from market.models import Stock
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class EncodingTests(SimpleTestCase):
+    def test_downsample_keeps_the_ends(self):
+        values = list(range(100))
+        self.assertEqual(sparklines.downsample(values, 5), [0, 25, 50, 74, 99])
+        self.assertEqual(sparklines.downsample(values[:3], 5), [0, 1, 2])
+
+    def test_round_trip_in_cents(self):
+        values = [10.0, 10.25, 9.99, 12.004, 0.1]
+        encoded = sparklines.encode(values)
+        self.assertEqual(encoded, [1000, 25, -26, 201, -1190])
+        self.assertEqual(sparklines.decode(encoded), [10.0, 10.25, 9.99, 12.0, 0.1])
+        self.assertEqual(sparklines.encode([]), [])
+
+
+class SparklineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.stock = Stock.objects.create(symbol='SPRK', name='Sparkline', price=10.0)
+        self.quiet = Stock.objects.create(symbol='QUIT', name='Quiet', price=10.0)
+        self.points = [(self.stock.id, NOW + timedelta(minutes=i), 10.0 + i / 100) for i in range(sparklines.SPAN + 10)]
+        history.record_many(self.points)
+
+    def symbols(self):
+        return {self.stock.id: 'SPRK', self.quiet.id: 'QUIT'}
+
+    def test_covers_the_latest_span(self):
+        _, lines = sparklines.sparklines(self.symbols(), points=5)
+        line = sparklines.decode(lines['SPRK'])
+        recent = [price for _, _, price in self.points[-sparklines.SPAN:]]
+        self.assertEqual(line, [round(p, 2) for p in sparklines.downsample(recent, 5)])
+        self.assertEqual(line[-1], 12.49)
+        self.assertEqual(lines['QUIT'], [])
+
+    def test_cached_until_the_market_moves(self):
+        version, first = sparklines.sparklines(self.symbols())
+        with self.assertNumQueries(1):
+            self.assertEqual(sparklines.sparklines(self.symbols()), (version, first))
+
+        with prices.batch('test', now=NOW + timedelta(days=1)):
+            prices.set_price(self.quiet, 11.0)
+        version_after, lines = sparklines.sparklines(self.symbols())
+        self.assertEqual(version_after, version + 1)
+        self.assertEqual(sparklines.decode(lines['QUIT']), [11.0])
+
+
+class SparklineViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.stock = Stock.objects.create(symbol='SPRK', name='Sparkline', price=10.0)
+        history.record_many([(self.stock.id, NOW + timedelta(minutes=i), 10.0 + i) for i in range(3)])
+
+    def test_response(self):
+        data = self.client.get('/api/sparklines/', {'symbols': 'sprk', 'points': 2}).json()
+        self.assertEqual((data['points'], data['sparklines']), (2, {'SPRK': [1000, 200]}))
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/api/sparklines/', {'points': 1}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sparklines/', {'points': 'many'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sparklines/', {'symbols': 'SPRK,NOPE'}).status_code, 404)
@@ -0,0 +1,97 @@
+from django.test import TestCase, override_settings
+
+from market import prices, ticker
+from market.models import DEFAULT_MARKET_ID, Market, MarketState, Stock, TickerChangeSet
+
+
+class ChangesSinceTests(TestCase):
+    def setUp(self):
+        self.other = Market.objects.create(name='Other', slug='other')
+        self.start = self.publish()
+
+    def publish(self, stocks=(), removed=()):
+        version = MarketState.bump_version()
+        ticker.record(version, stocks, removed)
+        return version
+
+    def test_collects_the_changes_of_one_market(self):
+        self.publish([(DEFAULT_MARKET_ID, 'AAA'), (self.other.id, 'BBB')])
+        version = self.publish([(DEFAULT_MARKET_ID, 'CCC')], removed=[(self.other.id, 'DDD')])
+        self.assertEqual(ticker.changes_since(self.start, version, DEFAULT_MARKET_ID), ({'AAA', 'CCC'}, set()))
+        self.assertEqual(ticker.changes_since(self.start, version, self.other.id), ({'BBB'}, {'DDD'}))
+        self.assertEqual(ticker.changes_since(version - 1, version, DEFAULT_MARKET_ID), ({'CCC'}, set()))
+
+    def test_last_change_wins(self):
+        self.publish(removed=[(DEFAULT_MARKET_ID, 'AAA')])
+        version = self.publish([(DEFAULT_MARKET_ID, 'AAA')])
+        self.assertEqual(ticker.changes_since(self.start, version, DEFAULT_MARKET_ID), ({'AAA'}, set()))
+        version = self.publish(removed=[(DEFAULT_MARKET_ID, 'AAA')])
+        self.assertEqual(ticker.changes_since(self.start, version, DEFAULT_MARKET_ID), (set(), {'AAA'}))
+
+    @override_settings(MARKET_TICKER_HISTORY=3)
+    def test_clients_too_far_behind_get_nothing(self):
+        for _ in range(4):
+            version = self.publish([(DEFAULT_MARKET_ID, 'AAA')])
+        self.assertEqual(TickerChangeSet.objects.filter(version__gt=self.start).count(), 3)
+        self.assertIsNone(ticker.changes_since(version - 4, version, DEFAULT_MARKET_ID))
+        self.assertIsNotNone(ticker.changes_since(version - 3, version, DEFAULT_MARKET_ID))
+
+    def test_gaps_and_bad_versions_get_nothing(self):
+        version = self.publish([(DEFAULT_MARKET_ID, 'AAA')])
+        self.assertIsNone(ticker.changes_since(0, version, DEFAULT_MARKET_ID))
+        self.assertIsNone(ticker.changes_since(version + 1, version, DEFAULT_MARKET_ID))
+
+        # A bump without a change set, like a snapshot restore.
+        gap = MarketState.bump_version()
+        version = self.publish([(DEFAULT_MARKET_ID, 'BBB')])
+        self.assertIsNone(ticker.changes_since(gap - 1, version, DEFAULT_MARKET_ID))
+        self.assertEqual(ticker.changes_since(gap, version, DEFAULT_MARKET_ID), ({'BBB'}, set()))
+
+
+class TickerViewTests(TestCase):
+    url = '/api/ticker/'
+
+    def setUp(self):
+        self.stocks = [Stock.objects.create(symbol=f'TI{i}', name=f'Ticker {i}', price=10.0) for i in range(3)]
+
+    def poll(self, since):
+        return self.client.get(self.url, {'since': since}).json()
+
+    def test_full_then_deltas(self):
+        self.assertEqual(len(self.client.get(self.url).json()), 3)
+        first = self.poll(0)
+        self.assertTrue(first['full'])
+        self.assertEqual([item['symbol'] for item in first['items']], ['TI0', 'TI1', 'TI2'])
+
+        self.assertEqual(self.poll(first['version']), {'version': first['version'], 'full': False, 'items': [], 'removed': []})
+
+        with prices.batch('test'):
+            prices.set_price(self.stocks[1], 12.0)
+        delta = self.poll(first['version'])
+        self.assertFalse(delta['full'])
+        self.assertEqual([(item['symbol'], item['price'], item['direction']) for item in delta['items']], [('TI1', 12.0, 1)])
+
+        self.stocks[2].delete()
+        Stock.objects.create(symbol='NEW', name='Newcomer', price=5.0)
+        later = self.poll(delta['version'])
+        self.assertEqual(([item['symbol'] for item in later['items']], later['removed']), (['NEW'], ['TI2']))
+
+    def test_other_markets_are_not_in_the_delta(self):
+        version = self.poll(0)['version']
+        other = Market.objects.create(name='Other', slug='other')
+        Stock.objects.create(market=other, symbol='FAR', name='Far away')
+        self.assertEqual(self.poll(version)['items'], [])
+        self.assertEqual([item['symbol'] for item in self.client.get(self.url, {'since': version, 'market': 'other'}).json()['items']], ['FAR'])
+
+    @override_settings(MARKET_TICKER_HISTORY=2)
+    def test_falling_behind_gets_a_full_snapshot(self):
+        version = self.poll(0)['version']
+        for stock in self.stocks:
+            with prices.batch('test'):
+                prices.set_price(stock, 11.0)
+        response = self.poll(version)
+        self.assertTrue(response['full'])
+        self.assertEqual(len(response['items']), 3)
+
+    def test_invalid_since(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
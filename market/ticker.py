@@ -0,0 +1,73 @@
+"""
+File: ticker.py
+Author: Reagan Zierke <reaganzierke@gmail.com>
+Date: 2026-10-19
+Description: Ring of recent per-version change sets behind the delta ticker protocol.
+
+Every market version bump made by the price pipeline (or by a stock being
+added or deleted) records which stocks it touched, as [market id, symbol]
+pairs, in a TickerChangeSet slot in the same transaction as the bump. The
+version is shared by every market; a ticker client of one market that last
+saw version v only needs that market's stocks named in the change sets
+after v. The ring holds
+the last MARKET_TICKER_HISTORY versions; a client further behind, or a gap
+left by a version bump without a change set (a snapshot restore), gets a full
+snapshot instead.
+"""
+
+
+from django.conf import settings
+
+from market.models import TickerChangeSet
+
+
+def ring_size():
+    """Return the number of versions the change set ring holds."""
+    return max(1, int(getattr(settings, 'MARKET_TICKER_HISTORY', 120)))
+
+
+def _pairs(stocks):
+    return [list(pair) for pair in sorted(set(stocks))]
+
+
+def record(version, stocks=(), removed=()):
+    """Store the (market id, symbol) pairs changed and removed at `version`, overwriting its ring slot."""
+    TickerChangeSet.objects.bulk_create(
+        [TickerChangeSet(
+            slot=version % ring_size(),
+            version=version,
+            symbols=_pairs(stocks),
+            removed=_pairs(removed),
+        )],
+        update_conflicts=True,
+        unique_fields=['slot'],
+        update_fields=['version', 'symbols', 'removed'],
+    )
+
+
+def changes_since(since, version, market_id):
+    """Return (changed symbols, removed symbols) of market `market_id` between versions `since` and `version`.
+
+    Returns None when the ring no longer holds every version in between,
+    meaning the client needs a full snapshot. A symbol removed and then
+    re-added counts as changed, not removed.
+    """
+    if since <= 0 or since > version or version - since > ring_size():
+        return None
+    rows = list(
+        TickerChangeSet.objects.filter(version__gt=since, version__lte=version)
+        .order_by('version')
+        .values_list('symbols', 'removed')
+    )
+    if len(rows) != version - since:
+        return None
+
+    changed, removed = set(), set()
+    for stocks, gone_stocks in rows:
+        symbols = {symbol for market, symbol in stocks if market == market_id}
+        gone = {symbol for market, symbol in gone_stocks if market == market_id}
+        changed.update(symbols)
+        changed.difference_update(gone)
+        removed.difference_update(symbols)
+        removed.update(gone)
+    return changed, removed
@@ -7,76 +7,217 @@ Description: Views for the market app
 
 
 from django.shortcuts import render
-from django.http import JsonResponse, Http404
+from django.http import HttpResponse, JsonResponse, Http404, StreamingHttpResponse
 from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
-from market.models import Stock, Holding, MarketEvent, MarketEventApplication, StockPriceHistory
+from market.models import Stock, StockActivity, Holding, MarketEvent, MarketEventApplication, MarketState, PortfolioAnalytics, PriceAlert, Order, Trade
+from market import alerts
+from market import grants
+from market import ledger
+from market import loans
+from market import activity
+from market import listing
+from market import markets
+from market import rankings
+from market import events as market_events
+from market import prices
+from market.orders import fires_on_rise
+from market import history as price_history
+from market import exports
+from market import indicators
+from market import sparklines as market_sparklines
+from market import ticker
+from market.replicas import replica_reads
 from django.utils.html import escape
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.db import transaction
 from django.db.models import Sum, F, FloatField, Value
 from django.db.models.functions import Coalesce
 from accounts.models import User
+import hashlib
 import json
 import random
 
 
 @require_GET
+@replica_reads
 def ticker_data(request):
-	"""Return JSON array of stocks with symbol, price and direction.
+	"""Return the ticker: symbol, price, direction and trade activity of every stock.
 
 	direction: 1 = up, -1 = down, 0 = unchanged / unknown
+
+	Without parameters the response is a JSON array of every stock. With
+	`?since=<version>` (the `version` of the client's previous response) it is
+	{'version', 'full', 'items', 'removed'}: when the server still holds the
+	change sets since that version, `items` are only the stocks whose price
+	changed since then and `removed` the symbols deleted since; otherwise
+	`full` is true and `items` is every stock. Pass since=0 to start.
+
+	Stocks are those of the request's market (see market.markets.for_request).
 	"""
-	data = []
-	for stock in Stock.objects.all():
-		direction = 0
-		try:
-			history = list(stock.history.order_by('-timestamp')[:2])
-			if len(history) >= 2:
-				latest = history[0].price
-				prev = history[1].price
-				if latest > prev:
-					direction = 1
-				elif latest < prev:
-					direction = -1
-		except Exception:
-			pass
+	market_id = markets.for_request(request)
+	since = request.GET.get('since')
+	if since is None:
+		return JsonResponse(_ticker_items(market_id), safe=False)
+	try:
+		since = int(since)
+	except ValueError:
+		return JsonResponse({'error': 'Invalid since version'}, status=400)
+
+	version = MarketState.current_version()
+	delta = ticker.changes_since(since, version, market_id) if since != version else (set(), set())
+	if delta is None:
+		return JsonResponse({
+			'version': version,
+			'full': True,
+			'items': _ticker_items(market_id),
+			'removed': [],
+		})
+
+	changed, removed = delta
+	items = _ticker_items(market_id, changed) if changed else []
+	return JsonResponse({'version': version, 'full': False, 'items': items, 'removed': sorted(removed)})
+
+
+def _ticker_items(market_id, symbols=None):
+	"""Ticker entries of every stock of a market, or just `symbols`, with one activity query for all of them."""
+	listed = Stock.objects.filter(market_id=market_id)
+	if symbols is not None:
+		listed = listed.filter(symbol__in=symbols)
+	stocks = list(listed.order_by('id'))
+	volume = activity.stats_by_stock([stock.id for stock in stocks])
 
+	data = []
+	for stock in stocks:
 		data.append({
 			'symbol': stock.symbol,
 			'price': round(stock.price, 2),
-			'direction': direction,
+			'direction': _stock_direction(stock),
+			**_activity_json(volume.get(stock.id)),
+			**_range_json(stock, volume.get(stock.id)),
 		})
+	return data
+
+
+def _direction(prices):
+	"""Return 1, -1 or 0 comparing the last two prices of an oldest-first list."""
+	if not prices or len(prices) < 2:
+		return 0
+	latest, prev = prices[-1], prices[-2]
+	if latest > prev:
+		return 1
+	if latest < prev:
+		return -1
+	return 0
 
-	return JsonResponse(data, safe=False)
+
+def _stock_direction(stock):
+	"""Direction of a stock's last price change, as recorded by the price pipeline."""
+	if stock.previous_price is None:
+		return 0
+	return _direction([stock.previous_price, stock.price])
+
+
+def _range_json(stock, stats):
+	"""A stock's 24h open, high, low and change, counting its current price.
+
+	The rolled-up range lags the latest tick, so the current price widens
+	it; a stock without price buckets yet reports its current price.
+	"""
+	stats = stats or {}
+	price = stock.price
+	open_24h = stats.get('open_24h') or price
+	high_24h = max(stats.get('high_24h') or price, price)
+	low_24h = min(stats.get('low_24h') or price, price)
+	return {
+		'open_24h': round(open_24h, 2),
+		'high_24h': round(high_24h, 2),
+		'low_24h': round(low_24h, 2),
+		'change_24h': round(prices.percent_change(open_24h, price), 2),
+	}
+
+
+def _activity_json(stats):
+	"""Rolling trade counts and share volume of a stock, zero when it has not traded."""
+	stats = stats or {}
+	return {
+		'trades_1h': stats.get('trades_1h', 0),
+		'volume_1h': stats.get('volume_1h', 0),
+		'trades_24h': stats.get('trades_24h', 0),
+		'volume_24h': stats.get('volume_24h', 0),
+	}
 
 
 @require_GET
+@replica_reads
 def stocks_list(request):
-	"""Return a list of all stocks with name, symbol and current price."""
+	"""Return one page of stocks with name, symbol, current price, last change and trade activity.
+
+	Query params:
+	- q: symbol or name prefix to search for (optional)
+	- sort: symbol, price, change or volume, prefixed with - for descending (default: symbol)
+	- limit: page size, 1-200 (default: 50)
+	- cursor: the `next` value of the previous page
+	- market: market slug, for staff and anonymous visitors (default: the user's market)
+
+	Returns {'results': [...], 'next': cursor or null}. Pages are keyset
+	paginated, so following `next` stays cheap however deep the list goes.
+	"""
+	sort = request.GET.get('sort', 'symbol')
+	if sort not in listing.SORTS:
+		return JsonResponse({'error': f"Invalid sort. Use {', '.join(listing.SORTS)}"}, status=400)
+	try:
+		limit = int(request.GET.get('limit', listing.DEFAULT_LIMIT))
+	except ValueError:
+		return JsonResponse({'error': 'Invalid limit'}, status=400)
+	if limit < 1 or limit > listing.MAX_LIMIT:
+		return JsonResponse({'error': f'Limit must be between 1 and {listing.MAX_LIMIT}'}, status=400)
+
+	try:
+		stocks, next_cursor = listing.page(
+			query=request.GET.get('q', ''), sort=sort, cursor=request.GET.get('cursor'), limit=limit,
+			market_id=markets.for_request(request),
+		)
+	except listing.InvalidCursor as e:
+		return JsonResponse({'error': str(e)}, status=400)
+
+	volume = activity.stats_by_stock([stock.id for stock in stocks])
 	data = []
-	for stock in Stock.objects.all().order_by('symbol'):
+	for stock in stocks:
 		data.append({
 			'name': stock.name,
 			'symbol': stock.symbol,
 			'price': round(stock.price, 2),
+			'change': round(stock.change, 2),
+			'direction': _stock_direction(stock),
+			**_activity_json(volume.get(stock.id)),
+			**_range_json(stock, volume.get(stock.id)),
 		})
-	return JsonResponse(data, safe=False)
+	return JsonResponse({'results': data, 'next': next_cursor})
 
 
 @require_GET
+@replica_reads
 def stock_detail(request, symbol):
-	"""Return details for a single stock by symbol."""
+	"""Return details for a single stock by symbol, with its 24h range and activity."""
 	try:
-		stock = Stock.objects.get(symbol=symbol)
+		stock = Stock.objects.select_related('activity').get(market_id=markets.for_request(request), symbol=symbol)
 	except Stock.DoesNotExist:
 		raise Http404("Stock not found")
+	try:
+		stats = {field: getattr(stock.activity, field) for field in activity.STATS_FIELDS}
+	except StockActivity.DoesNotExist:
+		stats = None
 
 	latest_timestamp = None
 	try:
-		latest = stock.history.order_by('-timestamp').first()
+		latest = price_history.latest_timestamp(stock)
 		if latest:
-			latest_timestamp = latest.timestamp.isoformat()
+			latest_timestamp = latest.isoformat()
 	except Exception:
 		latest_timestamp = None
 
@@ -85,6 +226,8 @@ def stock_detail(request, symbol):
 		'symbol': stock.symbol,
 		'price': round(stock.price, 2),
 		'latest_timestamp': latest_timestamp,
+		**_activity_json(stats),
+		**_range_json(stock, stats),
 	}
 
 	return JsonResponse(data)
@@ -101,25 +244,14 @@ def portfolio(request):
 	"""Render the user's portfolio page with holdings and totals."""
 	user = request.user
 
-	holdings_qs = Holding.objects.filter(user=user).select_related('stock')
+	holdings_qs = list(Holding.objects.filter(user=user).select_related('stock'))
 	holdings = []
 	stocks_total = 0.0
 	for h in holdings_qs:
 		price = float(h.stock.price)
 		shares = int(h.shares)
 		total = round(price * shares, 2)
-		direction = 0
-		try:
-			history = list(h.stock.history.order_by('-timestamp')[:2])
-			if len(history) >= 2:
-				latest = history[0].price
-				prev = history[1].price
-				if latest > prev:
-					direction = 1
-				elif latest < prev:
-					direction = -1
-		except Exception:
-			pass
+		direction = _stock_direction(h.stock)
 
 		holdings.append({
 			'name': h.stock.name,
@@ -128,23 +260,48 @@ def portfolio(request):
 			'shares': shares,
 			'total': total,
 			'direction': direction,
+			'cost_basis': round(h.cost_basis, 2),
+			'unrealized_pnl': round(price * shares - h.cost_basis, 2),
 		})
 		stocks_total += total
 
 	balance = float(user.balance or 0.0)
 	portfolio_worth = round(balance + stocks_total, 2)
 
+	analytics = PortfolioAnalytics.objects.filter(user=user).first()
+	performance = None
+	if analytics:
+		performance = {
+			'computed_at': analytics.computed_at,
+			'lookback_days': analytics.lookback_days,
+			'time_weighted_return': _percent(analytics.time_weighted_return),
+			'volatility': _percent(analytics.volatility),
+			'max_drawdown': _percent(analytics.max_drawdown),
+			'sharpe_ratio': None if analytics.sharpe_ratio is None else round(analytics.sharpe_ratio, 2),
+			'positions': analytics.positions,
+			'largest_position_weight': _percent(analytics.largest_position_weight),
+			'net_worth': analytics.net_worth,
+		}
+
 	context = {
 		'user_obj': user,
 		'balance': round(balance, 2),
 		'holdings': holdings,
 		'stocks_total': round(stocks_total, 2),
 		'portfolio_worth': portfolio_worth,
+		'realized_pnl': round(float(user.realized_pnl or 0.0), 2),
+		'unrealized_pnl': round(sum(h['unrealized_pnl'] for h in holdings), 2),
+		'performance': performance,
 	}
 
 	return render(request, 'market/portfolio.html', context)
 
 
+def _percent(value):
+	"""Format a fraction as a percentage rounded to 2 places, passing None through."""
+	return None if value is None else round(value * 100, 2)
+
+
 @login_required
 @require_POST
 def buy_stock(request):
@@ -169,33 +326,27 @@ def buy_stock(request):
 		return JsonResponse({'error': 'Amount must be at least 1'}, status=400)
 
 	try:
-		stock = Stock.objects.get(symbol=symbol)
+		stock = Stock.objects.get(market_id=request.user.market_id, symbol=symbol)
 	except Stock.DoesNotExist:
 		return JsonResponse({'error': 'Stock not found'}, status=404)
 
-	cost = stock.price * amount
-
 	user = request.user
 
-	with transaction.atomic():
-		user.refresh_from_db()
-		if user.balance < cost:
-			return JsonResponse({'error': 'Insufficient funds', 'balance': user.balance}, status=400)
-
-		user.balance = user.balance - cost
-		user.save()
+	try:
+		ledger.post([ledger.buy(user.id, stock.id, amount, stock.price)], require_funds=True)
+	except ledger.InsufficientFunds:
+		user.refresh_from_db(fields=['balance'])
+		return JsonResponse({'error': 'Insufficient funds', 'balance': user.balance}, status=400)
 
-		holding, created = Holding.objects.get_or_create(user=user, stock=stock, defaults={'shares': amount})
-		if not created:
-			holding.shares = holding.shares + amount
-			holding.save()
+	user.refresh_from_db(fields=['balance', 'realized_pnl'])
+	shares = Holding.objects.filter(user=user, stock=stock).aggregate(total=Coalesce(Sum('shares'), 0))['total']
 
 	return JsonResponse({
 		'success': True,
 		'balance': round(user.balance, 2),
 		'holding': {
 			'symbol': stock.symbol,
-			'shares': holding.shares,
+			'shares': shares,
 		}
 	})
 
@@ -228,34 +379,24 @@ def sell_stock(request):
 		return JsonResponse({'error': 'Amount must be at least 1'}, status=400)
 
 	try:
-		stock = Stock.objects.get(symbol=symbol)
+		stock = Stock.objects.get(market_id=request.user.market_id, symbol=symbol)
 	except Stock.DoesNotExist:
 		return JsonResponse({'error': 'Stock not found'}, status=404)
 
 	user = request.user
 
 	with transaction.atomic():
-		user.refresh_from_db()
-		try:
-			holding = Holding.objects.select_for_update().get(user=user, stock=stock)
-		except Holding.DoesNotExist:
+		holding = Holding.objects.select_for_update().filter(user=user, stock=stock).first()
+		if holding is None:
 			return JsonResponse({'error': 'You do not own this stock'}, status=400)
 
 		if amount > holding.shares:
 			return JsonResponse({'error': 'Cannot sell more shares than owned', 'shares': holding.shares}, status=400)
 
-		proceeds = stock.price * amount
-
-		user.balance = user.balance + proceeds
-		user.save()
-
+		ledger.post([ledger.sell(holding, amount, stock.price)])
 		remaining = holding.shares - amount
-		if remaining <= 0:
-			holding.delete()
-			remaining = 0
-		else:
-			holding.shares = remaining
-			holding.save()
+
+	user.refresh_from_db(fields=['balance', 'realized_pnl'])
 
 	return JsonResponse({
 		'success': True,
@@ -268,40 +409,112 @@ def sell_stock(request):
 
 
 @require_GET
+@replica_reads
 def stock_history(request, symbol):
 	"""Return historical prices for a stock as a list of {timestamp, price}.
 
 	Returns up to 500 most recent entries ordered from oldest->newest.
 	"""
 	try:
-		stock = Stock.objects.get(symbol=symbol)
+		stock = Stock.objects.get(market_id=markets.for_request(request), symbol=symbol)
 	except Stock.DoesNotExist:
 		raise Http404("Stock not found")
 
-	history_qs = stock.history.order_by('-timestamp')[:500]
-	history = list(history_qs)
-	history.reverse()
-
 	data = []
-	for h in history:
+	for timestamp, price in price_history.read(stock, limit=500):
 		data.append({
-			'timestamp': h.timestamp.isoformat(),
-			'price': round(h.price, 2),
+			'timestamp': timestamp.isoformat(),
+			'price': round(price, 2),
 		})
 
 	return JsonResponse(data, safe=False)
 
 
 @require_GET
+@replica_reads
+def sparklines(request):
+	"""Return downsampled recent prices of many stocks in one response, for mini charts.
+
+	Query params:
+	- symbols: comma-separated symbols (default: every stock)
+	- points: prices per sparkline, 2-120 (default: 30)
+	- market: market slug, for staff and anonymous visitors (default: the user's market)
+
+	Returns {'version': int, 'points': int, 'sparklines': {symbol: [...]}}, each
+	sparkline being the first price in cents followed by the change in cents
+	from one price to the next (see market.sparklines).
+	"""
+	try:
+		points = int(request.GET.get('points', market_sparklines.DEFAULT_POINTS))
+	except ValueError:
+		return JsonResponse({'error': 'Invalid points'}, status=400)
+	if points < market_sparklines.MIN_POINTS or points > market_sparklines.MAX_POINTS:
+		return JsonResponse({
+			'error': f'Points must be between {market_sparklines.MIN_POINTS} and {market_sparklines.MAX_POINTS}'
+		}, status=400)
+
+	symbols, missing = exports.resolve_symbols(request.GET.get('symbols', '').split(','), markets.for_request(request))
+	if missing:
+		return JsonResponse({'error': f"Unknown symbols: {', '.join(missing)}"}, status=404)
+
+	version, lines = market_sparklines.sparklines(symbols, points)
+	return JsonResponse({'version': version, 'points': points, 'sparklines': lines})
+
+
+@require_GET
+@replica_reads
+def stock_indicators(request, symbol):
+	"""Return technical indicators computed over a stock's recent price history.
+
+	Query params:
+	- kind: comma-separated list of sma, ema, rsi, bollinger (default: sma)
+	- window: indicator window length, 2-200 (default: 20)
+	- points: number of most recent points to return, 10-2000 (default: 500)
+	"""
+	try:
+		stock = Stock.objects.get(market_id=markets.for_request(request), symbol=symbol)
+	except Stock.DoesNotExist:
+		raise Http404("Stock not found")
+
+	kinds = [k.strip().lower() for k in request.GET.get('kind', 'sma').split(',') if k.strip()]
+	invalid = [k for k in kinds if k not in indicators.KINDS]
+	if not kinds or invalid:
+		return JsonResponse({'error': f"Invalid indicator kind. Use {', '.join(indicators.KINDS)}"}, status=400)
+
+	try:
+		window = int(request.GET.get('window', 20))
+		points = int(request.GET.get('points', 500))
+	except ValueError:
+		return JsonResponse({'error': 'Invalid window or points'}, status=400)
+
+	if window < 2 or window > 200:
+		return JsonResponse({'error': 'Window must be between 2 and 200'}, status=400)
+	if points < 10 or points > 2000:
+		return JsonResponse({'error': 'Points must be between 10 and 2000'}, status=400)
+
+	result = indicators.indicator_series(stock, list(dict.fromkeys(kinds)), window, points)
+	result['symbol'] = stock.symbol
+	result['window'] = window
+
+	return JsonResponse(result)
+
+
+@require_GET
+@replica_reads
 def latest_event(request):
-	"""Return the most recent MarketEventApplication as JSON.
+	"""Return the most recent MarketEventApplication in the request's market as JSON.
 
 	If an application exists, return both event and stock fields plus a
 	server-rendered `rendered_text` where {company} is replaced with the
 	affected stock's name. If none exist, return {'event': None}.
 	"""
 	try:
-		app = MarketEventApplication.objects.select_related('event', 'stock').order_by('-created_at').first()
+		app = (
+			MarketEventApplication.objects.filter(stock__market_id=markets.for_request(request))
+			.select_related('event', 'stock')
+			.order_by('-created_at')
+			.first()
+		)
 	except Exception:
 		app = None
 
@@ -335,31 +548,19 @@ def latest_event(request):
 
 
 @login_required
+@replica_reads
 def leaderboard(request):
-	"""Display the top 25 users by total portfolio worth."""
-	users_data = []
-	
-	for user in User.objects.all():
-		balance = float(user.balance or 0.0)
-		
-		holdings = Holding.objects.filter(user=user).select_related('stock')
-		stocks_total = sum(float(h.stock.price) * int(h.shares) for h in holdings)
-		
-		portfolio_worth = balance + stocks_total
-		
-		users_data.append({
+	"""Display the top 25 users of the request's market by total portfolio worth."""
+	top_users = []
+	for user in rankings.ranked_users(markets.for_request(request))[:25]:
+		top_users.append({
 			'user': user,
-			'balance': balance,
-			'stocks_total': stocks_total,
-			'portfolio_worth': portfolio_worth,
+			'balance': float(user.balance or 0.0),
+			'stocks_total': user.stocks_value,
+			'portfolio_worth': user.net_worth,
+			'rank': user.rank,
 		})
-	
-	users_data.sort(key=lambda x: x['portfolio_worth'], reverse=True)
-	top_users = users_data[:25]
-	
-	for i, user_data in enumerate(top_users, 1):
-		user_data['rank'] = i
-	
+
 	context = {
 		'top_users': top_users,
 	}
@@ -367,42 +568,129 @@ def leaderboard(request):
 	return render(request, 'market/leaderboard.html', context)
 
 
+def _timestamp_params(request, names):
+	"""Return {name: aware datetime} of the ISO 8601 query params in `names` that are set.
+
+	Raises ValueError naming the first param that does not parse.
+	"""
+	values = {}
+	for name in names:
+		raw = request.GET.get(name)
+		if not raw:
+			continue
+		value = parse_datetime(raw)
+		if value is None:
+			raise ValueError(f'Invalid {name} timestamp')
+		if timezone.is_naive(value):
+			value = timezone.make_aware(value)
+		values[name] = value
+	return values
+
+
+@login_required
+@require_GET
+@replica_reads
+def leaderboard_standings(request):
+	"""Return the leaderboard top N as it stood at a past time, from the hourly rank snapshots.
+
+	Query params:
+	- at: ISO 8601 timestamp (default: now)
+	- limit: number of ranks, 1-500 (default: 25)
+	- market: market slug, for staff (default: the user's market)
+
+	Returns {'period': start of the snapshot used or null, 'users': [{rank, user_id, name, net_worth}]}.
+	"""
+	try:
+		at = _timestamp_params(request, ['at']).get('at') or timezone.now()
+	except ValueError as e:
+		return JsonResponse({'error': str(e)}, status=400)
+	try:
+		limit = int(request.GET.get('limit', rankings.DEFAULT_TOP))
+	except ValueError:
+		return JsonResponse({'error': 'Invalid limit'}, status=400)
+	if limit < 1 or limit > rankings.MAX_TOP:
+		return JsonResponse({'error': f'Limit must be between 1 and {rankings.MAX_TOP}'}, status=400)
+
+	period, rows = rankings.top_at(at, limit, markets.for_request(request))
+	return JsonResponse({
+		'period': period.isoformat() if period else None,
+		'users': [{
+			'rank': row.rank,
+			'user_id': row.user_id,
+			'name': row.user.get_full_name() or 'No Name',
+			'net_worth': row.net_worth,
+		} for row in rows],
+	})
+
+
+@login_required
+@require_GET
+@replica_reads
+def leaderboard_history(request):
+	"""Return a user's leaderboard rank over time, oldest first.
+
+	Query params:
+	- since, until: ISO 8601 timestamps bounding the range (optional)
+	- user_id: another user's id (staff only; default: the requesting user)
+
+	Returns {'user_id', 'history': [{period, rank, net_worth}]}.
+	"""
+	user = request.user
+	if request.GET.get('user_id'):
+		if not request.user.is_staff:
+			return JsonResponse({'error': 'Only staff can view other users'}, status=403)
+		try:
+			user = User.objects.get(id=int(request.GET['user_id']))
+		except (ValueError, User.DoesNotExist):
+			return JsonResponse({'error': 'User not found'}, status=404)
+
+	try:
+		bounds = _timestamp_params(request, ['since', 'until'])
+	except ValueError as e:
+		return JsonResponse({'error': str(e)}, status=400)
+
+	history = rankings.history(user, bounds.get('since'), bounds.get('until'))
+	return JsonResponse({
+		'user_id': user.id,
+		'history': [
+			{'period': period.isoformat(), 'rank': rank, 'net_worth': net_worth}
+			for period, rank, net_worth in history
+		],
+	})
+
+
 @staff_member_required
 @require_POST
 def admin_force_event(request):
 	"""Admin endpoint to force a market event of a specific impact level.
 	
 	Expects JSON body: {"impact_level": "minor|moderate|major|severe", "stock_symbol": "CORN"}
+	and optionally "market" (a market slug; default: the admin's market).
 	"""
 	try:
 		payload = json.loads(request.body.decode('utf-8'))
 		impact_level = payload.get('impact_level', 'minor')
 		stock_symbol = payload.get('stock_symbol')
+		market_id = markets.for_request(request, payload.get('market'))
 		
 		valid_levels = ['minor', 'moderate', 'major', 'severe']
 		if impact_level not in valid_levels:
 			return JsonResponse({'error': 'Invalid impact level'}, status=400)
 		
-		events = MarketEvent.objects.filter(impact_level=impact_level)
-		if not events.exists():
+		if not market_events.catalog().by_level.get(impact_level):
 			return JsonResponse({'error': f'No events found for impact level: {impact_level}'}, status=404)
 		
-		event = random.choice(events)
-		
 		if stock_symbol:
 			try:
-				stock = Stock.objects.get(symbol=stock_symbol)
+				stocks = [Stock.objects.get(market_id=market_id, symbol=stock_symbol)]
 			except Stock.DoesNotExist:
 				return JsonResponse({'error': f'Stock {stock_symbol} not found'}, status=404)
 		else:
-			stocks = Stock.objects.all()
-			if not stocks.exists():
+			stocks = market_events.random_stocks(1, market_id=market_id)
+			if not stocks:
 				return JsonResponse({'error': 'No stocks available'}, status=404)
-			stock = random.choice(stocks)
-		
-		event.apply_event(stock=stock)
 		
-		MarketEventApplication.objects.create(event=event, stock=stock)
+		event, stock, _ = market_events.apply_events(level=impact_level, stocks=stocks)[0]
 		
 		return JsonResponse({
 			'success': True,
@@ -414,6 +702,8 @@ def admin_force_event(request):
 		
 	except json.JSONDecodeError:
 		return JsonResponse({'error': 'Invalid JSON'}, status=400)
+	except Http404 as e:
+		return JsonResponse({'error': str(e)}, status=404)
 	except Exception as e:
 		return JsonResponse({'error': str(e)}, status=500)
 
@@ -441,8 +731,8 @@ def admin_add_money(request):
 		except User.DoesNotExist:
 			return JsonResponse({'error': 'User not found'}, status=404)
 		
-		target_user.balance = float(target_user.balance or 0.0) + amount
-		target_user.save()
+		ledger.post([ledger.cash(target_user.id, Trade.GRANT, amount, note=f'by {request.user.email}'[:100])])
+		target_user.refresh_from_db(fields=['balance'])
 		
 		return JsonResponse({
 			'success': True,
@@ -460,24 +750,88 @@ def admin_add_money(request):
 @staff_member_required
 @require_GET
 def admin_list_users(request):
-	"""Admin endpoint to get a list of all users with their balances.
-	
-	Returns JSON array of users with id, name, email, and balance.
+	"""Admin endpoint to page through users with their balances.
+
+	Query params:
+	- q: email or name prefix to search for (optional)
+	- sort: email, -email, net_worth or -net_worth (default: email)
+	- include: net_worth to add each user's precomputed net worth (optional)
+	- limit: page size, 1-500 (default: 100)
+	- cursor: the `next` value of the previous page
+
+	Returns {'users': [{id, name, email, balance[, net_worth]}], 'next': cursor or null}.
 	"""
+	sort = request.GET.get('sort', 'email')
+	if sort not in listing.USER_SORTS:
+		return JsonResponse({'error': f"Invalid sort. Use {', '.join(listing.USER_SORTS)}"}, status=400)
 	try:
-		users_data = []
-		for user in User.objects.all().order_by('email'):
-			users_data.append({
-				'id': user.id,
-				'name': user.get_full_name() or 'No Name',
-				'email': user.email,
-				'balance': round(float(user.balance or 0.0), 2)
-			})
-		
-		return JsonResponse({'users': users_data})
-		
-	except Exception as e:
-		return JsonResponse({'error': str(e)}, status=500)
+		limit = int(request.GET.get('limit', listing.USER_DEFAULT_LIMIT))
+	except ValueError:
+		return JsonResponse({'error': 'Invalid limit'}, status=400)
+	if limit < 1 or limit > listing.USER_MAX_LIMIT:
+		return JsonResponse({'error': f'Limit must be between 1 and {listing.USER_MAX_LIMIT}'}, status=400)
+	include = {item.strip() for item in request.GET.get('include', '').split(',') if item.strip()}
+
+	try:
+		rows, next_cursor = listing.user_page(
+			query=request.GET.get('q', ''),
+			sort=sort,
+			cursor=request.GET.get('cursor'),
+			limit=limit,
+			net_worth='net_worth' in include,
+		)
+	except listing.InvalidCursor as e:
+		return JsonResponse({'error': str(e)}, status=400)
+
+	users_data = []
+	for row in rows:
+		user = {
+			'id': row['id'],
+			'name': f"{row['first_name']} {row['last_name']}".strip() or 'No Name',
+			'email': row['email'],
+			'balance': round(float(row['balance'] or 0.0), 2),
+		}
+		if 'net_worth' in row:
+			user['net_worth'] = round(float(row['net_worth'] or 0.0), 2)
+		users_data.append(user)
+
+	return JsonResponse({'users': users_data, 'next': next_cursor})
+
+
+@staff_member_required
+@require_GET
+def admin_export_history(request):
+	"""Admin endpoint streaming full price history as a file download.
+
+	Query params:
+	- symbols: comma-separated symbols (default: every stock)
+	- market: market slug (default: the admin's market)
+	- since, until: ISO 8601 timestamps bounding the range (optional)
+	- format: csv (default) or columnar (see market.exports)
+
+	History is read through a server-side cursor and streamed, so memory
+	use does not depend on how many points are exported.
+	"""
+	fmt = request.GET.get('format', 'csv').lower()
+	if fmt not in exports.FORMATS:
+		return JsonResponse({'error': f"Invalid format. Use {', '.join(exports.FORMATS)}"}, status=400)
+
+	try:
+		bounds = _timestamp_params(request, ['since', 'until'])
+	except ValueError as e:
+		return JsonResponse({'error': str(e)}, status=400)
+
+	symbols, missing = exports.resolve_symbols(request.GET.get('symbols', '').split(','), markets.for_request(request))
+	if missing:
+		return JsonResponse({'error': f"Unknown symbols: {', '.join(missing)}"}, status=404)
+
+	response = StreamingHttpResponse(
+		exports.stream(fmt, symbols, bounds.get('since'), bounds.get('until')),
+		content_type=exports.CONTENT_TYPES[fmt],
+	)
+	filename = f"price-history-{timezone.now():%Y%m%d-%H%M%S}.{exports.EXTENSIONS[fmt]}"
+	response['Content-Disposition'] = f'attachment; filename="{filename}"'
+	return response
 
 
 @staff_member_required
@@ -486,6 +840,7 @@ def admin_set_stock_price(request):
 	"""Admin endpoint to set a stock's price directly.
 	
 	Expects JSON body: {"stock_symbol": "CORN", "price": 15.50}
+	and optionally "market" (a market slug; default: the admin's market).
 	"""
 	try:
 		payload = json.loads(request.body.decode('utf-8'))
@@ -499,15 +854,13 @@ def admin_set_stock_price(request):
 			return JsonResponse({'error': 'Price must be positive'}, status=400)
 		
 		try:
-			stock = Stock.objects.get(symbol=stock_symbol)
+			stock = Stock.objects.get(
+				market_id=markets.for_request(request, payload.get('market')), symbol=stock_symbol,
+			)
 		except Stock.DoesNotExist:
 			return JsonResponse({'error': f'Stock {stock_symbol} not found'}, status=404)
 		
-		stock.price = price
-		stock.save()
-		
-		from market.models import StockPriceHistory
-		StockPriceHistory.objects.create(stock=stock, price=price)
+		prices.set_price(stock, price, source='admin')
 		
 		return JsonResponse({
 			'success': True,
@@ -517,6 +870,8 @@ def admin_set_stock_price(request):
 		
 	except (json.JSONDecodeError, ValueError):
 		return JsonResponse({'error': 'Invalid data'}, status=400)
+	except Http404 as e:
+		return JsonResponse({'error': str(e)}, status=404)
 	except Exception as e:
 		return JsonResponse({'error': str(e)}, status=500)
 
@@ -526,27 +881,29 @@ def admin_set_stock_price(request):
 def take_loan(request):
 	"""Allow users to take a $20 emergency loan if portfolio is below $3."""
 	try:
-		user = request.user
-		
-		if user.has_loan:
-			return JsonResponse({'error': 'You already have an active loan'}, status=400)
-		
-		holdings = Holding.objects.filter(user=user).select_related('stock')
-		stocks_total = sum(float(h.stock.price) * int(h.shares) for h in holdings)
-		portfolio_worth = float(user.balance or 0.0) + stocks_total
-		
-		if portfolio_worth >= 3.0:
-			return JsonResponse({'error': 'You must have less than $3 total to qualify for a loan'}, status=400)
-		
-		LOAN_AMOUNT = 20.0
-		user.has_loan = True
-		user.loan_amount = LOAN_AMOUNT * 1.25  
-		user.balance = float(user.balance or 0.0) + LOAN_AMOUNT
-		user.save()
+		with transaction.atomic():
+			# Lock the user row so concurrent requests cannot both pass the checks.
+			user = User.objects.select_for_update().get(id=request.user.id)
+			
+			if user.has_loan:
+				return JsonResponse({'error': 'You already have an active loan'}, status=400)
+			
+			holdings = Holding.objects.filter(user=user).select_related('stock')
+			stocks_total = sum(float(h.stock.price) * int(h.shares) for h in holdings)
+			portfolio_worth = float(user.balance or 0.0) + stocks_total
+			
+			if not loans.is_eligible(user, portfolio_worth):
+				return JsonResponse({'error': f'You must have less than ${loans.ELIGIBLE_BELOW:g} total to qualify for a loan'}, status=400)
+			
+			ledger.post(
+				[ledger.cash(user.id, Trade.LOAN, loans.LOAN_AMOUNT)],
+				user_fields={'has_loan': True, 'loan_amount': loans.LOAN_AMOUNT * loans.REPAY_FACTOR},
+			)
+		user.refresh_from_db(fields=['balance', 'loan_amount'])
 		
 		return JsonResponse({
 			'success': True,
-			'loan_given': LOAN_AMOUNT,
+			'loan_given': loans.LOAN_AMOUNT,
 			'to_repay': user.loan_amount,
 			'new_balance': round(user.balance, 2)
 		})
@@ -557,41 +914,63 @@ def take_loan(request):
 
 @login_required
 @require_GET
-def check_loan_status(request):
-	"""Check if user has a loan and if they can repay it."""
-	try:
-		user = request.user
-		
-		holdings = Holding.objects.filter(user=user).select_related('stock')
-		stocks_total = sum(float(h.stock.price) * int(h.shares) for h in holdings)
-		portfolio_worth = float(user.balance or 0.0) + stocks_total
-		
-		if user.has_loan and user.balance >= 50.0:
-			user.balance = float(user.balance) - user.loan_amount
-			user.has_loan = False
-			repaid_amount = user.loan_amount
-			user.loan_amount = 0.0
-			user.save()
-			
-			return JsonResponse({
-				'has_loan': False,
-				'auto_repaid': True,
-				'repaid_amount': round(repaid_amount, 2),
-				'new_balance': round(user.balance, 2),
-				'portfolio_worth': round(portfolio_worth, 2),
-				'eligible_for_loan': portfolio_worth < 3.0
-			})
-		
-		return JsonResponse({
-			'has_loan': user.has_loan,
-			'loan_amount': round(user.loan_amount, 2) if user.has_loan else 0,
-			'balance': round(user.balance, 2),
-			'portfolio_worth': round(portfolio_worth, 2),
-			'eligible_for_loan': portfolio_worth < 3.0 and not user.has_loan
+def account_summary(request):
+	"""Return the user's balance, holdings at live prices, net worth and loan state.
+
+	Holdings and their prices come from one joined query. The response
+	carries an ETag of its content, so a poll that finds nothing changed
+	gets an empty 304. Loans are repaid by the market tick, not here.
+	"""
+	user = request.user
+	rows = (
+		Holding.objects.filter(user=user, shares__gt=0)
+		.select_related('stock')
+		.order_by('stock__symbol')
+	)
+
+	holdings = []
+	stocks_value = cost_basis = 0.0
+	for holding in rows:
+		stock = holding.stock
+		value = stock.price * holding.shares
+		stocks_value += value
+		cost_basis += holding.cost_basis
+		holdings.append({
+			'symbol': stock.symbol,
+			'shares': holding.shares,
+			'price': round(stock.price, 2),
+			'direction': _stock_direction(stock),
+			'value': round(value, 2),
+			'cost_basis': round(holding.cost_basis, 2),
+			'unrealized_pnl': round(value - holding.cost_basis, 2),
 		})
-		
-	except Exception as e:
-		return JsonResponse({'error': str(e)}, status=500)
+
+	balance = float(user.balance or 0.0)
+	net_worth = balance + stocks_value
+	data = {
+		'balance': round(balance, 2),
+		'stocks_value': round(stocks_value, 2),
+		'net_worth': round(net_worth, 2),
+		'cost_basis': round(cost_basis, 2),
+		'unrealized_pnl': round(stocks_value - cost_basis, 2),
+		'realized_pnl': round(float(user.realized_pnl or 0.0), 2),
+		'holdings': holdings,
+		'loan': {
+			'has_loan': user.has_loan,
+			'amount': round(user.loan_amount, 2) if user.has_loan else 0,
+			'repay_at': loans.REPAY_AT,
+			'eligible': loans.is_eligible(user, net_worth),
+		},
+	}
+
+	body = json.dumps(data, separators=(',', ':'))
+	etag = quote_etag(hashlib.md5(body.encode('utf-8')).hexdigest())
+	response = get_conditional_response(request, etag=etag)
+	if response is None:
+		response = HttpResponse(body, content_type='application/json')
+	response['ETag'] = etag
+	response['Cache-Control'] = 'private, no-cache'
+	return response
 
 
 @staff_member_required
@@ -599,9 +978,10 @@ def check_loan_status(request):
 def admin_market_event(request):
 	"""Admin endpoint to trigger market-wide events.
 	
-	Expects JSON body: {"event_type": "boom" | "crisis"}
-	boom: increases all stocks by 25-50%
-	crisis: decreases all stocks by 25-50%
+	Expects JSON body: {"event_type": "boom" | "crisis"} and optionally
+	"market" (a market slug; default: the admin's market).
+	boom: increases all stocks of the market by 25-50%
+	crisis: decreases all stocks of the market by 25-50%
 	"""
 	try:
 		payload = json.loads(request.body.decode('utf-8'))
@@ -610,24 +990,22 @@ def admin_market_event(request):
 		if event_type not in ['boom', 'crisis']:
 			return JsonResponse({'error': 'Invalid event type. Use "boom" or "crisis"'}, status=400)
 		
-		stocks = Stock.objects.all()
+		stocks = Stock.objects.filter(market_id=markets.for_request(request, payload.get('market')))
 		if not stocks.exists():
 			return JsonResponse({'error': 'No stocks available'}, status=404)
 		
 		stocks_affected = 0
 		
-		for stock in stocks:
-			impact = random.uniform(0.25, 0.50)
-			
-			if event_type == 'boom':
-				stock.price = max(0.1, stock.price * (1 + impact))
-			else:  
-				stock.price = max(0.1, stock.price * (1 - impact))
-			
-			stock.save()
-			
-			StockPriceHistory.objects.create(stock=stock, price=stock.price)
-			stocks_affected += 1
+		with prices.batch('admin'):
+			for stock in stocks:
+				impact = random.uniform(0.25, 0.50)
+				
+				if event_type == 'boom':
+					prices.set_price(stock, max(0.1, stock.price * (1 + impact)))
+				else:  
+					prices.set_price(stock, max(0.1, stock.price * (1 - impact)))
+				
+				stocks_affected += 1
 		
 		event_names = {
 			'boom': 'Golden Peel Boom',
@@ -643,6 +1021,8 @@ def admin_market_event(request):
 		
 	except json.JSONDecodeError:
 		return JsonResponse({'error': 'Invalid JSON'}, status=400)
+	except Http404 as e:
+		return JsonResponse({'error': str(e)}, status=404)
 	except Exception as e:
 		return JsonResponse({'error': str(e)}, status=500)
 
@@ -650,7 +1030,7 @@ def admin_market_event(request):
 @staff_member_required
 @require_POST
 def admin_monkey_business(request):
-	"""Admin endpoint to diversify a user's portfolio with random stocks.
+	"""Admin endpoint to diversify a user's portfolio with random stocks of their market.
 	
 	Expects JSON body: {
 		"user_id": 1,
@@ -680,7 +1060,7 @@ def admin_monkey_business(request):
 		except User.DoesNotExist:
 			return JsonResponse({'error': 'User not found'}, status=404)
 		
-		all_stocks = list(Stock.objects.all())
+		all_stocks = list(Stock.objects.filter(market_id=target_user.market_id))
 		if not all_stocks:
 			return JsonResponse({'error': 'No stocks available'}, status=404)
 		
@@ -691,38 +1071,28 @@ def admin_monkey_business(request):
 		
 		added_holdings = []
 		total_shares = 0
+		share_grants = []
+		held = dict(
+			Holding.objects.filter(user=target_user, stock__in=selected_stocks)
+			.values('stock_id').annotate(total=Sum('shares')).values_list('stock_id', 'total')
+		)
 		
 		for stock in selected_stocks:
 			shares = random.randint(shares_min, shares_max)
+			share_grants.append(ledger.grant_shares(target_user.id, stock.id, shares))
 			
-			holding, created = Holding.objects.get_or_create(
-				user=target_user,
-				stock=stock,
-				defaults={'shares': shares}
-			)
-			
-			if not created:
-				old_shares = holding.shares
-				holding.shares += shares
-				holding.save()
-				added_holdings.append({
-					'symbol': stock.symbol,
-					'name': stock.name,
-					'shares_added': shares,
-					'total_shares': holding.shares,
-					'was_new': False
-				})
-			else:
-				added_holdings.append({
-					'symbol': stock.symbol,
-					'name': stock.name,
-					'shares_added': shares,
-					'total_shares': shares,
-					'was_new': True
-				})
+			added_holdings.append({
+				'symbol': stock.symbol,
+				'name': stock.name,
+				'shares_added': shares,
+				'total_shares': held.get(stock.id, 0) + shares,
+				'was_new': stock.id not in held
+			})
 			
 			total_shares += shares
 		
+		ledger.post(share_grants)
+		
 		holdings = Holding.objects.filter(user=target_user).select_related('stock')
 		stocks_total = sum(float(h.stock.price) * int(h.shares) for h in holdings)
 		portfolio_worth = float(target_user.balance or 0.0) + stocks_total
@@ -741,3 +1111,307 @@ def admin_monkey_business(request):
 		return JsonResponse({'error': 'Invalid data'}, status=400)
 	except Exception as e:
 		return JsonResponse({'error': str(e)}, status=500)
+
+
+@staff_member_required
+@require_POST
+def admin_bulk_add_money(request):
+	"""Admin endpoint to add money to many users at once.
+
+	Expects JSON body: {"amount": 100.0} plus either {"user_ids": [1, 2, ...]}
+	or {"filter": {...}} with any of balance_lt, balance_gte, email_endswith,
+	has_loan, is_staff, joined_after ({} selects every user).
+
+	Every balance moves in one UPDATE inside a single transaction.
+	"""
+	try:
+		payload = json.loads(request.body.decode('utf-8'))
+		amount = float(payload.get('amount', 0))
+		if amount <= 0:
+			return JsonResponse({'error': 'Amount must be positive'}, status=400)
+
+		with transaction.atomic():
+			user_ids = grants.select_users(payload)
+			if not user_ids:
+				return JsonResponse({'error': 'No users matched'}, status=404)
+			credited = grants.grant_money(user_ids, amount, note=f'bulk by {request.user.email}'[:100])
+			cash, _ = grants.totals(user_ids)
+
+		return JsonResponse({
+			'success': True,
+			'users': credited,
+			'added_each': round(amount, 2),
+			'added_total': round(amount * credited, 2),
+			'total_balance': round(cash, 2),
+		})
+
+	except (json.JSONDecodeError, ValueError, TypeError) as e:
+		return JsonResponse({'error': str(e) or 'Invalid data'}, status=400)
+	except Exception as e:
+		return JsonResponse({'error': str(e)}, status=500)
+
+
+@staff_member_required
+@require_POST
+def admin_bulk_monkey_business(request):
+	"""Admin endpoint to diversify many users' portfolios with random stocks at once.
+
+	Expects JSON body: {"num_stocks": 5, "shares_min": 1, "shares_max": 10}
+	plus the same "user_ids" or "filter" selection as admin_bulk_add_money.
+
+	All holdings are written with one bulk upsert inside a single
+	transaction; the response only carries aggregate results.
+	"""
+	try:
+		payload = json.loads(request.body.decode('utf-8'))
+		num_stocks = int(payload.get('num_stocks', 0))
+		shares_min = int(payload.get('shares_min', 1))
+		shares_max = int(payload.get('shares_max', 10))
+
+		if num_stocks <= 0:
+			return JsonResponse({'error': 'Number of stocks must be positive'}, status=400)
+
+		if shares_min <= 0 or shares_max <= 0 or shares_min > shares_max:
+			return JsonResponse({'error': 'Invalid shares range'}, status=400)
+
+		with transaction.atomic():
+			user_ids = grants.select_users(payload)
+			if not user_ids:
+				return JsonResponse({'error': 'No users matched'}, status=404)
+			result = grants.grant_random_shares(
+				user_ids, num_stocks, shares_min, shares_max, note=f'bulk by {request.user.email}'[:100],
+			)
+			_, stocks_value = grants.totals(user_ids)
+
+		return JsonResponse({
+			'success': True,
+			'message': '🐵 Monkey Business complete!',
+			'users': result['users'],
+			'holdings_granted': result['holdings'],
+			'total_shares_added': result['shares'],
+			'value_added': round(result['value'], 2),
+			'total_stocks_value': round(stocks_value, 2),
+		})
+
+	except (json.JSONDecodeError, ValueError, TypeError) as e:
+		return JsonResponse({'error': str(e) or 'Invalid data'}, status=400)
+	except Exception as e:
+		return JsonResponse({'error': str(e)}, status=500)
+
+
+def _alert_json(alert):
+	return {
+		'id': alert.id,
+		'symbol': alert.stock.symbol,
+		'direction': alert.direction,
+		'threshold': round(alert.threshold, 2),
+		'created_at': alert.created_at.isoformat(),
+		'triggered_at': alert.triggered_at.isoformat() if alert.triggered_at else None,
+		'triggered_price': round(alert.triggered_price, 2) if alert.triggered_price is not None else None,
+	}
+
+
+@login_required
+@require_GET
+def list_alerts(request):
+	"""Return the logged-in user's pending price alerts."""
+	pending = PriceAlert.objects.filter(user=request.user, triggered_at__isnull=True).select_related('stock')
+	return JsonResponse({'alerts': [_alert_json(a) for a in pending]})
+
+
+@login_required
+@require_POST
+def create_alert(request):
+	"""Create a price alert for the logged-in user.
+
+	Expects JSON body: {"symbol": "ABC", "direction": "above" | "below", "threshold": 12.5}
+	The threshold must be on the far side of the current price, since the
+	alert fires when the price crosses it.
+	"""
+	try:
+		payload = json.loads(request.body.decode('utf-8'))
+	except Exception:
+		return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+	direction = payload.get('direction')
+	if direction not in (PriceAlert.ABOVE, PriceAlert.BELOW):
+		return JsonResponse({'error': 'Invalid direction. Use "above" or "below"'}, status=400)
+
+	try:
+		threshold = float(payload.get('threshold'))
+	except Exception:
+		return JsonResponse({'error': 'Invalid threshold'}, status=400)
+
+	if threshold <= 0:
+		return JsonResponse({'error': 'Threshold must be positive'}, status=400)
+
+	try:
+		stock = Stock.objects.get(market_id=request.user.market_id, symbol=payload.get('symbol'))
+	except Stock.DoesNotExist:
+		return JsonResponse({'error': 'Stock not found'}, status=404)
+
+	if direction == PriceAlert.ABOVE and threshold <= stock.price:
+		return JsonResponse({'error': 'Threshold must be above the current price', 'price': round(stock.price, 2)}, status=400)
+	if direction == PriceAlert.BELOW and threshold >= stock.price:
+		return JsonResponse({'error': 'Threshold must be below the current price', 'price': round(stock.price, 2)}, status=400)
+
+	pending = PriceAlert.objects.filter(user=request.user, triggered_at__isnull=True).count()
+	if pending >= alerts.MAX_PENDING_PER_USER:
+		return JsonResponse({'error': f'You can have at most {alerts.MAX_PENDING_PER_USER} pending alerts'}, status=400)
+
+	alert = PriceAlert.objects.create(user=request.user, stock=stock, direction=direction, threshold=threshold)
+	return JsonResponse({'success': True, 'alert': _alert_json(alert)})
+
+
+@login_required
+@require_POST
+def delete_alert(request):
+	"""Delete one of the logged-in user's price alerts.
+
+	Expects JSON body: {"id": 1}
+	"""
+	try:
+		payload = json.loads(request.body.decode('utf-8'))
+	except Exception:
+		return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+	deleted, _ = PriceAlert.objects.filter(user=request.user, id=payload.get('id')).delete()
+	if not deleted:
+		return JsonResponse({'error': 'Alert not found'}, status=404)
+	return JsonResponse({'success': True})
+
+
+@login_required
+@require_GET
+def notifications(request):
+	"""Return the logged-in user's fired price alerts, newest first.
+
+	Query params:
+	- since: ISO timestamp; only alerts fired after it are returned
+	- limit: maximum number of notifications, 1-100 (default: 20)
+	"""
+	fired = PriceAlert.objects.filter(user=request.user, triggered_at__isnull=False)
+
+	since = request.GET.get('since')
+	if since:
+		since_dt = parse_datetime(since)
+		if since_dt is None:
+			return JsonResponse({'error': 'Invalid since timestamp'}, status=400)
+		fired = fired.filter(triggered_at__gt=since_dt)
+
+	try:
+		limit = int(request.GET.get('limit', 20))
+	except ValueError:
+		return JsonResponse({'error': 'Invalid limit'}, status=400)
+	limit = max(1, min(limit, 100))
+
+	items = fired.select_related('stock').order_by('-triggered_at', '-id')[:limit]
+	return JsonResponse({'notifications': [_alert_json(a) for a in items]})
+
+
+def _order_json(order):
+	return {
+		'id': order.id,
+		'symbol': order.stock.symbol,
+		'side': order.side,
+		'kind': order.kind,
+		'trigger_price': round(order.trigger_price, 2),
+		'amount': order.amount,
+		'status': order.status,
+		'created_at': order.created_at.isoformat(),
+		'closed_at': order.closed_at.isoformat() if order.closed_at else None,
+		'fill_price': round(order.fill_price, 2) if order.fill_price is not None else None,
+		'note': order.note,
+	}
+
+
+@login_required
+@require_GET
+def list_orders(request):
+	"""Return the logged-in user's open orders and their 20 most recently closed ones."""
+	orders = Order.objects.filter(user=request.user).select_related('stock')
+	open_orders = orders.filter(status=Order.OPEN)
+	closed_orders = orders.exclude(status=Order.OPEN).order_by('-closed_at', '-id')[:20]
+	return JsonResponse({
+		'open': [_order_json(o) for o in open_orders],
+		'closed': [_order_json(o) for o in closed_orders],
+	})
+
+
+@login_required
+@require_POST
+def place_order(request):
+	"""Place a resting order for the logged-in user.
+
+	Expects JSON body: {"symbol": "ABC", "side": "buy" | "sell",
+	"kind": "limit" | "stop_loss" | "take_profit", "trigger_price": 12.5, "amount": 1}
+	The order executes at the tick price on the first tick that reaches the
+	trigger price. Funds and shares are checked again when it executes.
+	"""
+	try:
+		payload = json.loads(request.body.decode('utf-8'))
+	except Exception:
+		return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+	side = payload.get('side')
+	kind = payload.get('kind')
+	if side not in (Order.BUY, Order.SELL):
+		return JsonResponse({'error': 'Invalid side. Use "buy" or "sell"'}, status=400)
+	if kind not in (Order.LIMIT, Order.STOP_LOSS, Order.TAKE_PROFIT):
+		return JsonResponse({'error': 'Invalid kind. Use "limit", "stop_loss" or "take_profit"'}, status=400)
+	if kind == Order.TAKE_PROFIT and side != Order.SELL:
+		return JsonResponse({'error': 'Take-profit orders must be sell orders'}, status=400)
+
+	try:
+		amount = int(payload.get('amount'))
+		trigger_price = float(payload.get('trigger_price'))
+	except Exception:
+		return JsonResponse({'error': 'Invalid amount or trigger price'}, status=400)
+
+	if amount < 1:
+		return JsonResponse({'error': 'Amount must be at least 1'}, status=400)
+	if trigger_price <= 0:
+		return JsonResponse({'error': 'Trigger price must be positive'}, status=400)
+
+	try:
+		stock = Stock.objects.get(market_id=request.user.market_id, symbol=payload.get('symbol'))
+	except Stock.DoesNotExist:
+		return JsonResponse({'error': 'Stock not found'}, status=404)
+
+	if fires_on_rise(side, kind) and trigger_price <= stock.price:
+		return JsonResponse({'error': 'Trigger price must be above the current price', 'price': round(stock.price, 2)}, status=400)
+	if not fires_on_rise(side, kind) and trigger_price >= stock.price:
+		return JsonResponse({'error': 'Trigger price must be below the current price', 'price': round(stock.price, 2)}, status=400)
+
+	user = request.user
+	if side == Order.SELL:
+		held = Holding.objects.filter(user=user, stock=stock).aggregate(total=Coalesce(Sum('shares'), 0))['total']
+		if amount > held:
+			return JsonResponse({'error': 'Cannot sell more shares than owned', 'shares': held}, status=400)
+	elif user.balance < trigger_price * amount:
+		return JsonResponse({'error': 'Insufficient funds', 'balance': user.balance}, status=400)
+
+	order = Order.objects.create(
+		user=user, stock=stock, side=side, kind=kind, trigger_price=trigger_price, amount=amount,
+	)
+	return JsonResponse({'success': True, 'order': _order_json(order)})
+
+
+@login_required
+@require_POST
+def cancel_order(request):
+	"""Cancel one of the logged-in user's open orders.
+
+	Expects JSON body: {"id": 1}
+	"""
+	try:
+		payload = json.loads(request.body.decode('utf-8'))
+	except Exception:
+		return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+	cancelled = Order.objects.filter(user=request.user, id=payload.get('id'), status=Order.OPEN).update(
+		status=Order.CANCELLED, closed_at=timezone.now(),
+	)
+	if not cancelled:
+		return JsonResponse({'error': 'Open order not found'}, status=404)
+	return JsonResponse({'success': True})
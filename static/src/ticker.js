@@ -8,6 +8,7 @@ import './app.css';
 
 const TICKER_POLL_INTERVAL = 5000; 
 const TICKER_FETCH_URL = '/api/ticker/';
+const SPARKLINE_FETCH_URL = '/api/sparklines/?points=30';
 const NEWS_POLL_INTERVAL = 30000; 
 const NEWS_FETCH_URL = '/api/latest-event/';
 
@@ -17,8 +18,51 @@ function arrowForDirection(direction) {
     return '•';
 }
 
+function formatVolume(volume) {
+    if (!volume) return '';
+    if (volume >= 1000000) return `vol ${(volume / 1000000).toFixed(1)}M`;
+    if (volume >= 1000) return `vol ${(volume / 1000).toFixed(1)}k`;
+    return `vol ${volume}`;
+}
+
+// Sparklines arrive as [first price in cents, change in cents, ...].
+function decodeSparkline(encoded) {
+    const prices = [];
+    let cents = 0;
+    for (const delta of encoded || []) {
+        cents += delta;
+        prices.push(cents / 100);
+    }
+    return prices;
+}
+
+const SPARK_WIDTH = 48;
+const SPARK_HEIGHT = 16;
+
+function sparklinePoints(prices) {
+    if (prices.length < 2) return '';
+    const min = Math.min(...prices);
+    const range = (Math.max(...prices) - min) || 1;
+    const step = SPARK_WIDTH / (prices.length - 1);
+    return prices.map((p, i) => {
+        const x = (i * step).toFixed(1);
+        const y = (SPARK_HEIGHT - 1 - ((p - min) / range) * (SPARK_HEIGHT - 2)).toFixed(1);
+        return `${x},${y}`;
+    }).join(' ');
+}
+
+function renderSparkline(el, encoded) {
+    const line = el && el.querySelector('polyline');
+    if (line) line.setAttribute('points', sparklinePoints(decodeSparkline(encoded)));
+}
+
 let __ticker_initialized = false;
 let __ticker_item_count = 0;
+// Delta protocol state: the market version of the last response, the
+// ticker items in server order and the latest sparklines by symbol.
+let __ticker_version = 0;
+let __ticker_items = [];
+let __ticker_sparklines = {};
 
 function createItemElement(it) {
     const cls = it.direction > 0 ? 'ticker-up' : (it.direction < 0 ? 'ticker-down' : 'ticker-neutral');
@@ -40,13 +84,45 @@ function createItemElement(it) {
     ar.className = 'text-sm ticker-arrow';
     ar.textContent = arrowForDirection(it.direction);
 
+    const vol = document.createElement('span');
+    vol.className = 'text-xs text-muted ticker-volume';
+    vol.textContent = formatVolume(it.volume_24h);
+
+    const spark = document.createElementNS('http://www.w3.org/2000/svg', 'svg');
+    spark.setAttribute('class', 'ticker-spark');
+    spark.setAttribute('width', SPARK_WIDTH);
+    spark.setAttribute('height', SPARK_HEIGHT);
+    spark.setAttribute('viewBox', `0 0 ${SPARK_WIDTH} ${SPARK_HEIGHT}`);
+    spark.setAttribute('aria-hidden', 'true');
+    const line = document.createElementNS('http://www.w3.org/2000/svg', 'polyline');
+    line.setAttribute('fill', 'none');
+    line.setAttribute('stroke', 'currentColor');
+    line.setAttribute('stroke-width', '1.5');
+    spark.appendChild(line);
+    renderSparkline(spark, __ticker_sparklines[it.symbol]);
+
     el.appendChild(sym);
+    el.appendChild(spark);
     el.appendChild(pr);
     el.appendChild(ar);
+    el.appendChild(vol);
     return el;
 }
 
-function renderTicker(items) {
+function updateItemElement(el, it) {
+    const pr = el.querySelector('.ticker-price');
+    const ar = el.querySelector('.ticker-arrow');
+    const vol = el.querySelector('.ticker-volume');
+    if (pr) pr.textContent = `${(typeof it.price === 'number' ? it.price.toFixed(2) : parseFloat(it.price).toFixed(2))} 🍌`;
+    if (ar) ar.textContent = arrowForDirection(it.direction);
+    if (vol) vol.textContent = formatVolume(it.volume_24h);
+    el.classList.remove('ticker-up', 'ticker-down', 'ticker-neutral');
+    el.classList.add(it.direction > 0 ? 'ticker-up' : (it.direction < 0 ? 'ticker-down' : 'ticker-neutral'));
+}
+
+// Rebuilds the track when the set of symbols changed; otherwise only the
+// elements of `changed` symbols (every symbol when null) are updated.
+function renderTicker(items, changed = null) {
     const track = document.getElementById('ticker-track');
     if (!track) return;
 
@@ -69,26 +145,16 @@ function renderTicker(items) {
         const n = __ticker_item_count;
         for (let i = 0; i < n; i++) {
             const it = items[i];
-            const el1 = children[i];
-            const el2 = children[i + n];
-            if (!el1 || !el2) continue;
-            const sym1 = el1.querySelector('.ticker-symbol');
-            const pr1 = el1.querySelector('.ticker-price');
-            const ar1 = el1.querySelector('.ticker-arrow');
-            const sym2 = el2.querySelector('.ticker-symbol');
-            const pr2 = el2.querySelector('.ticker-price');
-            const ar2 = el2.querySelector('.ticker-arrow');
-            if (sym1) sym1.textContent = it.symbol;
-            if (pr1) pr1.textContent = `${(typeof it.price === 'number' ? it.price.toFixed(2) : parseFloat(it.price).toFixed(2))} 🍌`;
-            if (ar1) ar1.textContent = arrowForDirection(it.direction);
-            if (sym2) sym2.textContent = it.symbol;
-            if (pr2) pr2.textContent = `${(typeof it.price === 'number' ? it.price.toFixed(2) : parseFloat(it.price).toFixed(2))} 🍌`;
-            if (ar2) ar2.textContent = arrowForDirection(it.direction);
-                el1.classList.remove('ticker-up', 'ticker-down', 'ticker-neutral');
-                el2.classList.remove('ticker-up', 'ticker-down', 'ticker-neutral');
-                const cls = it.direction > 0 ? 'ticker-up' : (it.direction < 0 ? 'ticker-down' : 'ticker-neutral');
-                el1.classList.add(cls);
-                el2.classList.add(cls);
+            if (changed && !changed.has(it.symbol)) continue;
+            for (const el of [children[i], children[i + n]]) {
+                if (!el) continue;
+                if (el.dataset.symbol !== it.symbol) {
+                    el.dataset.symbol = it.symbol;
+                    const sym = el.querySelector('.ticker-symbol');
+                    if (sym) sym.textContent = it.symbol;
+                }
+                updateItemElement(el, it);
+            }
         }
     }
 
@@ -111,12 +177,59 @@ function renderTicker(items) {
     }
 }
 
+function renderSparklines() {
+    const track = document.getElementById('ticker-track');
+    if (!track) return;
+    for (const el of track.children) {
+        renderSparkline(el.querySelector('.ticker-spark'), __ticker_sparklines[el.dataset.symbol]);
+    }
+}
+
+// Applies a delta response to the current items. Returns the changed
+// symbols, or null when the set of symbols changed and the track needs a
+// rebuild.
+function applyDelta(data) {
+    const removed = new Set(data.removed || []);
+    let rebuild = __ticker_items.length === 0 || __ticker_items.some(it => removed.has(it.symbol));
+    const items = __ticker_items.filter(it => !removed.has(it.symbol));
+    const positions = new Map(items.map((it, i) => [it.symbol, i]));
+    for (const it of data.items) {
+        if (positions.has(it.symbol)) {
+            items[positions.get(it.symbol)] = it;
+        } else {
+            items.push(it);
+            rebuild = true;
+        }
+    }
+    __ticker_items = items;
+    return rebuild ? null : new Set(data.items.map(it => it.symbol));
+}
+
 async function fetchAndUpdate() {
     try {
-        const res = await fetch(TICKER_FETCH_URL, { cache: 'no-store' });
+        // Only the symbols that changed since our version come back; the
+        // server answers with a full snapshot when we are too far behind.
+        const res = await fetch(`${TICKER_FETCH_URL}?since=${__ticker_version}`, { cache: 'no-store' });
         if (!res.ok) return;
         const data = await res.json();
-        renderTicker(data);
+        const moved = data.version !== __ticker_version;
+
+        let changed = null;
+        if (data.full) {
+            __ticker_items = data.items;
+        } else {
+            changed = applyDelta(data);
+        }
+        __ticker_version = data.version;
+        if (!moved && __ticker_initialized) return;
+
+        // One sparkline request covers every symbol on the ticker, and only
+        // when the market moved.
+        const sparkRes = await fetch(SPARKLINE_FETCH_URL, { cache: 'no-store' }).catch(() => null);
+        if (sparkRes && sparkRes.ok) __ticker_sparklines = (await sparkRes.json()).sparklines || {};
+
+        renderTicker(__ticker_items, changed);
+        renderSparklines();
     } catch (e) {
         // decorative: ignore errors
     }